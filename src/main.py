@@ -3,44 +3,84 @@ import enum
 import logging
 import traceback
 
-from fastapi import FastAPI, status
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 
 from model.context import NetContext
 from model.endpoints.execute.request import ExecuteRequest
-from model.endpoints.execute.response import create_response
+from model.endpoints.execute.encoder import encode_response, window_node_to_dict
+from model.endpoints.execute.response import ExecuteResponse, ExecutionTreeResponse
+from model.endpoints.execute.wire import MSGPACK_MEDIA_TYPE, MsgpackRoute, accepts_msgpack, pack
 from model.extree import ExecutionTree
 from model.extree.node import Snapshot
+from model.petri_net.generated import GeneratedSemantic
 from model.region import RegionType
-from model.status import ActivityState
-from model.types import RegionModelType
-from strategy.execution import get_choices
+from model.region_index import RegionIndex
+from model.session import SessionStore
+from model.step_cache import StepResult
+from model.status import ActivityState, resolve_skipped
+from strategy.execution import get_choices, resolve_default_choices
 from utils import logging_utils
+from utils.net_utils import freeze_impacts, get_transition_by_name
 from utils.settings import settings
 
 api = FastAPI(title=settings.title, version=settings.version, docs_url=settings.docs_url, redoc_url=None)
+# Requests can be sent as MessagePack besides JSON
+api.router.route_class = MsgpackRoute
 
 logger = logging_utils.get_logger(__name__)
 
+session_store = SessionStore(ttl=settings.session_ttl, max_sessions=settings.session_max_count,
+							 memory_budget=settings.session_memory_budget)
+
+
+def new_semantic():
+	"""
+	Semantic of the contexts built by the API, the generated one when enabled in the settings.
+	"""
+	return GeneratedSemantic() if settings.generated_semantic else None
+
 @api.exception_handler(404)
 @api.get("/")
 def root():
 	return RedirectResponse("/docs/", status_code=status.HTTP_303_SEE_OTHER)
 
 
-@api.post("/execute")
-def execute(data: ExecuteRequest):
+@api.post("/execute", name="execute", responses={200: {"model": ExecuteResponse}})
+def execute_endpoint(data: ExecuteRequest, request: Request) -> Response:
+	"""
+	Route of `execute`. The response is JSON, or MessagePack when the client prefers it in the Accept header
+	(see `model.endpoints.execute.wire`). The content is already JSON ready, so it is rendered as is instead of
+	being encoded again by FastAPI.
+	"""
+	content = execute(data)
+	if accepts_msgpack(request.headers.get("accept")):
+		return Response(pack(content), media_type=MSGPACK_MEDIA_TYPE)
+
+	return JSONResponse(content)
+
+
+def execute(data: ExecuteRequest) -> dict:
+	"""
+	Execute a step of the request, or of its session, and build the content of the response.
+	"""
 	try:
+		if data.session_id is not None:
+			return execute_session(data)
+
 		region, net, im, fm, extree, decisions = data.to_object()
 
 		logger.info("Request received:")
 		if not net:
 			logger.info("No net defined. Creating new context and execution tree.")
-			ctx = NetContext.from_region(region)
+			ctx = NetContext.from_region(region, semantic=new_semantic(), step_cache_size=settings.step_cache_size)
 			net = ctx.net
 			im = ctx.initial_marking
 			fm = ctx.final_marking
 			extree = ExecutionTree.from_context(ctx, region)
+			regions = ctx.region_index
+			# The client has no tree yet, the delta holds all of it
+			since_version = -1
 		else:
 			if decisions is None:
 				decisions = []
@@ -49,89 +89,22 @@ def execute(data: ExecuteRequest):
 
 			if data.preview:
 				logger.info("Preview requested. Returning current state without consuming decisions.")
-				return create_response(region, net, im, fm, extree).model_dump(
-					exclude_unset=True, exclude_none=True, exclude_defaults=True
-				)
+				return encode_response(region, net, im, fm, extree, fields=data.fields,
+									   since_version=extree.version, view=data.view)
 
 			logger.info("Net defined, using provided markings and execution tree.")
-			ctx = NetContext(region=region, net=net, im=im, fm=fm)
-
-			logger.info("Strategy Type: %s", type(ctx.strategy))
-			current_status = extree.current_node.snapshot.status
-
-			regions = {}
-			def build_region_dict(r: RegionModelType):
-				regions[r.id] = r
-				if r.children:
-					for child in r.children:
-						build_region_dict(child)
-			build_region_dict(region)
-
-			new_status = {regions[int(r_id)] : r_status for r_id, r_status in current_status.items() }
-
-			current_marking = extree.current_node.snapshot.marking
-			previous_time = extree.current_node.snapshot.execution_time  # Get previous cumulative time
-			logger.info("Current marking: %s", current_marking)
-			logger.info("Previous cumulative time: %s", previous_time)
-			logger.info("Consuming decisions: %s", decisions)
-
-			# Check if time_step was provided (TimeStrategy mode)
-			time_step = data.time_step
-			if time_step is not None:
-				logger.info("Using TimeStrategy with time_step: %s", time_step)
-				from strategy.time import TimeStrategy
-				time_strategy = TimeStrategy()
-				new_marking, probability, impacts, step_time, choices = time_strategy.consume(
-					ctx, current_marking, regions, new_status, time_step, decisions
-				)
-			else:
-				logger.info("Using CounterExecution (saturation mode)")
-				new_marking, probability, impacts, step_time, choices = ctx.strategy.consume(
-					ctx, current_marking, regions, new_status, decisions
-				)
-
-			# Calculate cumulative execution time
-			execution_time = previous_time + step_time
-			logger.info("Step time: %s, Cumulative time: %s", step_time, execution_time)
-
-			decision_ids = [transition.name for transition in decisions]
-			choices_node_id = [place.entry_id for place in get_choices(ctx, new_marking).keys()]
-
-			def get_formatted_label(r: RegionModelType) -> str:
-				if r.label:
-					return r.label
-				
-				if r.children:
-					children_labels = [get_formatted_label(child) for child in r.children]
-					if r.is_sequential():
-						return f"({', '.join(children_labels)})"
-					elif r.is_parallel():
-						return f"({' || '.join(children_labels)})"
-				
-				return "None"
-
-			status = {}
-			for r, s in new_status.items():
-				status[r.id] = s
-				label = get_formatted_label(r)
-				# print(label, ": ", s)
-
-
-			new_snapshot = Snapshot(
-				marking=new_marking,
-				probability=probability,
-				impacts=impacts,
-				time=step_time,
-				status=status,
-				decisions=decision_ids,
-				choices=choices_node_id,
-			)
-
-			extree.add_snapshot(ctx, new_snapshot)
-
-		return create_response(region, net, im, fm, extree).model_dump(
-			exclude_unset=True, exclude_none=True, exclude_defaults=True
-		)
+			ctx = NetContext(region=region, net=net, im=im, fm=fm, semantic=new_semantic(),
+							 step_cache_size=settings.step_cache_size)
+			regions = ctx.region_index
+			since_version = extree.version
+			consume_step(ctx, extree, regions, decisions, data.time_step)
+
+		session_id = None
+		if data.create_session:
+			session_id = session_store.create(ctx, extree, regions).id
+
+		return encode_response(region, net, im, fm, extree, session_id=session_id, fields=data.fields,
+							   since_version=since_version, view=data.view)
 	except Exception as e:
 		logging.error(f"Error processing request: {e}")
 		return {
@@ -141,6 +114,137 @@ def execute(data: ExecuteRequest):
 		}
 
 
+@api.delete("/sessions/{session_id}")
+def close_session(session_id: str):
+	if not session_store.remove(session_id):
+		return {"type": "error", "message": f"Session '{session_id}' not found or expired."}
+
+	return {"session_id": session_id}
+
+
+@api.get("/sessions/{session_id}/nodes/{node_id}", responses={200: {"model": ExecutionTreeResponse.WindowNodeModel}})
+def get_session_node(session_id: str, node_id: str):
+	"""
+	Snapshot of a node of the execution tree of a session, with the id of its parent and the number of its children.
+	"""
+	session = session_store.get(session_id)
+	if session is None:
+		return {"type": "error", "message": f"Session '{session_id}' not found or expired."}
+
+	with session.lock:
+		node = session.extree.get_node_by_id(node_id)
+		if node is None:
+			return {"type": "error", "message": f"Node '{node_id}' not found in the execution tree."}
+
+		return window_node_to_dict(node)
+
+
+def execute_session(data: ExecuteRequest) -> dict:
+	"""
+	Execute a step on a server-side session. Only choices, time_step, preview, current_node, fields, since_version and
+	view are read from the request, the net context and the execution tree are kept in memory between calls.
+	The delta of the response starts from `since_version`, by default from the tree before this step.
+	"""
+	session = session_store.get(data.session_id)
+	if session is None:
+		raise ValueError(f"Session '{data.session_id}' not found or expired.")
+
+	logger.info("Session request received: %s", session.id)
+	with session.lock:
+		ctx = session.ctx
+		if data.current_node is not None and not session.extree.set_current(data.current_node):
+			logger.error("Node %s not found in session %s", data.current_node, session.id)
+			raise ValueError("Current node not found in the execution tree.")
+
+		since_version = data.since_version if data.since_version is not None else session.extree.version
+		if not data.preview:
+			decisions = []
+			for choice in data.choices or []:
+				t = get_transition_by_name(ctx.net, choice)
+				if not t:
+					logger.warning("Choice '%s' not found in the Petri net transitions.", choice)
+					continue
+				decisions.append(t)
+
+			consume_step(ctx, session.extree, session.regions, decisions, data.time_step)
+			session_store.update(session)
+
+		return encode_response(ctx.region, ctx.net, ctx.initial_marking, ctx.final_marking, session.extree,
+							   session_id=session.id, fields=data.fields, since_version=since_version, view=data.view)
+
+
+def consume_step(ctx: NetContext, extree: ExecutionTree, regions: RegionIndex,
+				 decisions: list, time_step: float | None = None):
+	"""
+	Consume the decisions from the current node of the execution tree and add the resulting snapshot to it.
+	Deterministic steps are kept in the step cache of the context and replayed when the same step is taken again.
+	"""
+	logger.info("Strategy Type: %s", type(ctx.strategy))
+	current_status = extree.current_node.snapshot.status
+
+	new_status = {regions[int(r_id)] : r_status for r_id, r_status in current_status.items() }
+
+	current_marking = extree.current_node.snapshot.marking
+	previous_time = extree.current_node.snapshot.execution_time  # Get previous cumulative time
+	logger.info("Current marking: %s", current_marking)
+	logger.info("Previous cumulative time: %s", previous_time)
+	logger.info("Consuming decisions: %s", decisions)
+
+	key = ctx.step_cache.key(current_marking, decisions, time_step, new_status)
+	cached = ctx.step_cache.get(key)
+	if cached is not None:
+		logger.info("Step found in the cache: %s", ctx.step_cache)
+		new_marking, probability, impacts, step_time, _, status_delta = cached
+		for r_id, r_status in status_delta.items():
+			new_status[regions[r_id]] = r_status
+	else:
+		previous_status = dict(new_status)
+		# The defaults are resolved here, to know whether the step sampled one. The strategies add no other default
+		resolved, sampled = resolve_default_choices(ctx, current_marking, decisions)
+		# Check if time_step was provided (TimeStrategy mode)
+		if time_step is not None:
+			logger.info("Using TimeStrategy with time_step: %s", time_step)
+			from strategy.time import TimeStrategy
+			time_strategy = TimeStrategy()
+			new_marking, probability, impacts, step_time, choices = time_strategy.consume(
+				ctx, current_marking, regions, new_status, time_step, resolved
+			)
+		else:
+			logger.info("Using CounterExecution (saturation mode)")
+			new_marking, probability, impacts, step_time, choices = ctx.strategy.consume(
+				ctx, current_marking, regions, new_status, resolved
+			)
+
+		impacts = freeze_impacts(impacts)
+		if sampled:
+			ctx.step_cache.bypass()
+		else:
+			status_delta = {r.id: s for r, s in new_status.items() if previous_status.get(r) != s}
+			ctx.step_cache.put(key, StepResult(new_marking, probability, impacts, step_time, tuple(choices),
+											   status_delta))
+
+	# Calculate cumulative execution time
+	execution_time = previous_time + step_time
+	logger.info("Step time: %s, Cumulative time: %s", step_time, execution_time)
+
+	decision_ids = [transition.name for transition in decisions]
+	choices_node_id = [place.entry_id for place in get_choices(ctx, new_marking).keys()]
+
+	status = {r.id: s for r, s in resolve_skipped(regions.root, new_status).items()}
+
+	new_snapshot = Snapshot(
+		marking=new_marking,
+		probability=probability,
+		impacts=impacts,
+		time=step_time,
+		status=status,
+		decisions=decision_ids,
+		choices=choices_node_id,
+	)
+
+	return extree.add_snapshot(ctx, new_snapshot)
+
+
 if __name__ == '__main__':
 	import uvicorn
 
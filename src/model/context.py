@@ -3,7 +3,11 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from converter.spin import from_region
+from model.petri_net.compiled import CompiledNet
 from model.petri_net.time_spin import TimeNetSematic
+from model.petri_net.topology import NetTopology
+from model.region_index import RegionIndex
+from model.step_cache import StepCache
 from strategy import default_strategy
 
 if TYPE_CHECKING:
@@ -33,6 +37,10 @@ class NetContext:
         initial_marking (MarkingType): The initial marking of the Petri net.
         final_marking (MarkingType): The final marking of the Petri net.
         strategy (object): The execution strategy for the Petri net.
+        compiled (CompiledNet): Integer indexed form of the Petri net used by the execution engine.
+        topology (NetTopology): Static facts about the net and the final marking, built on first use.
+        region_index (RegionIndex): Index of the regions and of their places and transitions, built on first use.
+        step_cache (StepCache): Results of the deterministic steps taken from this context.
     """
 
     _id: str
@@ -44,7 +52,8 @@ class NetContext:
     strategy: StrategyProto
 
     def __init__(self, region: RegionModelType, net: PetriNetType, im: MarkingType, fm: MarkingType,
-                 strategy: object = None, _id: str = None, semantic: SemanticType = None):
+                 strategy: object = None, _id: str = None, semantic: SemanticType = None,
+                 step_cache_size: int = 1024):
         self._id = _id or IDGenerator.next_id()
         self.semantic = semantic or TimeNetSematic()
         self.region = region
@@ -52,12 +61,35 @@ class NetContext:
         self.initial_marking = im
         self.final_marking = fm
         self.strategy = strategy or default_strategy
+        self._topology = None
+        self._region_index = None
+        self.step_cache = StepCache(step_cache_size)
+
+    @property
+    def compiled(self) -> CompiledNet:
+        return CompiledNet.of(self.net)
+
+    @property
+    def topology(self) -> NetTopology:
+        compiled = self.compiled
+        if self._topology is None or self._topology.compiled is not compiled:
+            self._topology = NetTopology(compiled, self.final_marking)
+
+        return self._topology
+
+    @property
+    def region_index(self) -> RegionIndex:
+        if self._region_index is None or self._region_index.root is not self.region:
+            self._region_index = RegionIndex(self.region, self.net)
+
+        return self._region_index
 
     @classmethod
-    def from_region(cls, region: RegionModelType, strategy: object = None):
+    def from_region(cls, region: RegionModelType, strategy: object = None, semantic: SemanticType = None,
+                    step_cache_size: int = 1024):
         net, im, fm = from_region(region)
 
-        return NetContext(region, net, im, fm, strategy)
+        return NetContext(region, net, im, fm, strategy, semantic=semantic, step_cache_size=step_cache_size)
 
     def __eq__(self, other):
         return isinstance(other, NetContext) and other._id == self._id
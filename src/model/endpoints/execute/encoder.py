@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Collection
+
+from model.endpoints.execute.request import DEFAULT_RESPONSE_FIELDS, TreeViewModel
+from model.endpoints.execute.response import petri_net_to_dot, render_spin_svg
+from model.petri_net.time_spin import ArrayTimeMarking
+from model.region import RegionType
+from utils import logging_utils
+
+if TYPE_CHECKING:
+    from model.types import RegionModelType, PetriNetType, MarkingType, ExTreeType, SnapshotType, NodeType
+
+logger = logging_utils.get_logger(__name__)
+
+# Encoder of the execute response built directly from the server objects.
+#
+# The server built all of the data itself, so it is not validated again: the functions below build, in one pass,
+# the JSON ready content described by the models of `response.py`, as `ExecuteResponse.model_dump(mode="json",
+# exclude_none=True, exclude_defaults=True)` renders it, with the keys in the order of the fields of the models.
+# tests/model/test_encoder.py checks the content against the models.
+
+
+def encode_response(region: RegionModelType, petri_net: PetriNetType, im: MarkingType, fm: MarkingType,
+                    extree: ExTreeType, session_id: str | None = None,
+                    fields: Collection[str] | None = None, since_version: int | None = None,
+                    view: TreeViewModel | None = None) -> dict[str, Any]:
+    """
+    JSON ready content of the execute response (see `ExecuteResponse`).
+    Only the parts listed in `fields` are built, all of them when `fields` is None. The session id is always returned.
+    The delta of the execution tree holds the nodes added after `since_version`, none when it is None.
+    The window of the execution tree follows `view`, the default `TreeViewModel` when it is None.
+    """
+    logger.debug("Encoding response with fields %s", fields)
+    if fields is None:
+        fields = DEFAULT_RESPONSE_FIELDS
+
+    content = {}
+    if "bpmn" in fields:
+        content["bpmn"] = region.model_dump(mode="json", exclude_unset=True, exclude_none=True, exclude_defaults=True)
+    if "petri_net" in fields:
+        content["petri_net"] = petri_net_to_dict(petri_net, im, fm)
+
+    marking = extree.current_node.snapshot.marking
+    if "petri_net_dot" in fields:
+        content["petri_net_dot"] = petri_net_to_dot(petri_net, marking, fm.tokens)
+    if "spin_svg" in fields:
+        spin_svg = render_spin_svg(region, petri_net, marking)
+        if spin_svg is not None:
+            content["spin_svg"] = spin_svg
+
+    if any(f == "execution_tree" or f.startswith("execution_tree.") for f in fields):
+        tree = {}
+        if "execution_tree" in fields:
+            tree["root"] = extree_to_dict(extree)
+        tree["current_node"] = extree.current_node.id
+        if "execution_tree.current" in fields:
+            tree["current"] = node_to_dict(extree.current_node)
+        if "execution_tree.delta" in fields:
+            base_version = extree.version if since_version is None else since_version
+            tree["base_version"] = base_version
+            tree["version"] = extree.version
+            tree["nodes"] = [delta_node_to_dict(node) for node in extree.nodes_since(base_version)]
+        if "execution_tree.view" in fields:
+            tree["view"] = view_to_dict(extree, view or TreeViewModel())
+        content["execution_tree"] = tree
+
+    if session_id is not None:
+        content["session_id"] = session_id
+
+    return content
+
+
+def petri_net_to_dict(petri_net: PetriNetType, im: MarkingType, fm: MarkingType) -> dict[str, Any]:
+    """
+    JSON ready content of a `PetriNetModel`.
+    """
+    transitions = []
+    for t in petri_net.transitions:
+        content = {"id": t.name}
+        _put(content, "label", t.region_label)
+        _put(content, "region_id", t.region_id)
+        _put(content, "region_type", _region_type(t.region_type))
+        if t.probability is not None and float(t.probability) != 1:
+            content["probability"] = float(t.probability)
+        if t.stop:
+            content["stop"] = True
+        duration = getattr(t, "duration", None)
+        _put(content, "duration", float(duration) if duration is not None else None)
+        _put(content, "impacts", _floats(getattr(t, "impacts", None)))
+        transitions.append(content)
+
+    places = []
+    for p in petri_net.places:
+        content = {"id": p.name}
+        _put(content, "label", p.region_label)
+        _put(content, "region_type", _region_type(p.region_type))
+        _put(content, "entry_region_id", p.entry_id)
+        _put(content, "exit_region_id", p.exit_id)
+        if float(p.duration) != 0:
+            content["duration"] = float(p.duration)
+        _put(content, "impacts", _floats(p.impacts))
+        _put(content, "visit_limit", p.visit_limit)
+        places.append(content)
+
+    arcs = []
+    for a in petri_net.arcs:
+        content = {"source": a.source.name, "target": a.target.name}
+        _put(content, "weight", a.weight)
+        arcs.append(content)
+
+    content = {"name": petri_net.name} if petri_net.name else {}
+    content.update(transitions=transitions, places=places, arcs=arcs, initial_marking=marking_to_dict(im),
+                   final_marking=marking_to_dict(fm))
+    return content
+
+
+def marking_to_dict(marking: MarkingType) -> dict[str, dict[str, Any]]:
+    """
+    JSON ready content of a marking, by place name. The vectors of an ArrayTimeMarking are converted once instead
+    of reading the places one at a time.
+    """
+    if not isinstance(marking, ArrayTimeMarking):
+        result = {}
+        for place in marking.keys():
+            item = marking[place]
+            result[place.name] = {"token": item.token, "age": item.age, "visit_count": item.visit_count}
+        return result
+
+    index = marking.compiled.place_index
+    tokens = marking.token_array.tolist()
+    ages = marking.age_array.tolist()
+    visit_counts = marking.visit_array.tolist()
+    result = {}
+    for place in marking.keys():
+        p = index[place]
+        result[place.name] = {"token": tokens[p], "age": ages[p], "visit_count": visit_counts[p]}
+    return result
+
+
+def snapshot_to_dict(snapshot: SnapshotType) -> dict[str, Any]:
+    """
+    JSON ready content of a `SnapshotModel`.
+    """
+    return {
+        "marking": marking_to_dict(snapshot.marking),
+        "probability": float(snapshot.probability),
+        "impacts": snapshot.impacts.tolist(),
+        "execution_time": float(snapshot.execution_time),
+        "status": {k: _enum_value(v) for k, v in snapshot.status.items()},
+        "decisions": [_enum_value(d) for d in snapshot.decisions],
+        "choices": [_enum_value(c) for c in snapshot.choices],
+    }
+
+
+def node_to_dict(node: NodeType) -> dict[str, Any]:
+    """
+    JSON ready content of a `NodeModel`, without the children.
+    """
+    return {"name": node.name, "id": node.id, "snapshot": snapshot_to_dict(node.snapshot)}
+
+
+def delta_node_to_dict(node: NodeType) -> dict[str, Any]:
+    """
+    JSON ready content of a `DeltaNodeModel`: the node with the id of its parent and without its children.
+    """
+    content = {"name": node.name, "id": node.id}
+    if node.parent is not None:
+        content["parent"] = node.parent.id
+    content["snapshot"] = snapshot_to_dict(node.snapshot)
+    return content
+
+
+def extree_to_dict(extree: ExTreeType) -> dict[str, Any]:
+    """
+    JSON ready content of the `NodeModel` of the root of the tree, with its children. The tree is walked with a
+    stack, so that deep trees do not hit the recursion limit.
+    """
+    root = node_to_dict(extree.root)
+    stack = [(extree.root, root)]
+    while stack:
+        node, content = stack.pop()
+        children = node.children
+        if children:
+            content["children"] = [node_to_dict(child) for child in children]
+            stack.extend(zip(children, content["children"]))
+
+    return root
+
+
+def window_node_to_dict(node: NodeType, depth: int = 0, offset: int = 0, limit: int | None = None) -> dict[str, Any]:
+    """
+    JSON ready content of a `WindowNodeModel`: the node and its subtree down to `depth` levels.
+    :param node: Node to convert.
+    :param depth: Levels of the subtree to convert, 0 converts the node alone.
+    :param offset: First child of the node to convert, the deeper nodes start from their first child.
+    :param limit: Children converted per node, None converts all of them.
+    """
+    content = delta_node_to_dict(node)
+    children = node.children
+    if children:
+        content["children_count"] = len(children)
+    if depth > 0:
+        page = [window_node_to_dict(child, depth - 1, 0, limit)
+                for child in children[offset:None if limit is None else offset + limit]]
+        if page:
+            content["children"] = page
+
+    return content
+
+
+def view_to_dict(extree: ExTreeType, view: TreeViewModel) -> dict[str, Any]:
+    """
+    JSON ready content of a `ViewModel`. The subtree of the node is bounded by the depth and the limit of the view,
+    the path by its path limit: without one the path holds every ancestor and grows with the depth of the node.
+    :raise ValueError: if the node of the view is not in the tree.
+    """
+    node = extree.current_node if view.node is None else extree.get_node_by_id(view.node)
+    if node is None:
+        logger.error("Node %s of the view not found in the execution tree", view.node)
+        raise ValueError(f"Node '{view.node}' not found in the execution tree.")
+
+    content = {}
+    path = node.path[:-1]
+    if path:
+        content["path_count"] = len(path)
+        if view.path_limit is not None:
+            path = path[max(len(path) - view.path_limit, 0):]
+        if path:
+            content["path"] = [delta_node_to_dict(n) for n in path]
+    content["node"] = window_node_to_dict(node, view.depth, view.offset, view.limit)
+    return content
+
+
+def _put(content: dict[str, Any], key: str, value):
+    if value is not None:
+        content[key] = value
+
+
+def _floats(values) -> list[float] | None:
+    return None if values is None else [float(v) for v in values]
+
+
+def _region_type(value) -> str | None:
+    return None if value is None else RegionType(value).value
+
+
+def _enum_value(value):
+    return value.value if isinstance(value, Enum) else value
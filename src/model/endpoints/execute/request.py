@@ -3,8 +3,7 @@ from typing import Tuple, Any, TYPE_CHECKING, TypeAlias
 import pm4py
 import pydantic
 from anytree import Node
-from pm4py.objects.petri_net.utils.petri_utils import get_transition_by_name
-from pydantic import model_validator, BaseModel, ConfigDict, Field
+from pydantic import model_validator, BaseModel, ConfigDict, Field, PrivateAttr
 
 from model.extree import ExecutionTree
 from model.petri_net.time_spin import TimeMarking
@@ -14,14 +13,26 @@ from utils.net_utils import add_arc_from_to, get_place_by_name
 from model.extree.node import Snapshot, ExecutionTreeNode
 
 if TYPE_CHECKING:
-	from model.types import TransitionType, MarkingType, ExTreeType
+	from model.types import TransitionType, MarkingType, ExTreeType, PlaceType
 
 logger = logging_utils.get_logger(__name__)
 
 MarkingModel: TypeAlias = dict[str, dict[str, Any]]
 
+# Parts of the execute response a client can ask for with `ExecuteRequest.fields`
+RESPONSE_FIELDS = ("bpmn", "petri_net", "petri_net_dot", "spin_svg", "execution_tree", "execution_tree.current",
+				   "execution_tree.delta", "execution_tree.view")
+DEFAULT_RESPONSE_FIELDS = ("bpmn", "petri_net", "petri_net_dot", "spin_svg", "execution_tree")
 
-def model_to_marking(petri_net_obj: PetriNetModel, marking_model: MarkingModel):
+
+def model_to_marking(petri_net_obj: PetriNetModel, marking_model: MarkingModel,
+					 places: dict[str, PlaceType] | None = None):
+	"""
+	Converts a marking model to a TimeMarking.
+	:param petri_net_obj: Petri net containing the places of the marking.
+	:param marking_model: Marking model to convert.
+	:param places: Optional index from place name to place, used instead of scanning the net for each place.
+	"""
 	logger.debug("Creating marking from model: %s", marking_model)
 	im = pm4py.Marking()
 	age = {}
@@ -30,7 +41,10 @@ def model_to_marking(petri_net_obj: PetriNetModel, marking_model: MarkingModel):
 
 	for place_name in marking_model:
 		place_prop = marking_model[place_name]
-		place = get_place_by_name(net, place_name)      # Works even if typing is not correct
+		if places is not None:
+			place = places.get(place_name)
+		else:
+			place = get_place_by_name(net, place_name)      # Works even if typing is not correct
 		if not place:
 			logger.error("Could not find place %s", place_name)
 			raise ValueError(f"Place '{place_name}' not found in the Petri net.")
@@ -121,6 +135,19 @@ class ExecutionTreeModel(pydantic.BaseModel):
 
 	model_config = ConfigDict(use_enum_values=True)
 
+class TreeViewModel(pydantic.BaseModel):
+	"""
+	Window of the execution tree rendered by the "execution_tree.view" response field: the path from the root to
+	`node` and the subtree of `node` down to `depth` levels, with at most `limit` children per node.
+	The children of `node` are paged by `offset` and `limit`, deeper nodes show their first `limit` children.
+	The path holds the `path_limit` ancestors nearest to `node`, the others are reached by a view on the first of them.
+	"""
+	node: str | None = None  # Node the window is centred on, the current node when None
+	depth: int = Field(default=1, ge=0)  # Levels of the subtree of the node, 0 renders the node alone
+	offset: int = Field(default=0, ge=0)  # First child of the node to render
+	limit: int | None = Field(default=None, ge=1)  # Children rendered per node, None renders all of them
+	path_limit: int | None = Field(default=None, ge=0)  # Ancestors rendered in the path, None renders all of them
+
 from pydantic import field_validator
 from model.region import RegionModel, RegionType
 
@@ -128,20 +155,29 @@ class ExecuteRequest(pydantic.BaseModel):
 	"""
 	Represents a request to execute a command with optional parameters.
 	"""
-	bpmn: RegionModel
+	bpmn: RegionModel | None = None
 	petri_net: PetriNetModel | None = None
 	execution_tree: ExecutionTreeModel | None = None
 	choices: list[str] | None = None
 	time_step: float | None = None  # Time step for TimeStrategy (None = use saturation/CounterExecution)
 	preview: bool = False  # When True, return current state without consuming decisions
+	session_id: str | None = None  # Continue a server-side session instead of sending bpmn, petri_net and execution_tree
+	create_session: bool = False  # When True, keep the simulation state on the server and return its session_id
+	current_node: str | None = None  # Node of the session execution tree to continue from
+	fields: list[str] | None = None  # Parts of the response to render (see RESPONSE_FIELDS), None renders all of them
+	since_version: int | None = None  # Execution tree version held by the client, the base of the delta of a session
+	view: TreeViewModel | None = None  # Window of the "execution_tree.view" response field, the defaults when None
 
 	model_config = ConfigDict(use_enum_values=True)
 
+	# Objects decoded from the request, each one is built at most once per request
+	_decoded: dict[str, Any] = PrivateAttr(default_factory=dict)
+
 	@field_validator("bpmn", mode="before")
 
 	@classmethod
 	def _coerce_bpmn_parse_tree_to_regionmodel(cls, v):
-		if isinstance(v, RegionModel):
+		if v is None or isinstance(v, RegionModel):
 			return v
 
 		if not isinstance(v, dict):
@@ -198,8 +234,35 @@ class ExecuteRequest(pydantic.BaseModel):
 		return result
 
 
+	@field_validator("fields")
+	@classmethod
+	def _check_fields(cls, v):
+		if v is None:
+			return v
+
+		unknown = [f for f in v if f not in RESPONSE_FIELDS]
+		if unknown:
+			logger.error("Unknown response fields: %s", unknown)
+			raise ValueError(f"Unknown response fields {unknown}, valid fields are {list(RESPONSE_FIELDS)}.")
+
+		return v
+
 	@model_validator(mode='after')
 	def check_execution(self):
+		if self.session_id is not None:
+			if self.petri_net is not None or self.execution_tree is not None:
+				logger.error("Session %s provided together with petri_net or execution_tree.", self.session_id)
+				raise ValueError("If 'session_id' is provided, 'petri_net' and 'execution_tree' must not be provided.")
+			return self
+
+		if self.since_version is not None:
+			logger.error("since_version provided without a session.")
+			raise ValueError("'since_version' can only be provided together with 'session_id'.")
+
+		if self.bpmn is None:
+			logger.error("No bpmn provided.")
+			raise ValueError("'bpmn' must be provided when 'session_id' is not.")
+
 		checks = [
 			self.petri_net is not None,
 			self.execution_tree is not None
@@ -241,14 +304,25 @@ class ExecuteRequest(pydantic.BaseModel):
 		"""
 		Converts the PetriNetModel to a PetriNet object.
 		"""
+		decoded = self.decode_petri_net()
+		return decoded[0] if decoded is not None else None
+
+	def decode_petri_net(self) -> tuple[WrapperPetriNet, dict[str, PlaceType], dict[str, TransitionType]] | None:
+		"""
+		Converts the PetriNetModel to a PetriNet object together with its name to place and name to transition indexes.
+		The net is built only once per request, later calls return the same objects.
+		"""
+		if 'petri_net' in self._decoded:
+			return self._decoded['petri_net']
+
 		logger.debug("Converting PetriNet request to PetriNet model")
 		if self.petri_net is None:
 			logger.debug("No Petri net provided. Skipping conversion...")
+			self._decoded['petri_net'] = None
 			return None
 
 		petri_net = WrapperPetriNet(name=self.petri_net.name)
 
-		transitions = {}
 		for transition in self.petri_net.transitions:
 			logger.debug("Converting transition %s", transition)
 			net_transition = WrapperPetriNet.Transition(name=transition.id, label=transition.label)
@@ -260,11 +334,9 @@ class ExecuteRequest(pydantic.BaseModel):
 			net_transition.duration = transition.duration
 			net_transition.impacts = transition.impacts
 
-			transitions[transition.id] = net_transition
 			petri_net.transitions.add(net_transition)
 			logger.debug("Transition added: %s", net_transition)
 
-		places = {}
 		for place in self.petri_net.places:
 			logger.debug("Converting place %s", place)
 			net_place = WrapperPetriNet.Place(name=place.id)
@@ -276,10 +348,10 @@ class ExecuteRequest(pydantic.BaseModel):
 			net_place.impacts = place.impacts
 			net_place.visit_limit = place.visit_limit
 
-			places[place.id] = net_place
 			petri_net.places.add(net_place)
 			logger.debug("Place added: %s", net_place)
 
+		places, transitions = petri_net.places.by_name, petri_net.transitions.by_name
 		for arc in self.petri_net.arcs:
 			logger.debug("Converting arc %s", arc)
 			source = None
@@ -296,8 +368,8 @@ class ExecuteRequest(pydantic.BaseModel):
 
 			add_arc_from_to(source, target, petri_net)
 
-
-		return petri_net
+		self._decoded['petri_net'] = petri_net, places, transitions
+		return self._decoded['petri_net']
 
 	@property
 	def initial_marking(self) -> MarkingType | None:
@@ -312,7 +384,11 @@ class ExecuteRequest(pydantic.BaseModel):
 			logger.error("No initial marking provided in the petri net. Trying to infer it from net")
 			return None
 
-		return model_to_marking(self.petri_net_obj, self.petri_net.initial_marking)
+		if 'initial_marking' not in self._decoded:
+			net, places, _ = self.decode_petri_net()
+			self._decoded['initial_marking'] = model_to_marking(net, self.petri_net.initial_marking, places)
+
+		return self._decoded['initial_marking']
 
 	@property
 	def final_marking(self) -> MarkingType | None:
@@ -326,7 +402,11 @@ class ExecuteRequest(pydantic.BaseModel):
 			logger.warning("No final marking provided, trying to infer it from net.")
 			return None
 
-		return model_to_marking(self.petri_net_obj, self.petri_net.final_marking)
+		if 'final_marking' not in self._decoded:
+			net, places, _ = self.decode_petri_net()
+			self._decoded['final_marking'] = model_to_marking(net, self.petri_net.final_marking, places)
+
+		return self._decoded['final_marking']
 
 	@property
 	def execution_tree_obj(self) -> ExTreeType | None:
@@ -337,7 +417,11 @@ class ExecuteRequest(pydantic.BaseModel):
 			logger.debug("No execution tree provided, skipping conversion.")
 			return None
 
+		if 'execution_tree' in self._decoded:
+			return self._decoded['execution_tree']
+
 		logger.debug("Converting execution tree to an ExTree model")
+		net, places, _ = self.decode_petri_net()
 
 		def convert_node(node: ExecutionTreeModel.NodeModel, parent: ExecutionTreeNode | None = None) -> Node:
 			logger.debug("Converting node %s, parent %s", node.name, parent.name if parent else None)
@@ -346,7 +430,7 @@ class ExecuteRequest(pydantic.BaseModel):
 				name=node.name,
 				_id=node.id,
 				snapshot=Snapshot(#TODO Daniel
-					marking=model_to_marking(self.petri_net_obj, node.snapshot.marking),
+					marking=model_to_marking(net, node.snapshot.marking, places),
 					probability=node.snapshot.probability,
 					impacts=node.snapshot.impacts,
 					time=node.snapshot.execution_time,
@@ -373,6 +457,7 @@ class ExecuteRequest(pydantic.BaseModel):
 			logger.error(f"Failed to set current execution tree. Current node id: {self.execution_tree.current_node} not found.")
 			raise ValueError("Current node not found in the execution tree.")
 
+		self._decoded['execution_tree'] = ex_tree
 		return ex_tree
 
 	@property
@@ -388,9 +473,10 @@ class ExecuteRequest(pydantic.BaseModel):
 		if not self.choices:
 			return []
 
+		_, _, net_transitions = self.decode_petri_net()
 		transitions = []
 		for choice in self.choices:
-			t = get_transition_by_name(self.petri_net_obj, choice)
+			t = net_transitions.get(choice)
 			if not t:
 				logger.warning("Choice '%s' not found in the Petri net transitions.", choice)
 				continue
@@ -2,91 +2,85 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from anytree.exporter import DictExporter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from model.endpoints.execute.request import PetriNetModel, ExecutionTreeModel
 from model.region import RegionModel
 from utils import logging_utils
 
 if TYPE_CHECKING:
-    from model.types import RegionModelType, PetriNetType, MarkingType, ExTreeType, SnapshotType
+    from model.types import RegionModelType, PetriNetType, MarkingType
 
 logger = logging_utils.get_logger(__name__)
 
+
+class ExecutionTreeResponse(ExecutionTreeModel):
+    """
+    Execution tree of a response: the whole tree from `root`, the `current` node alone (without its children), the
+    delta since the version of the tree held by the client, a window of the tree (see `TreeViewModel`), or any of
+    them together.
+    """
+
+    class DeltaNodeModel(BaseModel):
+        """
+        Node added to the execution tree, with the id of its parent.
+        """
+        name: str
+        id: str
+        parent: str | None = None
+        snapshot: ExecutionTreeModel.NodeModel.SnapshotModel
+
+    class WindowNodeModel(DeltaNodeModel):
+        """
+        Node of a window of the execution tree, with a page of its children and the number of all of them.
+        """
+        children_count: int = 0
+        children: list[ExecutionTreeResponse.WindowNodeModel] = Field(default_factory=list)
+
+    class ViewModel(BaseModel):
+        """
+        Window of the execution tree: the ancestors of `node` from the root and the subtree of `node`.
+        The path holds the ancestors nearest to `node` (see `TreeViewModel.path_limit`) out of `path_count`.
+        """
+        path_count: int = 0
+        path: list[ExecutionTreeResponse.DeltaNodeModel] = Field(default_factory=list)
+        node: ExecutionTreeResponse.WindowNodeModel
+
+    root: ExecutionTreeModel.NodeModel | None = None
+    current: ExecutionTreeModel.NodeModel | None = None
+    base_version: int | None = None
+    version: int | None = None
+    nodes: list[DeltaNodeModel] | None = None
+    view: ViewModel | None = None
+
+
 class ExecuteResponse(BaseModel):
     """
     Represents the response structure for an execution request.
+    The parts the client did not ask for (see `ExecuteRequest.fields`) are None and left out of the response.
+    The content is built by `encode_response` (see encoder.py) and documented by these models, None and default
+    values are left out as in `model_dump(exclude_none=True, exclude_defaults=True)`.
     """
-    bpmn: RegionModel
-    petri_net: PetriNetModel
+    bpmn: RegionModel | None = None
+    petri_net: PetriNetModel | None = None
     petri_net_dot: str | None = None
     spin_svg: str | None = None
-    execution_tree: ExecutionTreeModel
+    execution_tree: ExecutionTreeResponse | None = None
+    session_id: str | None = None
 
 
-def create_response(region: RegionModelType, petri_net: PetriNetType, im: MarkingType, fm: MarkingType,
-                    extree: ExTreeType) -> ExecuteResponse:
+def render_spin_svg(region: RegionModelType, petri_net: PetriNetType, marking: MarkingType) -> str | None:
     """
-    Creates a response object containing the BPMN region, Petri net model, and execution tree.
+    Renders the SPIN SVG visualization of a marking.
+    :return: the SVG or None if it could not be generated.
     """
-    logger.debug("Creating response")
-    petri_net_model = petri_net_to_model(petri_net, im, fm)
-    execution_tree_model = extree_to_model(extree)
-    
-    # Generate SPIN SVG visualization
     try:
         from spin_visualizzation import spin_to_svg
-        spin_svg = spin_to_svg(petri_net, width=800, height=400, region=region,
-                               marking=extree.current_node.snapshot.marking)
+        return spin_to_svg(petri_net, width=800, height=400, region=region, marking=marking)
     except Exception as e:
         import traceback
         logger.error(f"Failed to generate SVG: {e}\n{traceback.format_exc()}")
-        spin_svg = None
-
-    return ExecuteResponse(bpmn=region, petri_net=petri_net_model,
-                           petri_net_dot=petri_net_to_dot(petri_net, extree.current_node.snapshot.marking, fm.tokens),
-                           spin_svg=spin_svg,
-                           execution_tree=execution_tree_model)
-
-
-def petri_net_to_model(petri_net: PetriNetType, im: MarkingType, fm: MarkingType) -> PetriNetModel:
-    logger.debug("Creating petri net response model")
-    transitions = []
-    for t in petri_net.transitions:
-        obj = PetriNetModel.TransitionModel(id=t.name,
-                                            label=t.region_label,
-                                            region_id=t.region_id,
-                                            region_type=t.region_type,
-                                            probability=t.probability,
-                                            stop=t.stop,
-                                            duration=getattr(t, "duration", None),
-                                            impacts=getattr(t, "impacts", None),
-                                            )
-        transitions.append(obj)
-
-    places = []
-    for p in petri_net.places:
-        obj = PetriNetModel.PlaceModel(id=p.name,
-                                       label=p.region_label,
-                                       region_type=p.region_type,
-                                       entry_region_id=p.entry_id,
-                                       exit_region_id=p.exit_id,
-                                       duration=p.duration,
-                                       impacts=p.impacts,
-                                       visit_limit=p.visit_limit)
-        places.append(obj)
-
-    arcs = []
-    for a in petri_net.arcs:
-        obj = PetriNetModel.ArcModel(source=a.source.name, target=a.target.name, weight=a.weight)
-        arcs.append(obj)
-
-    model_im = marking_to_model(im)
-    model_fm = marking_to_model(fm)
-
-    return PetriNetModel(name=petri_net.name, transitions=transitions, places=places, arcs=arcs,
-                         initial_marking=model_im, final_marking=model_fm)
+        return None
 
 
 def petri_net_to_dot(petri_net: PetriNetType, im: MarkingType, fm: MarkingType) -> str:
@@ -109,56 +103,3 @@ def petri_net_to_dot(petri_net: PetriNetType, im: MarkingType, fm: MarkingType)
         dot_string = getattr(gviz, "source", "")
 
     return dot_string
-
-
-def marking_to_model(marking: MarkingType) -> dict[str, dict[str, float]]:
-    """
-    Converts a marking to a model representation.
-    """
-    logger.debug("Converting marking to model representation")
-    result = {}
-    for place in marking.keys():
-        result[place.name] = {
-            "token": marking[place].token,
-            "age": marking[place].age,
-            "visit_count": marking[place].visit_count
-        }
-    return result
-
-
-def extree_to_model(extree: ExTreeType) -> ExecutionTreeModel:
-    """
-    Converts an execution tree to a model representation.
-    """
-    logger.debug("Converting execution tree to model representation")
-    def attriter(attrs):
-        result = []
-        for k, v in attrs:
-            if k == 'snapshot':
-                result.append((k, snapshot_to_model(v)))
-            else:
-                result.append((k, v))
-
-        return result
-
-    exporter = DictExporter(attriter=attriter)
-    nodes_dict = exporter.export(extree.root)
-    current_node = extree.current_node.id
-    root = ExecutionTreeModel.NodeModel.model_validate(nodes_dict)
-
-    return ExecutionTreeModel(root=root, current_node=current_node)
-
-
-def snapshot_to_model(snapshot: SnapshotType) -> ExecutionTreeModel.NodeModel.SnapshotModel:
-    """
-    Converts a snapshot to a model representation.
-    """
-    logger.debug("Converting snapshot to model representation")
-    return ExecutionTreeModel.NodeModel.SnapshotModel(marking=marking_to_model(snapshot.marking),
-                                                      probability=snapshot.probability,
-                                                      impacts=snapshot.impacts,
-                                                      execution_time=snapshot.execution_time,
-                                                      status=snapshot.status,
-                                                      decisions=snapshot.decisions,
-                                                      choices=snapshot.choices
-                                                      )
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Coroutine
+
+import msgpack
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+from utils import logging_utils
+
+logger = logging_utils.get_logger(__name__)
+
+# MessagePack wire format of the execute requests and responses.
+#
+# The content is the one of the JSON format, with two changes that remove most of the repeated strings:
+#   - the names of the places and transitions are sent once in the top level "strings" table, and referenced by
+#     their index in the table wherever the JSON format has a name: the ids of the places and transitions of the
+#     petri net, the source and target of its arcs, the keys of the markings and the decisions of the snapshots
+#     and the choices of the request;
+#   - the items of a marking are [token, age, visit_count] arrays instead of objects.
+# JSON stays the default format, MessagePack is used when the client sends it as `Content-Type` (see `MsgpackRoute`)
+# or asks for it in `Accept` (see `accepts_msgpack`).
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+STRINGS_KEY = "strings"
+
+
+def is_msgpack(content_type: str | None) -> bool:
+    """
+    Whether a `Content-Type` header denotes MessagePack.
+    """
+    return content_type is not None and content_type.split(";")[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+
+def accepts_msgpack(accept: str | None) -> bool:
+    """
+    Whether MessagePack is the preferred format of an `Accept` header. JSON wins ties and is used when the header
+    is missing or names neither of the two formats.
+    """
+    if not accept:
+        return False
+
+    json_quality = msgpack_quality = 0.0
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.lower()
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            json_quality = max(json_quality, quality)
+
+    return msgpack_quality > json_quality
+
+
+def pack(content: dict[str, Any]) -> bytes:
+    """
+    Encode the content of an execute request or response to MessagePack, with the string table.
+    The content is not modified.
+    """
+    table: dict[Any, int] = {}
+    packed = _compact(content, table)
+    if table:
+        packed[STRINGS_KEY] = list(table)
+
+    return msgpack.packb(packed)
+
+
+def unpack(data: bytes) -> dict[str, Any]:
+    """
+    Decode a MessagePack execute request or response to the content of the JSON format.
+    :raise ValueError: if the data is not a MessagePack map or references a string missing from the table.
+    """
+    try:
+        packed = msgpack.unpackb(data, strict_map_key=False)
+    except (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, ValueError) as e:
+        raise ValueError(f"Invalid MessagePack content: {e}") from e
+    if not isinstance(packed, dict):
+        raise ValueError("MessagePack content must be a map.")
+
+    table = packed.pop(STRINGS_KEY, [])
+    try:
+        return _expand(packed, table)
+    except (IndexError, KeyError, TypeError, AttributeError) as e:
+        logger.error("Invalid MessagePack content: %s", e)
+        raise ValueError(f"Invalid MessagePack content: {e}") from e
+
+
+class MsgpackRequest(Request):
+    """
+    Request with a MessagePack body. `json()` returns the decoded content, in the JSON format (see `unpack`).
+    """
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = unpack(await self.body())
+        return self._json
+
+
+class MsgpackRoute(APIRoute):
+    """
+    Route that accepts MessagePack request bodies besides the JSON ones.
+    FastAPI only reads JSON bodies, so a MessagePack request is handed to it as a MsgpackRequest with a JSON
+    content type: the body is then validated against the models of the endpoint as a JSON one.
+    An invalid MessagePack body is answered with 400, as an invalid JSON one.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if is_msgpack(request.headers.get("content-type")):
+                scope = dict(request.scope)
+                scope["headers"] = [(key, b"application/json" if key == b"content-type" else value)
+                                    for key, value in request.scope["headers"]]
+                request = MsgpackRequest(scope, request.receive)
+            return await handler(request)
+
+        return route_handler
+
+
+def _compact(content: dict[str, Any], table: dict[Any, int]) -> dict[str, Any]:
+    def ref(name) -> int:
+        index = table.get(name)
+        if index is None:
+            index = table[name] = len(table)
+        return index
+
+    def marking(value: dict) -> dict:
+        return {ref(name): [item.get("token", 0), item.get("age", 0.0), item.get("visit_count", 0)]
+                for name, item in value.items()}
+
+    return _transform(content, ref, marking)
+
+
+def _expand(packed: dict[str, Any], table: list) -> dict[str, Any]:
+    def ref(index: int):
+        if not isinstance(index, int) or index < 0:
+            raise IndexError(f"string index {index!r} out of the table")
+        return table[index]
+
+    def marking(value: dict) -> dict:
+        return {ref(index): {"token": item[0], "age": item[1], "visit_count": item[2]}
+                for index, item in value.items()}
+
+    return _transform(packed, ref, marking)
+
+
+def _transform(content: dict[str, Any], ref, marking) -> dict[str, Any]:
+    """
+    Copy an execute content, applying `ref` to the names and `marking` to the markings. Parts that are not there
+    are left out.
+    """
+    def node(value: dict) -> dict:
+        value = dict(value)
+        snapshot = value.get("snapshot")
+        if snapshot is not None:
+            snapshot = value["snapshot"] = dict(snapshot)
+            if snapshot.get("marking") is not None:
+                snapshot["marking"] = marking(snapshot["marking"])
+            if snapshot.get("decisions") is not None:
+                snapshot["decisions"] = [ref(d) for d in snapshot["decisions"]]
+        return value
+
+    content = dict(content)
+
+    petri_net = content.get("petri_net")
+    if petri_net is not None:
+        petri_net = content["petri_net"] = dict(petri_net)
+        for key in ("transitions", "places"):
+            if key in petri_net:
+                petri_net[key] = [dict(item, id=ref(item["id"])) for item in petri_net[key]]
+        if "arcs" in petri_net:
+            petri_net["arcs"] = [dict(arc, source=ref(arc["source"]), target=ref(arc["target"]))
+                                 for arc in petri_net["arcs"]]
+        for key in ("initial_marking", "final_marking"):
+            if key in petri_net:
+                petri_net[key] = marking(petri_net[key])
+
+    if content.get("choices") is not None:
+        content["choices"] = [ref(c) for c in content["choices"]]
+
+    tree = content.get("execution_tree")
+    if tree is not None:
+        tree = content["execution_tree"] = dict(tree)
+        for key in ("root", "current"):
+            if tree.get(key) is not None:
+                tree[key] = _transform_tree(tree[key], node)
+        if tree.get("nodes") is not None:
+            tree["nodes"] = [node(n) for n in tree["nodes"]]
+        view = tree.get("view")
+        if view is not None:
+            view = tree["view"] = dict(view)
+            if "path" in view:
+                view["path"] = [node(n) for n in view["path"]]
+            if "node" in view:
+                view["node"] = _transform_tree(view["node"], node)
+
+    return content
+
+
+def _transform_tree(root: dict, node) -> dict:
+    # The tree is walked with a stack, so that deep trees do not hit the recursion limit
+    result = node(root)
+    stack = [result]
+    while stack:
+        parent = stack.pop()
+        children = parent.get("children")
+        if children:
+            parent["children"] = [node(child) for child in children]
+            stack.extend(parent["children"])
+
+    return result
@@ -1,11 +1,14 @@
 #  Copyright (c) 2025.
 from __future__ import annotations
 
-from copy import copy
-from typing import TYPE_CHECKING
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping
 
+import numpy as np
 from anytree import NodeMixin
 
+from utils.net_utils import freeze_impacts
+
 if TYPE_CHECKING:
 	from model.types import MarkingType
 
@@ -14,57 +17,74 @@ class Snapshot:
 	"""
 	Snapshot of a Petri net at a specific state during execution.
 
+	Snapshots are frozen: the containers are stored as tuples, read only mappings and read only arrays, so the
+	values are shared with the readers without copying them and attributes cannot be set after creation.
+
 	Attributes:
 		marking (MarkingType): The current marking of the Petri net.
 		probability (float): The probability of reaching this marking.
-		impacts (list[float]): The impacts associated with this marking.
+		impacts (np.ndarray): The impacts associated with this marking, as a read only float array.
 		execution_time (float): The time taken to reach this marking.
+		status (Mapping): Status of the regions by region id.
+		decisions (tuple): Decisions taken to reach this marking.
+		choices (tuple): Regions with a choice to take from this marking.
 	"""
+	__slots__ = ('__marking', '__probability', '__impacts', '__exec_time', '__status', '__decisions', '__choices')
 	__marking: MarkingType
 	__probability: float
-	__impacts: list[float]
+	__impacts: np.ndarray
 	__exec_time: float
-	__status: dict
-	__decisions: list
-	__choices: list
+	__status: Mapping
+	__decisions: tuple
+	__choices: tuple
+
+	def __init__(self, marking: MarkingType, probability: float, impacts: np.ndarray | list[float], time: float, status: dict, decisions:list, choices:list):
+		set_attribute = super().__setattr__
+		set_attribute('_Snapshot__marking', marking)
+		set_attribute('_Snapshot__probability', probability)
+		set_attribute('_Snapshot__impacts', freeze_impacts(impacts))
+		set_attribute('_Snapshot__exec_time', time)
+
+		set_attribute('_Snapshot__status', MappingProxyType(dict(status)))
+		set_attribute('_Snapshot__decisions', tuple(decisions))
+		set_attribute('_Snapshot__choices', tuple(choices))
+
+	def __setattr__(self, key, value):
+		raise AttributeError("Snapshot is immutable")
 
-	def __init__(self, marking: MarkingType, probability: float, impacts: list[float], time: float, status: dict, decisions:list, choices:list):
-		self.__marking = marking
-		self.__probability = probability
-		self.__impacts = impacts
-		self.__exec_time = time
+	def __copy__(self):
+		return self
 
-		self.__status = status
-		self.__decisions = decisions
-		self.__choices = choices
+	def __deepcopy__(self, memodict=None):
+		return self
 
 	@property
 	def marking(self) -> MarkingType:
-		return copy(self.__marking)
+		return self.__marking
 
 	@property
 	def probability(self) -> float:
 		return self.__probability
 
 	@property
-	def impacts(self) -> list[float]:
-		return copy(self.__impacts)
+	def impacts(self) -> np.ndarray:
+		return self.__impacts
 
 	@property
 	def execution_time(self) -> float:
 		return self.__exec_time
 
 	@property
-	def status(self) -> dict:
-		return copy(self.__status)
+	def status(self) -> Mapping:
+		return self.__status
 
 	@property
-	def decisions(self) -> list:
-		return copy(self.__decisions)
+	def decisions(self) -> tuple:
+		return self.__decisions
 
 	@property
-	def choices(self) -> list:
-		return copy(self.__choices)
+	def choices(self) -> tuple:
+		return self.__choices
 
 	def __eq__(self, other) -> bool:
 		if not isinstance(other, Snapshot):
@@ -72,7 +92,7 @@ class Snapshot:
 
 		if other.__marking != self.__marking:
 			return False
-		if other.__impacts != self.__impacts:
+		if not np.array_equal(other.__impacts, self.__impacts):
 			return False
 		if other.__probability != self.__probability:
 			return False
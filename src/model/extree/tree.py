@@ -5,13 +5,14 @@ from __future__ import annotations
 import logging
 from typing import Iterator, TYPE_CHECKING
 
-from anytree import Node, PreOrderIter, RenderTree, findall_by_attr, findall
+from anytree import Node, PreOrderIter, RenderTree, findall
 
 from model.extree import ExecutionTreeNode
-from model.status import ActivityState, propagate_status
+from model.region_index import RegionIndex
+from model.status import ActivityState, propagate_status, resolve_skipped
 from strategy.execution import add_impacts
 from utils import logging_utils
-from utils.net_utils import get_empty_impacts, is_final_marking
+from utils.net_utils import is_final_marking
 from model.extree.node import Snapshot
 
 if TYPE_CHECKING:
@@ -28,21 +29,29 @@ def serial_generator(initial: int = 1):
 		n += 1
 
 
-
-
-
 class ExecutionTree:
 	"""
 	ExTree is a tree structure for managing and traversing snapshots of Petri net markings.
 
+	The tree keeps its nodes by id and the children of each node by marking, so that lookups and
+	insertions do not depend on the size of the tree. Nodes must be added through `add_snapshot`.
+
+	Nodes are numbered in insertion order, the nodes of the root passed to the constructor first in pre-order.
+	The version of the tree is the number of the last node, so the nodes added after version `v` are the
+	ones returned by `nodes_since(v)`.
+
 	Attributes:
 		current_node (Node): The current node in the tree.
 		root (Node): The root node of the tree.
+		version (int): Number of nodes added after the root.
 	"""
 	__separator: str = '/'
 	current_node: NodeType
 	__root: NodeType
 	__id_generator: Iterator[int]
+	__nodes: dict[str, NodeType]
+	__order: list[NodeType]
+	__children: dict[str, dict[MarkingType, NodeType]]
 
 	# Node structure: name[optional],id,snapshot[object of interest]
 	def __init__(self, root: SnapshotType | NodeType, generator: Iterator[int] = None):
@@ -51,50 +60,46 @@ class ExecutionTree:
 			logger.error("Cannot initialize ExecutionTree with None root")
 			raise ValueError("Root Snapshot can't be None")
 
+		self.__nodes = {}
+		self.__order = []
+		self.__children = {}
+
 		if isinstance(root, ExecutionTreeNode):
 			self.__root = root
 			self.current_node = root
-			if generator is None:
-				max_id = -1
-				for node in PreOrderIter(root):
-					max_id = max(max_id, int(node.id))
+			max_id = -1
+			for node in PreOrderIter(root):
+				self.__index(node)
+				max_id = max(max_id, int(node.id))
 
+			if generator is None:
 				self.__id_generator = serial_generator(max_id + 1)
 			return
 
 		_root = ExecutionTreeNode(name="Root", _id='0', snapshot=root)
 		self.__root = _root
 		self.current_node = _root
+		self.__index(_root)
+
+	def __index(self, node: NodeType):
+		if node.id in self.__nodes:
+			logger.warning(f"Duplicate node id {node.id}, keeping the first node")
+			return
+
+		self.__nodes[node.id] = node
+		self.__order.append(node)
+		if node.parent is not None:
+			self.__children.setdefault(node.parent.id, {}).setdefault(node.snapshot.marking, node)
+
+	def __get_child(self, parent: NodeType, marking: MarkingType) -> NodeType | None:
+		return self.__children.get(parent.id, {}).get(marking)
 
 	@classmethod
 	def from_context(cls, ctx: ContextType, region: "RegionModelType") -> ExecutionTree:
-		places = ctx.net.places
-
-		place = None
-		for _p in places:
-			if _p.impacts:
-				place = _p
-				break
-
-		place_impacts = place.impacts
-		impacts = [0] * len(place_impacts)
-
-
-		status_by_region: dict[RegionModelType, ActivityState] = {}
-		def build_status(r: RegionModelType):
-			status_by_region[r] = ActivityState.WAITING
-			if r.children:
-				for child in r.children:
-					build_status(child)
-		build_status(region)
-
-		regions: dict[int, RegionModelType] = {}
-		def build_region_dict(r: RegionModelType):
-			regions[r.id] = r
-			if r.children:
-				for child in r.children:
-					build_region_dict(child)
-		build_region_dict(region)
+		impacts = ctx.topology.empty_impacts()
+
+		regions = ctx.region_index if ctx.region is region else RegionIndex(region, ctx.net)
+		status_by_region: dict[RegionModelType, ActivityState] = {r: ActivityState.WAITING for r in regions.preorder}
 
 		# Initialize statuses from the initial marking so the first snapshot is meaningful.
 		initial_marking = ctx.initial_marking
@@ -114,7 +119,7 @@ class ExecutionTree:
 						status_by_region[region_exit] = ActivityState.COMPLETED
 
 		propagate_status(region, status_by_region)
-		status = {r.id: s for r, s in status_by_region.items()}
+		status = {r.id: s for r, s in resolve_skipped(region, status_by_region).items()}
 
 		extree = ExecutionTree(Snapshot(marking=ctx.initial_marking, probability=1, impacts=impacts, time=0, status=status, decisions=[], choices=[]))
 
@@ -130,12 +135,26 @@ class ExecutionTree:
 	def exists(self, node: NodeType):
 		return node in self
 
+	@property
+	def version(self) -> int:
+		return len(self.__order) - 1
+
+	def nodes_since(self, version: int) -> list[NodeType]:
+		"""
+		Nodes added after a version of the tree, in insertion order, so that parents come before their children.
+		:param version: Version of the tree, between -1 (no node, all the nodes are returned) and `version`.
+		"""
+		if version < -1 or version > self.version:
+			logger.error(f"Version {version} not in [-1, {self.version}]")
+			raise ValueError(f"Unknown execution tree version {version}, the tree is at version {self.version}.")
+
+		return self.__order[version + 1:]
+
 	def get_node_by_id(self, node_id: str):
 		"""
 		Restituisce il nodo con l'ID specificato.
 		"""
-		result = findall_by_attr(self.root, name='id', value=node_id)
-		return list(result)[0] if len(list(result)) == 1 else None
+		return self.__nodes.get(node_id)
 
 	# Costruzione dell'albero
 	def add_snapshot(self, ctx: ContextType, snapshot: SnapshotType, set_as_current: bool = True):
@@ -148,16 +167,16 @@ class ExecutionTree:
 			return self.current_node
 
 		# If exists a node with the same marking under the current parent, return that node
-		for node in self:
-			if node.parent == parent and node.snapshot.marking == snapshot.marking:
-				logger.debug("Snapshot already exists under current parent. Returning existing node.")
-				if set_as_current:
-					self.set_current(node)
+		node = self.__get_child(parent, snapshot.marking)
+		if node is not None:
+			logger.debug("Snapshot already exists under current parent. Returning existing node.")
+			if set_as_current:
+				self.set_current(node)
 
-				return node
+			return node
 
 		parent_probability = parent.snapshot.probability if parent is not None else 1
-		parent_impacts = parent.snapshot.impacts if parent is not None else get_empty_impacts(ctx.net)
+		parent_impacts = parent.snapshot.impacts if parent is not None else ctx.topology.empty_impacts()
 		parent_time = parent.snapshot.execution_time if parent is not None else 0
 
 		_id = next(self.__id_generator)
@@ -171,6 +190,7 @@ class ExecutionTree:
 										   )#TODO Daniel
 
 		child_node = ExecutionTreeNode(name=str(_id), _id=str(_id), snapshot=cumulative_snapshot, parent=parent)
+		self.__index(child_node)
 
 		if set_as_current:
 			self.set_current(child_node)
@@ -188,7 +208,7 @@ class ExecutionTree:
 			logger.warning("Node not found in the tree. Skipping...")
 			return False
 
-		self.current_node = self.get_node_by_id(node.id)
+		self.current_node = self.__nodes[node.id]
 		logger.debug(f"Current node set to {node}")
 		return True
 
@@ -237,15 +257,15 @@ class ExecutionTree:
 		if not isinstance(item, ExecutionTreeNode):
 			return False
 
-		for node in self:
-			if is_equal(node, item):
-				return True
+		if item.parent is None:
+			return is_equal(self.__root, item)
 
-		return False
+		# Same parent and same marking of a node of the tree
+		parent = self.__nodes.get(item.parent.id)
+		return parent is item.parent and self.__get_child(parent, item.snapshot.marking) is not None
 
 	def __len__(self):
-		nodes = self.get_nodes()
-		return len(nodes)
+		return len(self.__nodes)
 
 
 def is_equal(node1: NodeType, node2: NodeType) -> bool:
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from array import array
+from functools import lru_cache
+from hashlib import blake2b
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from model.region import RegionType
+from utils import logging_utils
+
+if TYPE_CHECKING:
+    from model.types import PetriNetType, PlaceType, TransitionType
+
+logger = logging_utils.get_logger(__name__)
+
+_CACHE_ATTRIBUTE = "_compiled_net"
+
+# Relative tolerance of the age checks. Ages are computed from the clock (see ArrayTimeMarking), so they can round
+# below the duration they should reach, e.g. 3.8 - 1.2 == 2.5999999999999996 < 2.6
+AGE_TOLERANCE = 1e-9
+# Decimal digits the ages are rounded to when they are read (see `snap_age`), finer than the tolerance
+AGE_DIGITS = 9
+
+
+def due_age(duration: float) -> float:
+    """
+    Age from which the tokens of a place with the given duration can leave it.
+    The scheduler and the enabling checks must both use it, so that a place reported as due is enabled.
+    """
+    return duration - AGE_TOLERANCE * max(1.0, abs(duration))
+
+
+def snap_age(age: float) -> float:
+    """
+    Age as read from the clock, rounded so that it does not carry the drift of the clock arithmetic
+    (e.g. 2.3 - 2.0 == 0.2999999999999998 is read as 0.3).
+    """
+    return round(age, AGE_DIGITS)
+
+
+def within_tolerance(a: float, b: float) -> bool:
+    """
+    Whether two times are equal up to the tolerance of the age checks.
+    """
+    return abs(a - b) <= AGE_TOLERANCE * max(1.0, abs(a), abs(b))
+
+
+class CompiledNet:
+    """
+    Integer indexed representation of a WrapperPetriNet used by the execution engine.
+
+    Places and transitions get dense indices following the iteration order of the net, so that the compiled
+    form visits them in the same order as the wrapper objects. Pre and post incidence are stored in CSR form:
+    the input places of transition `t` are `pre_place[pre_ptr[t]:pre_ptr[t + 1]]` with weights
+    `pre_weight[pre_ptr[t]:pre_ptr[t + 1]]`, the output places are stored in the same way in `post_*`.
+    Per-place and per-transition properties are read once from the wrapper objects and kept in contiguous arrays.
+
+    The compiled net is built once per net and rebuilt when the net changes (see `CompiledNet.of`).
+
+    Attributes:
+        net (PetriNetType): The compiled net.
+        places (tuple[PlaceType, ...]): Places by index.
+        transitions (tuple[TransitionType, ...]): Transitions by index.
+        place_index (dict[PlaceType, int]): Index of each place.
+        transition_index (dict[TransitionType, int]): Index of each transition.
+        place_names (dict[str, int]): Index of each place by name.
+        place_keys (tuple[int, ...]): Stable 64 bit key of each place, derived from its name (see `place_key`).
+        pre_ptr (array): Offsets of the input arcs of each transition in `pre_place` and `pre_weight`.
+        pre_place (array): Input place of each input arc.
+        pre_weight (array): Weight of each input arc.
+        post_ptr (array): Offsets of the output arcs of each transition in `post_place` and `post_weight`.
+        post_place (array): Output place of each output arc.
+        post_weight (array): Weight of each output arc.
+        inputs (tuple[tuple[tuple[int, int], ...], ...]): (place, weight) pairs of the input arcs of each transition.
+        outputs (tuple[tuple[tuple[int, int], ...], ...]): (place, weight) pairs of the output arcs of each transition.
+        place_inputs (tuple[tuple[int, ...], ...]): Input transitions of each place.
+        place_outputs (tuple[tuple[int, ...], ...]): Output transitions of each place.
+        affected (tuple[tuple[int, ...], ...]): Transitions whose enabling may change when a transition fires,
+            i.e. the output transitions of its input and output places.
+        touched (tuple[tuple[int, ...], ...]): Input and output places of each transition, without repetitions.
+        duration (array): Duration of each place.
+        due_age (array): Age from which the tokens of each place can leave it (see `due_age`).
+        visit_limit (array): Visit limit of each place, infinite when the place has no limit.
+        impact_dim (int): Number of impacts of the net.
+        impacts (np.ndarray): Read only matrix of the impacts of the places, one row of `impact_dim` values per
+            place, zeros when the place does not define impacts.
+        has_impacts (array): 1 if the place defines impacts, 0 otherwise.
+        transition_impacts (np.ndarray): Read only matrix of the impacts of the transitions, i.e. the row of
+            `impacts` of the first input place of each transition, zeros for a transition without inputs.
+        probability (array): Probability of each transition.
+        stop (array): 1 if the transition is a stop transition, 0 otherwise.
+        loop_stop (array): 1 if the transition repeats a loop, it is disabled once the visit limit is reached.
+        join (array): 1 if the transition is the exit of a parallel region with more than one input place.
+        join_group (tuple[tuple[int, ...] | None, ...]): Input places of the join following each place (its first
+            output transition), None when that transition is not a join.
+        join_dependents (tuple[tuple[int, ...], ...]): Places whose join group contains each place.
+        region_id (tuple): Region id of each transition.
+        safe (bool): True if every arc has weight 1, the net can then run on the bitset engine while its
+            markings hold at most one token per place.
+        pre_mask (tuple[int, ...]): Bitmask of the input places of each transition (bit `p` for place `p`).
+        post_mask (tuple[int, ...]): Bitmask of the output places of each transition.
+        revision (int | None): Revision of the net when it was compiled (see `WrapperPetriNet.revision`).
+    """
+
+    def __init__(self, net: PetriNetType):
+        logger.debug("Compiling net %s", net.name)
+        self.net = net
+        self.revision = getattr(net, 'revision', None)
+        self.places = tuple(net.places)
+        self.transitions = tuple(net.transitions)
+        self.place_index = {p: i for i, p in enumerate(self.places)}
+        self.transition_index = {t: i for i, t in enumerate(self.transitions)}
+        self.place_names = {p.name: i for i, p in enumerate(self.places)}
+        self.place_keys = tuple(place_key(p.name) for p in self.places)
+
+        # Pre/post incidence, one CSR row per transition
+        self.pre_ptr, self.pre_place, self.pre_weight = array('l', [0]), array('l'), array('l')
+        self.post_ptr, self.post_place, self.post_weight = array('l', [0]), array('l'), array('l')
+        for t in self.transitions:
+            for arc in t.in_arcs:
+                self.pre_place.append(self.place_index[arc.source])
+                self.pre_weight.append(arc.weight)
+            self.pre_ptr.append(len(self.pre_place))
+
+            for arc in t.out_arcs:
+                self.post_place.append(self.place_index[arc.target])
+                self.post_weight.append(arc.weight)
+            self.post_ptr.append(len(self.post_place))
+
+        self.inputs = tuple(self.__rows(self.pre_ptr, self.pre_place, self.pre_weight))
+        self.outputs = tuple(self.__rows(self.post_ptr, self.post_place, self.post_weight))
+
+        # Bitset form of the incidence, used while the marking is safe (see TimeNetSematic)
+        self.safe = all(w == 1 for w in self.pre_weight) and all(w == 1 for w in self.post_weight)
+        self.pre_mask = tuple(_mask(p for p, _ in inputs) for inputs in self.inputs)
+        self.post_mask = tuple(_mask(p for p, _ in outputs) for outputs in self.outputs)
+
+        # Place adjacency follows the arc order of the places, first target/source lookups rely on it
+        self.place_inputs = tuple(tuple(self.transition_index[arc.source] for arc in p.in_arcs) for p in self.places)
+        self.place_outputs = tuple(tuple(self.transition_index[arc.target] for arc in p.out_arcs) for p in self.places)
+        self.affected = tuple(
+            tuple(sorted({u for p, _ in self.inputs[t] + self.outputs[t] for u in self.place_outputs[p]}))
+            for t in range(len(self.transitions))
+        )
+        self.touched = tuple(tuple(dict.fromkeys(p for p, _ in self.inputs[t] + self.outputs[t]))
+                             for t in range(len(self.transitions)))
+
+        # Place properties
+        self.impact_dim = 0
+        for p in self.places:
+            if p.impacts is not None:
+                self.impact_dim = len(p.impacts)
+                break
+
+        self.duration = array('d')
+        self.due_age = array('d')
+        self.visit_limit = array('d')
+        self.impacts = np.zeros((len(self.places), self.impact_dim))
+        self.has_impacts = array('b')
+        for i, p in enumerate(self.places):
+            self.duration.append(p.duration)
+            self.due_age.append(due_age(p.duration))
+            self.visit_limit.append(float('inf') if p.visit_limit is None else p.visit_limit)
+            impacts = p.impacts
+            self.has_impacts.append(impacts is not None)
+            if impacts is not None:
+                self.impacts[i] = impacts
+        self.impacts.flags.writeable = False
+
+        # Transition properties
+        self.probability = array('d')
+        self.stop = array('b')
+        self.loop_stop = array('b')
+        self.join = array('b')
+        region_id = []
+        for t in self.transitions:
+            self.probability.append(t.probability if t.probability is not None else 1.0)
+            self.stop.append(bool(t.stop))
+            self.loop_stop.append(bool(t.stop and t.region_type == RegionType.LOOP
+                                       and t.label is not None and t.label.startswith("Loop")))
+            self.join.append(t.region_type == "parallel" and len(t.in_arcs) > 1)
+            region_id.append(t.region_id)
+        self.region_id = tuple(region_id)
+        self.transition_impacts = np.zeros((len(self.transitions), self.impact_dim))
+        for t, inputs in enumerate(self.inputs):
+            if inputs:
+                self.transition_impacts[t] = self.impacts[inputs[0][0]]
+        self.transition_impacts.flags.writeable = False
+
+        # Parallel joins: the places waiting on the same join share its deadline
+        join_group = []
+        join_dependents = [[] for _ in self.places]
+        for p in range(len(self.places)):
+            outputs = self.place_outputs[p]
+            if not outputs or not self.join[outputs[0]]:
+                join_group.append(None)
+                continue
+            group = tuple(q for q, _ in self.inputs[outputs[0]])
+            join_group.append(group)
+            for q in group:
+                join_dependents[q].append(p)
+        self.join_group = tuple(join_group)
+        self.join_dependents = tuple(tuple(d) for d in join_dependents)
+
+    @classmethod
+    def of(cls, net: PetriNetType) -> CompiledNet:
+        """
+        Get the compiled form of a net, compiling it on first use.
+        The compiled net is cached on the net and rebuilt when the revision of the net changed, i.e. after any change
+        of its places, transitions or their attributes, or of its arcs through the helpers of `net_utils`.
+        :param net: Net to compile.
+        :return: the compiled net.
+        """
+        compiled = getattr(net, _CACHE_ATTRIBUTE, None)
+        if compiled is None or compiled.net is not net or compiled.revision != getattr(net, 'revision', None):
+            compiled = cls(net)
+            setattr(net, _CACHE_ATTRIBUTE, compiled)
+
+        return compiled
+
+    def place_impacts(self, p: int) -> np.ndarray | None:
+        """
+        Impacts of a place as a read only row of `impacts`, None if the place does not define impacts.
+        :param p: Index of the place.
+        """
+        if not self.has_impacts[p]:
+            return None
+
+        return self.impacts[p]
+
+    def to_transitions(self, indices) -> list[TransitionType]:
+        """
+        Map transition indices back to the wrapper transitions.
+        """
+        return [self.transitions[t] for t in indices]
+
+    def to_places(self, indices) -> list[PlaceType]:
+        """
+        Map place indices back to the wrapper places.
+        """
+        return [self.places[p] for p in indices]
+
+    @staticmethod
+    def __rows(ptr: array, column: array, weight: array):
+        for start, end in zip(ptr, ptr[1:]):
+            yield tuple(zip(column[start:end], weight[start:end]))
+
+    def __repr__(self):
+        return f"CompiledNet(places={len(self.places)}, transitions={len(self.transitions)}, safe={self.safe})"
+
+
+@lru_cache(maxsize=None)
+def place_key(name: str) -> int:
+    """
+    Stable 64 bit key of a place name, it does not depend on the hash seed of the process.
+    :param name: Name of the place.
+    """
+    return int.from_bytes(blake2b(name.encode(), digest_size=8).digest(), "little")
+
+
+def _mask(places) -> int:
+    mask = 0
+    for p in places:
+        mask |= 1 << p
+    return mask
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable
+
+from model.petri_net.compiled import CompiledNet
+from model.petri_net.time_spin import ArrayTimeMarking, TimeNetSematic
+from utils import logging_utils
+
+if TYPE_CHECKING:
+    from model.types import MarkingType
+
+logger = logging_utils.get_logger(__name__)
+
+_CACHE_ATTRIBUTE = "_generated_net"
+_CACHE_SIZE = 128
+
+# Generated code by structural hash, nets with the same structure share their functions
+_code_cache: OrderedDict[str, tuple[tuple[Callable, ...], tuple[Callable, ...]]] = OrderedDict()
+
+
+def structural_hash(compiled: CompiledNet) -> str:
+    """
+    Hash of everything the generated code depends on: arcs, durations, visit limits and loop guards.
+    :param compiled: Compiled net.
+    :return: the hex digest of the structure.
+    """
+    structure = (
+        len(compiled.places),
+        compiled.inputs,
+        compiled.outputs,
+        compiled.affected,
+        tuple(compiled.duration),
+        tuple(compiled.visit_limit),
+        tuple(compiled.loop_stop),
+        compiled.safe,
+    )
+    return hashlib.sha256(repr(structure).encode()).hexdigest()
+
+
+class GeneratedNet:
+    """
+    Python functions specialised for the structure of a net.
+
+    For each transition an `is_enabled` and a `fire` function are generated with the arcs, weights, durations
+    and loop guards inlined, so that they do not walk the incidence of the CompiledNet at every call.
+    Both functions take an ArrayTimeMarking of the net and behave as `TimeNetSematic.is_enabled_compiled`
+    and `TimeNetSematic.fire_compiled`, `fire` also takes the compiled net of the marking.
+
+    The source is executed once per structure: the functions are cached by `structural_hash` and shared
+    by all the nets with the same structure, e.g. the nets decoded from different requests on the same BPMN.
+
+    Attributes:
+        hash (str): Structural hash of the net.
+        is_enabled (tuple[Callable, ...]): Enabling check of each transition.
+        fire (tuple[Callable, ...]): Firing function of each transition.
+    """
+
+    def __init__(self, compiled: CompiledNet):
+        self.hash = structural_hash(compiled)
+        functions = _code_cache.get(self.hash)
+        if functions is None:
+            logger.debug("Generating code for net %s", compiled.net.name)
+            functions = _build(generate_source(compiled), len(compiled.transitions))
+            _code_cache[self.hash] = functions
+            while len(_code_cache) > _CACHE_SIZE:
+                _code_cache.popitem(last=False)
+        else:
+            _code_cache.move_to_end(self.hash)
+
+        self.is_enabled, self.fire = functions
+
+    @classmethod
+    def of(cls, compiled: CompiledNet) -> GeneratedNet:
+        """
+        Get the generated functions of a compiled net, generating them on first use.
+        :param compiled: Compiled net.
+        :return: the generated net.
+        """
+        generated = getattr(compiled, _CACHE_ATTRIBUTE, None)
+        if generated is None:
+            generated = cls(compiled)
+            setattr(compiled, _CACHE_ATTRIBUTE, generated)
+
+        return generated
+
+    def __repr__(self):
+        return f"GeneratedNet(hash={self.hash[:12]}, transitions={len(self.fire)})"
+
+
+class GeneratedSemantic(TimeNetSematic):
+    """
+    TimeNetSematic running the transitions through the code generated for the net (see `GeneratedNet`).
+    """
+
+    def is_enabled_compiled(self, compiled: CompiledNet, t: int, marking: MarkingType) -> bool:
+        return GeneratedNet.of(compiled).is_enabled[t](ArrayTimeMarking.of(compiled, marking))
+
+    def enabled_transitions_compiled(self, compiled: CompiledNet, marking: MarkingType) -> list[int]:
+        marking = ArrayTimeMarking.of(compiled, marking)
+        is_enabled = GeneratedNet.of(compiled).is_enabled
+        return [t for t in sorted(self.token_enabled_compiled(compiled, marking)) if is_enabled[t](marking)]
+
+    def fire_compiled(self, compiled: CompiledNet, t: int, marking: MarkingType) -> ArrayTimeMarking:
+        logger.debug("Firing transition %s", compiled.transitions[t])
+        return GeneratedNet.of(compiled).fire[t](compiled, ArrayTimeMarking.of(compiled, marking))
+
+
+def generate_source(compiled: CompiledNet) -> str:
+    """
+    Python source of the `is_enabled_<t>` and `fire_<t>` functions of every transition of the net.
+    :param compiled: Compiled net.
+    """
+    lines = []
+    for t in range(len(compiled.transitions)):
+        lines.extend(_is_enabled_source(compiled, t))
+        lines.append("")
+        lines.extend(_fire_source(compiled, t))
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def _build(source: str, size: int) -> tuple[tuple[Callable, ...], tuple[Callable, ...]]:
+    namespace = {"ArrayTimeMarking": ArrayTimeMarking, "inf": float("inf")}
+    exec(compile(source, "<generated net>", "exec"), namespace)
+    return (tuple(namespace[f"is_enabled_{t}"] for t in range(size)),
+            tuple(namespace[f"fire_{t}"] for t in range(size)))
+
+
+def _is_enabled_source(compiled: CompiledNet, t: int) -> list[str]:
+    lines = [
+        f"def is_enabled_{t}(marking):",
+        "    tokens, base, clock = marking.token_array, marking.base_array, marking.clock",
+    ]
+    for p, weight in compiled.inputs[t]:
+        # A place holding tokens has age clock - base
+        age = f"clock - base.item({p})" if weight > 0 else f"marking.age_of({p})"
+        lines.append(f"    if tokens.item({p}) < {weight} or {age} < {compiled.due_age[p]!r}:")
+        lines.append("        return False")
+        if compiled.loop_stop[t] and compiled.visit_limit[p] != float("inf"):
+            lines.append(f"    if {compiled.visit_limit[p]!r} <= marking.visit_array.item({p}):")
+            lines.append("        return False")
+    lines.append("    return True")
+    return lines
+
+
+def _fire_source(compiled: CompiledNet, t: int) -> list[str]:
+    inputs, outputs = compiled.inputs[t], compiled.outputs[t]
+    input_places = {p for p, _ in inputs}
+    kept = [p for p, _ in outputs if p not in input_places]
+    lines = [
+        f"def fire_{t}(compiled, marking):",
+        "    clock = marking.clock",
+        "    tokens = marking.token_array.copy()",
+        "    base = marking.base_array.copy()",
+        "    visit_count = marking.visit_array.copy()",
+        "    present = marking.present.copy()",
+    ]
+    # Output places keep their age, input places restart from 0
+    lines.extend(f"    age_{p} = marking.age_of({p})" for p in kept)
+    for p, weight in inputs:
+        lines.append(f"    visit_count[{p}] += 1")
+        lines.append(f"    present[{p}] = True")
+        lines.append(f"    tokens[{p}] = max(tokens.item({p}) - {weight}, 0)")
+    for p, weight in outputs:
+        lines.append(f"    tokens[{p}] += {weight}")
+        lines.append(f"    present[{p}] = True")
+    for p in dict.fromkeys(p for p, _ in outputs + inputs):
+        age = f"age_{p}" if p in kept else "0.0"
+        lines.append(f"    base[{p}] = clock - {age} if tokens.item({p}) > 0 else {age}")
+
+    # The token enabling of the affected transitions is checked on the mask while the marking is safe
+    pre, post = compiled.pre_mask[t], compiled.post_mask[t]
+    lines.append("    token_mask = marking.token_mask")
+    lines.append(f"    if token_mask is not None and not (token_mask & {post & ~pre}):")
+    lines.append(f"        token_mask = (token_mask & {~pre}) | {post}")
+    lines.extend(_token_enabled_source(
+        compiled, t, lambda u: f"(token_mask & {compiled.pre_mask[u]}) == {compiled.pre_mask[u]}", "        "
+    ))
+    lines.append("    else:")
+    lines.append("        token_mask = None")
+    lines.extend(_token_enabled_source(
+        compiled, t,
+        lambda u: " and ".join(f"tokens.item({p}) >= {w}" for p, w in compiled.inputs[u]) or "True",
+        "        "
+    ))
+    lines.append(
+        "    fired = ArrayTimeMarking(compiled, tokens, base, visit_count, present, clock, token_enabled, token_mask)"
+    )
+    lines.append(f"    return fired.rehash(marking, {compiled.touched[t]!r})")
+    return lines
+
+
+def _token_enabled_source(compiled: CompiledNet, t: int, condition: Callable[[int], str], indent: str) -> list[str]:
+    lines = [
+        f"{indent}token_enabled = marking.token_enabled",
+        f"{indent}if token_enabled is not None:",
+        f"{indent}    token_enabled = set(token_enabled)",
+    ]
+    for u in compiled.affected[t]:
+        lines.append(f"{indent}    if {condition(u)}:")
+        lines.append(f"{indent}        token_enabled.add({u})")
+        lines.append(f"{indent}    else:")
+        lines.append(f"{indent}        token_enabled.discard({u})")
+    lines.append(f"{indent}    token_enabled = frozenset(token_enabled)")
+    return lines
@@ -2,13 +2,14 @@ from __future__ import annotations
 
 import copy
 from collections import namedtuple
-from typing import TYPE_CHECKING
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterable, Mapping, Sequence
 
+import numpy as np
 from pm4py.objects.petri_net.obj import Marking, PetriNet
-from pm4py.objects.petri_net.semantics import PetriNetSemantics
 
+from model.petri_net.compiled import AGE_DIGITS, CompiledNet, place_key, snap_age
 from model.petri_net.wrapper import WrapperPetriNet
-from model.region import RegionType
 from utils import logging_utils
 
 if TYPE_CHECKING:
@@ -19,11 +20,31 @@ logger = logging_utils.get_logger(__name__)
 MarkingItem = namedtuple("MarkingItem", ['token', 'age', 'visit_count'])
 
 
+def item_hash(key: int, token: int, age: float, visit_count: int) -> int:
+    """
+    Hash of the item of a place in a marking fingerprint.
+    :param key: Key of the place (see `place_key`).
+    :return: 0 for an empty item, so that places without tokens, age and visits do not count.
+    """
+    if token == 0 and age == 0 and visit_count == 0:
+        return 0
+
+    return hash((key, token, age, visit_count))
+
+
 class TimeMarking:
+    """
+    Marking of a time Petri net: tokens, age and visit count of each place.
+
+    Markings are immutable, the operations return new markings and copying a marking returns the marking itself,
+    so markings can be shared between snapshots and strategies.
+    """
     __keys: set[PlaceType]
     __tokens: Marking
     __age: dict[PlaceType, float]
     __visit_count: dict[PlaceType, int]
+    __fingerprint: int | None
+    __names: dict[str, PlaceType] | None
 
     def __init__(self, marking: Marking, age: dict[PlaceType, float] | None = None,
                  visit_count: dict[PlaceType, int] | None = None):
@@ -37,6 +58,8 @@ class TimeMarking:
         self.__tokens = Marking()
         self.__age = dict()
         self.__visit_count = dict()
+        self.__fingerprint = None
+        self.__names = None
 
         # Populate data
         for key in marking:
@@ -52,9 +75,9 @@ class TimeMarking:
     def __getitem__(self, key: str | PlaceType) -> MarkingItem:
         # If `key` is a string, match against place keys using the id
         if isinstance(key, str):
-            for place in self.keys():
-                if place.name == key:
-                    key = place
+            if self.__names is None:
+                self.__names = {place.name: place for place in self.keys()}
+            key = self.__names.get(key, key)
 
         if isinstance(key, PetriNet.Place) and not isinstance(key, WrapperPetriNet.Place):
             raise TypeError("Key must be a WrapperPetriNet.Place or a string representing the place name.")
@@ -74,6 +97,24 @@ class TimeMarking:
 
         return True
 
+    def __hash__(self):
+        return self.fingerprint
+
+    @property
+    def fingerprint(self) -> int:
+        """
+        Canonical fingerprint of the marking: equal markings have the same fingerprint, whatever their type.
+        It is the XOR of the `item_hash` of (place key, token, age, visit count) of each place, so it does not
+        depend on the order of the places and it can be updated one place at a time.
+        """
+        if self.__fingerprint is None:
+            fingerprint = 0
+            for place in self.keys():
+                fingerprint ^= item_hash(place_key(place.name), *self[place])
+            self.__fingerprint = fingerprint
+
+        return self.__fingerprint
+
     def __repr__(self):
         result = {key: self[key] for key in self.keys()}
         return repr(result)
@@ -82,10 +123,10 @@ class TimeMarking:
         return repr(self)
 
     def __copy__(self):
-        return TimeMarking(self.__tokens, self.__age, self.__visit_count)
+        return self
 
     def __deepcopy__(self, memodict=None):
-        return TimeMarking(self.tokens, self.age, self.visit_count)
+        return self
 
     def __iter__(self) -> iter[PlaceType]:
         return iter(self.keys())
@@ -100,12 +141,12 @@ class TimeMarking:
         return m  # Return a copy to preserve immutability
 
     @property
-    def age(self) -> dict[PlaceType, float]:
-        return copy.copy(self.__age)  # Return a copy to preserve immutability
+    def age(self) -> Mapping[PlaceType, float]:
+        return MappingProxyType(self.__age)  # Read only view to preserve immutability
 
     @property
-    def visit_count(self) -> dict[PlaceType, int]:
-        return copy.copy(self.__visit_count)
+    def visit_count(self) -> Mapping[PlaceType, int]:
+        return MappingProxyType(self.__visit_count)
 
     def keys(self) -> set[PlaceType]:
         return self.__tokens.keys() | self.__age.keys() | self.__visit_count.keys()
@@ -115,13 +156,13 @@ class TimeMarking:
         Adds the specified time to all place ages in the marking.
         Returns a new TimeMarking instance with updated ages.
         """
-        new_age = self.age
+        new_age = dict(self.__age)
         for key in self.__tokens:
             token, age, _ = self[key]
             if token > 0:
                 new_age[key] = age + time
 
-        return TimeMarking(self.tokens, age=new_age, visit_count=self.visit_count)
+        return TimeMarking(self.__tokens, age=new_age, visit_count=self.__visit_count)
 
     def increase_visit_count(self, places: PlaceType | list[PlaceType]):
         """
@@ -140,57 +181,512 @@ class TimeMarking:
             else:
                 new_visit_count[place] = 1
 
-        return TimeMarking(marking=self.tokens, age=self.age, visit_count=new_visit_count)
+        return TimeMarking(marking=self.__tokens, age=self.__age, visit_count=new_visit_count)
+
+
+class ArrayTimeMarking(TimeMarking):
+    """
+    TimeMarking backed by NumPy vectors indexed by the place position in a CompiledNet.
+
+    Ages are not stored directly: the marking has a simulation `clock` and, for each place holding tokens,
+    the timestamp at which the tokens entered it, so that the age is `clock - entered_at`. Places without
+    tokens do not age and keep their last age. Both values are stored in `base_array` (timestamp for marked
+    places, age for the others). Advancing time only moves the clock, so `add_time` is O(1), while lookups
+    by place or by name stay O(1) and two markings of the same net are compared by comparing their vectors.
+    Ages are rounded when they are read (see `snap_age`), so that the drift of the clock arithmetic does not
+    reach the exported markings, their equality and their fingerprint.
+    The vectors are read only and shared between copies.
+
+    The places listed by `keys()` are tracked by the `present` mask: a place is present when it holds tokens
+    or it has an age or visit count entry, as for the dictionary based TimeMarking.
+
+    The set of transitions enabled by the tokens (ignoring ages and visit limits) is cached in `token_enabled`.
+    It is computed on first use by TimeNetSematic, carried over by the operations that do not move tokens and
+    updated incrementally when a transition fires.
+
+    When the compiled net is safe and no place holds more than one token, the marked places are also kept as
+    the bitmask `token_mask`, which lets TimeNetSematic check and fire transitions with bit operations.
+    The mask is None when the marking is not safe, the general engine is used in that case.
+
+    The `fingerprint` is kept in two parts: `idle_hash` for the places without tokens, which does not change
+    with the clock, and `marked_hash` for the places holding tokens. Both are computed on first use, then
+    firing a transition updates them from the places of the transition, while `add_time` keeps `idle_hash`
+    and leaves `marked_hash` to be recomputed from the marked places only.
+
+    Attributes:
+        compiled (CompiledNet): Compiled net giving the place positions.
+        token_array (np.ndarray): Tokens of each place.
+        base_array (np.ndarray): Entry timestamp of the places holding tokens, age of the other places.
+        visit_array (np.ndarray): Visit count of each place.
+        present (np.ndarray): True for the places listed by `keys()`.
+        clock (float): Simulation clock the timestamps refer to.
+        token_enabled (frozenset[int] | None): Transitions enabled by the tokens, None until computed.
+        token_mask (int | None): Bitmask of the marked places, None if the net or the marking is not safe.
+        idle_hash (int | None): Fingerprint of the places without tokens, None until computed.
+        marked_hash (int | None): Fingerprint of the places holding tokens at `clock`, None until computed.
+    """
+
+    def __init__(self, compiled: CompiledNet, tokens: np.ndarray, base: np.ndarray, visit_count: np.ndarray,
+                 present: np.ndarray, clock: float = 0.0, token_enabled: frozenset[int] | None = None,
+                 token_mask: int | None = None, idle_hash: int | None = None, marked_hash: int | None = None):
+        self.compiled = compiled
+        self.token_array = tokens
+        self.base_array = base
+        self.visit_array = visit_count
+        self.present = present
+        self.clock = clock
+        self.token_enabled = token_enabled
+        self.token_mask = token_mask
+        self.idle_hash = idle_hash
+        self.marked_hash = marked_hash
+        for vector in (tokens, base, visit_count, present):
+            vector.flags.writeable = False
+
+    @classmethod
+    def of(cls, compiled: CompiledNet, marking: MarkingType) -> ArrayTimeMarking:
+        """
+        Convert a marking to an ArrayTimeMarking of the given compiled net.
+        Returns the marking itself when it is already backed by the same compiled net.
+        :param compiled: Compiled net of the marking.
+        :param marking: Marking to convert.
+        """
+        if isinstance(marking, ArrayTimeMarking) and marking.compiled is compiled:
+            return marking
+
+        size = len(compiled.places)
+        tokens = np.zeros(size, dtype=np.int64)
+        base = np.zeros(size, dtype=np.float64)
+        visit_count = np.zeros(size, dtype=np.int64)
+        present = np.zeros(size, dtype=bool)
+        for place in marking.keys():
+            p = compiled.place_index.get(place)
+            if p is None:
+                logger.warning("Place %s is not in the compiled net, dropping it from the marking", place)
+                continue
+            token, age, visit_count[p] = marking[place]
+            tokens[p] = token
+            # The clock starts at 0, so marked places entered `age` time units ago
+            base[p] = -age if token > 0 else age
+            present[p] = True
+
+        token_mask = None
+        if compiled.safe and tokens.max(initial=0) <= 1:
+            token_mask = 0
+            for p in np.flatnonzero(tokens).tolist():
+                token_mask |= 1 << p
+
+        return cls(compiled, tokens, base, visit_count, present, token_mask=token_mask)
+
+    @property
+    def age_array(self) -> np.ndarray:
+        """
+        Age of each place, rounded as in `snap_age`.
+        """
+        return np.round(np.where(self.token_array > 0, self.clock - self.base_array, self.base_array), AGE_DIGITS)
+
+    def age_of(self, p: int) -> float:
+        """
+        Age of a place, rounded as in `snap_age`.
+        :param p: Index of the place.
+        """
+        if self.token_array.item(p) > 0:
+            return snap_age(self.clock - self.base_array.item(p))
+
+        return snap_age(self.base_array.item(p))
+
+    def __index(self, key: str | PlaceType) -> int | None:
+        if isinstance(key, str):
+            return self.compiled.place_names.get(key)
+
+        if isinstance(key, PetriNet.Place) and not isinstance(key, WrapperPetriNet.Place):
+            raise TypeError("Key must be a WrapperPetriNet.Place or a string representing the place name.")
+
+        return self.compiled.place_index.get(key)
+
+    def __getitem__(self, key: str | PlaceType) -> MarkingItem:
+        p = self.__index(key)
+        if p is None:
+            return MarkingItem(token=0, age=0.0, visit_count=0)
+
+        return MarkingItem(token=self.token_array.item(p), age=self.age_of(p), visit_count=self.visit_array.item(p))
+
+    def __eq__(self, other):
+        if isinstance(other, ArrayTimeMarking) and other.compiled is self.compiled:
+            # Equal markings have equal fingerprints, part by part
+            if self.idle_hash is not None and other.idle_hash is not None and self.idle_hash != other.idle_hash:
+                return False
+            if not (np.array_equal(self.token_array, other.token_array)
+                    and np.array_equal(self.visit_array, other.visit_array)):
+                return False
+            if self.clock == other.clock and np.array_equal(self.base_array, other.base_array):
+                return True
+            # Markings reached through different clocks can hold the same ages
+            return np.array_equal(self.age_array, other.age_array)
+
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return self.fingerprint
+
+    @property
+    def fingerprint(self) -> int:
+        if self.idle_hash is None:
+            self.idle_hash = self.__hash_places(np.flatnonzero(self.present & (self.token_array == 0)))
+        if self.marked_hash is None:
+            self.marked_hash = self.__hash_places(np.flatnonzero(self.token_array))
+
+        return self.idle_hash ^ self.marked_hash
+
+    def item_hash(self, p: int) -> int:
+        """
+        Hash of the item of a place in the fingerprint.
+        :param p: Index of the place.
+        """
+        return item_hash(self.compiled.place_keys[p], self.token_array.item(p), self.age_of(p),
+                         self.visit_array.item(p))
+
+    def __hash_places(self, places: np.ndarray) -> int:
+        fingerprint = 0
+        for p in places.tolist():
+            fingerprint ^= self.item_hash(p)
+
+        return fingerprint
+
+    def rehash(self, previous: ArrayTimeMarking, places: Iterable[int]) -> ArrayTimeMarking:
+        """
+        Update the fingerprint from a previous marking with the same clock that differs only in the given places.
+        Nothing is done if the fingerprint of the previous marking was not computed.
+        :param previous: The previous marking.
+        :param places: Indices of the places that may differ.
+        :return: this marking.
+        """
+        idle, marked = previous.idle_hash, previous.marked_hash
+        if idle is None:
+            return self
+
+        for p in places:
+            if previous.token_array.item(p) > 0:
+                if marked is not None:
+                    marked ^= previous.item_hash(p)
+            else:
+                idle ^= previous.item_hash(p)
+
+            if self.token_array.item(p) > 0:
+                if marked is not None:
+                    marked ^= self.item_hash(p)
+            else:
+                idle ^= self.item_hash(p)
+
+        self.idle_hash, self.marked_hash = idle, marked
+        return self
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memodict=None):
+        return self
+
+    @property
+    def tokens(self) -> Marking:
+        m = Marking()
+        places = self.compiled.places
+        for p in np.flatnonzero(self.token_array > 0).tolist():
+            m[places[p]] = self.token_array.item(p)
+
+        return m
+
+    @property
+    def age(self) -> Mapping[PlaceType, float]:
+        places = self.compiled.places
+        # Read only view, as the one of TimeMarking
+        return MappingProxyType({places[p]: self.age_of(p) for p in np.flatnonzero(self.present).tolist()})
+
+    @property
+    def visit_count(self) -> Mapping[PlaceType, int]:
+        places = self.compiled.places
+        return MappingProxyType({places[p]: self.visit_array.item(p) for p in np.flatnonzero(self.present).tolist()})
+
+    def keys(self) -> set[PlaceType]:
+        return set(self.compiled.to_places(np.flatnonzero(self.present).tolist()))
+
+    def add_time(self, time: float):
+        """
+        Adds the specified time to the age of all places holding tokens.
+        Only the clock moves, the returned ArrayTimeMarking shares the vectors of this one.
+        """
+        # The places without tokens do not age, only the fingerprint of the marked places changes
+        return ArrayTimeMarking(self.compiled, self.token_array, self.base_array, self.visit_array, self.present,
+                                self.clock + time, self.token_enabled, self.token_mask, self.idle_hash)
+
+    def increase_visit_count(self, places: PlaceType | list[PlaceType]):
+        """
+        Increments the visit counter for the specified places.
+        Returns a new ArrayTimeMarking instance with updated counters.
+        """
+        if isinstance(places, WrapperPetriNet.Place):
+            places = [places]
+
+        visit_count = self.visit_array.copy()
+        visited = []
+        for place in places:
+            p = self.compiled.place_index.get(place)
+            if p is None or not self.present[p]:
+                continue
+            visit_count[p] += 1
+            visited.append(p)
+
+        marking = ArrayTimeMarking(self.compiled, self.token_array, self.base_array, visit_count, self.present,
+                                   self.clock, self.token_enabled, self.token_mask)
+        return marking.rehash(self, dict.fromkeys(visited))
 
 
 class TimeNetSematic:
+    """
+    Time semantics of the Petri net: a transition is enabled when all its input places hold enough tokens
+    and the tokens stayed in the places at least for the place duration.
+
+    The checks run against the compiled form of the net (see `CompiledNet`), the methods taking wrapper
+    transitions map them to their index and delegate to the `*_compiled` variants.
+    """
 
     def is_enabled(self, net: PetriNetType, transition: TransitionType, marking: MarkingType) -> bool:
-        for arc in transition.in_arcs:
-            input_place: WrapperPetriNet.Place = arc.source
-            duration = input_place.duration
-            token, age, _ = marking[input_place]
-            if token < arc.weight or age < duration:
+        compiled = CompiledNet.of(net)
+        return self.is_enabled_compiled(compiled, compiled.transition_index[transition], marking)
+
+    def is_enabled_compiled(self, compiled: CompiledNet, t: int, marking: MarkingType) -> bool:
+        marking = ArrayTimeMarking.of(compiled, marking)
+        due_age = compiled.due_age
+        if marking.token_mask is not None:
+            pre = compiled.pre_mask[t]
+            if (marking.token_mask & pre) != pre:
+                return False
+            tokens = None
+        else:
+            tokens = marking.token_array
+
+        for p, weight in compiled.inputs[t]:
+            if (tokens is not None and tokens.item(p) < weight) or marking.age_of(p) < due_age[p]:
                 return False
 
             # TODO Daniel Remove the condition to have unstopable loops
-            if (transition.stop
-                    and input_place.visit_limit is not None
-                    and input_place.visit_limit <= marking[input_place].visit_count
-                    and transition.region_type == RegionType.LOOP
-                    and transition.label.startswith("Loop")):
+            if compiled.loop_stop[t] and compiled.visit_limit[p] <= marking.visit_array.item(p):
                 return False
 
         return True
 
     def fire(self, net: PetriNetType, transition: TransitionType, marking: MarkingType) -> MarkingType:
-        logger.debug(f"Firing transition {transition}")
-        new_age = marking.age
-        new_visit_count = marking.visit_count
-        for arc in transition.in_arcs:
-            input_place = arc.source
-            new_age[input_place] = 0
-            new_visit_count[input_place] = new_visit_count.get(input_place, 0) + 1
+        compiled = CompiledNet.of(net)
+        return self.fire_compiled(compiled, compiled.transition_index[transition], marking)
+
+    def fire_compiled(self, compiled: CompiledNet, t: int, marking: MarkingType) -> ArrayTimeMarking:
+        logger.debug("Firing transition %s", compiled.transitions[t])
+        marking = ArrayTimeMarking.of(compiled, marking)
+        # Bitset engine: the marking stays safe unless an output place not consumed by `t` is already marked
+        token_mask = marking.token_mask
+        pre, post = compiled.pre_mask[t], compiled.post_mask[t]
+        if token_mask is not None and not (token_mask & post & ~pre):
+            return self.__fire_safe(compiled, t, marking, (token_mask & ~pre) | post)
+
+        if token_mask is not None:
+            logger.debug("Marking is no longer safe, falling back to the general engine")
+
+        clock = marking.clock
+        tokens = marking.token_array.copy()
+        base = marking.base_array.copy()
+        visit_count = marking.visit_array.copy()
+        present = marking.present.copy()
+
+        # Age of the places of `t` after the firing, the input places restart from 0
+        ages = {p: marking.age_of(p) for p, _ in compiled.outputs[t]}
+        for p, weight in compiled.inputs[t]:
+            ages[p] = 0.0
+            visit_count[p] += 1
+            present[p] = True
+            tokens[p] = max(tokens[p] - weight, 0)
+
+        for p, weight in compiled.outputs[t]:
+            tokens[p] += weight
+            present[p] = True
+
+        for p, age in ages.items():
+            base[p] = clock - age if tokens[p] > 0 else age
+
+        # Only the transitions next to the places of `t` can change their token enabling
+        token_enabled = None
+        if marking.token_enabled is not None:
+            token_enabled = set(marking.token_enabled)
+            for u in compiled.affected[t]:
+                if all(tokens[p] >= weight for p, weight in compiled.inputs[u]):
+                    token_enabled.add(u)
+                else:
+                    token_enabled.discard(u)
+            token_enabled = frozenset(token_enabled)
+
+        fired = ArrayTimeMarking(compiled, tokens, base, visit_count, present, clock, token_enabled)
+        return fired.rehash(marking, compiled.touched[t])
+
+    @staticmethod
+    def __fire_safe(compiled: CompiledNet, t: int, marking: ArrayTimeMarking, token_mask: int) -> ArrayTimeMarking:
+        """
+        Fire a transition on a safe marking, `token_mask` is the bitmask of the marked places after the firing.
+        """
+        clock = marking.clock
+        tokens = marking.token_array.copy()
+        base = marking.base_array.copy()
+        visit_count = marking.visit_array.copy()
+        present = marking.present.copy()
+
+        # Output places keep their age, input places restart from 0
+        ages = {p: marking.age_of(p) for p, _ in compiled.outputs[t]}
+        for p, _ in compiled.inputs[t]:
+            ages[p] = 0.0
+            visit_count[p] += 1
+            present[p] = True
+        for p, age in ages.items():
+            marked = token_mask >> p & 1
+            tokens[p] = marked
+            base[p] = clock - age if marked else age
+            present[p] = True
+
+        token_enabled = None
+        if marking.token_enabled is not None:
+            token_enabled = set(marking.token_enabled)
+            pre_mask = compiled.pre_mask
+            for u in compiled.affected[t]:
+                if (token_mask & pre_mask[u]) == pre_mask[u]:
+                    token_enabled.add(u)
+                else:
+                    token_enabled.discard(u)
+            token_enabled = frozenset(token_enabled)
+
+        fired = ArrayTimeMarking(compiled, tokens, base, visit_count, present, clock, token_enabled, token_mask)
+        return fired.rehash(marking, compiled.touched[t])
+
+    @staticmethod
+    def batch_conflicts(compiled: CompiledNet, transitions: Sequence[int]) -> list[tuple[int, int]]:
+        """
+        Conflicts of a batch of transitions: two transitions conflict when they share an input or output place,
+        or when the same transition appears twice. Firing them one after the other may then give a different
+        marking than firing them in one pass.
+        :param compiled: Compiled net.
+        :param transitions: Indices of the transitions of the batch.
+        :return: the pairs of conflicting transitions, in batch order.
+        """
+        owner: dict[int, int] = {}
+        conflicts = []
+        for i, t in enumerate(transitions):
+            if t in transitions[:i]:
+                conflicts.append((t, t))
+                continue
+            for p in compiled.touched[t]:
+                u = owner.setdefault(p, t)
+                if u != t and (u, t) not in conflicts:
+                    conflicts.append((u, t))
 
-        tokens = PetriNetSemantics.fire(net, transition, marking.tokens)
-        new_marking = Marking(tokens)
+        return conflicts
 
-        return TimeMarking(new_marking, new_age, new_visit_count)
+    def fire_batch_compiled(self, compiled: CompiledNet, transitions: Sequence[int],
+                            marking: MarkingType) -> ArrayTimeMarking:
+        """
+        Fire a batch of transitions due at the same instant in one pass, allocating a single marking.
+        The result is the marking obtained by firing them one after the other with `fire_compiled`.
+        :param compiled: Compiled net.
+        :param transitions: Indices of the transitions, they must not conflict (see `batch_conflicts`).
+        :param marking: Current marking.
+        :return: the marking after the firing.
+        :raises ValueError: if two transitions of the batch conflict.
+        """
+        if len(transitions) == 1:
+            return self.fire_compiled(compiled, transitions[0], marking)
+
+        conflicts = self.batch_conflicts(compiled, transitions)
+        if conflicts:
+            logger.error("Conflicting transitions in batch: %s", conflicts)
+            raise ValueError(f"Transitions {conflicts} share places and cannot be fired in the same batch")
+
+        logger.debug("Firing batch %s", compiled.to_transitions(transitions))
+        marking = ArrayTimeMarking.of(compiled, marking)
+        clock = marking.clock
+        tokens = marking.token_array.copy()
+        base = marking.base_array.copy()
+        visit_count = marking.visit_array.copy()
+        present = marking.present.copy()
+
+        # The transitions do not share places, each place follows the rules of `fire_compiled`
+        token_mask = marking.token_mask
+        ages = {}
+        for t in transitions:
+            if token_mask is not None:
+                pre, post = compiled.pre_mask[t], compiled.post_mask[t]
+                token_mask = None if token_mask & post & ~pre else (token_mask & ~pre) | post
+            for p, _ in compiled.outputs[t]:
+                ages[p] = marking.age_of(p)
+            for p, weight in compiled.inputs[t]:
+                ages[p] = 0.0
+                visit_count[p] += 1
+                present[p] = True
+                tokens[p] = max(tokens[p] - weight, 0)
+            for p, weight in compiled.outputs[t]:
+                tokens[p] += weight
+                present[p] = True
+
+        for p, age in ages.items():
+            base[p] = clock - age if tokens[p] > 0 else age
+
+        token_enabled = None
+        if marking.token_enabled is not None:
+            token_enabled = set(marking.token_enabled)
+            for u in {u for t in transitions for u in compiled.affected[t]}:
+                if all(tokens[p] >= weight for p, weight in compiled.inputs[u]):
+                    token_enabled.add(u)
+                else:
+                    token_enabled.discard(u)
+            token_enabled = frozenset(token_enabled)
+
+        fired = ArrayTimeMarking(compiled, tokens, base, visit_count, present, clock, token_enabled, token_mask)
+        return fired.rehash(marking, ages.keys())
 
     def execute(self, net: PetriNetType, transition: TransitionType, marking: MarkingType) -> MarkingType:
-        logger.debug(f"Trying execution of transition {transition}")
-        if not self.is_enabled(net, transition, marking):
-            logger.debug(f"Transition {transition} is not enabled")
+        compiled = CompiledNet.of(net)
+        return self.execute_compiled(compiled, compiled.transition_index[transition], marking)
+
+    def execute_compiled(self, compiled: CompiledNet, t: int, marking: MarkingType) -> MarkingType:
+        logger.debug("Trying execution of transition %s", compiled.transitions[t])
+        if not self.is_enabled_compiled(compiled, t, marking):
+            logger.debug("Transition %s is not enabled", compiled.transitions[t])
             return marking
 
-        return self.fire(net, transition, marking)
+        return self.fire_compiled(compiled, t, marking)
 
     def enabled_transitions(self, net: PetriNetType, marking: MarkingType) -> set[TransitionType]:
-        enabled = set()
-
-        for t in net.transitions:
-            if self.is_enabled(net, t, marking):
-                enabled.add(t)
+        compiled = CompiledNet.of(net)
+        enabled = set(compiled.to_transitions(self.enabled_transitions_compiled(compiled, marking)))
 
-        logger.debug(f"Enabled transitions: {enabled}")
+        logger.debug("Enabled transitions: %s", enabled)
         return enabled
+
+    def enabled_transitions_compiled(self, compiled: CompiledNet, marking: MarkingType) -> list[int]:
+        marking = ArrayTimeMarking.of(compiled, marking)
+        # A transition enabled by time is also enabled by tokens, so only those need the full check
+        token_enabled = self.token_enabled_compiled(compiled, marking)
+        return [t for t in sorted(token_enabled) if self.is_enabled_compiled(compiled, t, marking)]
+
+    def token_enabled_compiled(self, compiled: CompiledNet, marking: MarkingType) -> frozenset[int]:
+        """
+        Transitions whose input places hold enough tokens, ignoring ages and visit limits.
+        The result is cached on the marking and kept up to date by `fire_compiled`.
+        :param compiled: Compiled net.
+        :param marking: Current marking.
+        :return: the indices of the enabled transitions.
+        """
+        marking = ArrayTimeMarking.of(compiled, marking)
+        if marking.token_enabled is None and marking.token_mask is not None:
+            mask = marking.token_mask
+            marking.token_enabled = frozenset(t for t, pre in enumerate(compiled.pre_mask) if (mask & pre) == pre)
+        elif marking.token_enabled is None:
+            tokens = marking.token_array.tolist()
+            marking.token_enabled = frozenset(
+                t for t, inputs in enumerate(compiled.inputs) if all(tokens[p] >= weight for p, weight in inputs)
+            )
+
+        return marking.token_enabled
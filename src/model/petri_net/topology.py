@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping
+
+import numpy as np
+
+from model.petri_net.compiled import CompiledNet
+from model.petri_net.time_spin import ArrayTimeMarking
+from model.region import RegionType
+from utils import logging_utils
+
+if TYPE_CHECKING:
+    from model.types import MarkingType, PlaceType, TransitionType
+
+logger = logging_utils.get_logger(__name__)
+
+
+class NetTopology:
+    """
+    Immutable index of the static facts about a net used by the strategies and the utilities.
+
+    It is built once per NetContext (see `NetContext.topology`) from the compiled net and the final marking,
+    so that the helpers do not rescan places and arcs at every call.
+
+    Attributes:
+        compiled (CompiledNet): Compiled net the index was built from.
+        impact_dim (int | None): Number of impacts of the net, None if no place defines impacts.
+        first_target (Mapping[PlaceType | TransitionType, TransitionType | PlaceType]): Target of the first
+            output arc of each place and transition that has one.
+        first_source (Mapping[PlaceType | TransitionType, TransitionType | PlaceType]): Source of the first
+            input arc of each place and transition that has one.
+        join_groups (Mapping[TransitionType, tuple[PlaceType, ...]]): Input places of the parallel joins.
+        loop_transitions (Mapping[PlaceType, tuple[TransitionType | None, bool, TransitionType | None]]):
+            (exit transition, is loop, loop transition) of the places of loop regions.
+        final_places (frozenset[PlaceType]): Places holding tokens in the final marking.
+        final_tokens (np.ndarray): Tokens of each place in the final marking, by compiled place index.
+        final_mask (int | None): Bitmask of the final places, None if the final marking cannot be reached on the
+            bitset engine (see `ArrayTimeMarking.token_mask`).
+    """
+
+    def __init__(self, compiled: CompiledNet, final_marking: MarkingType):
+        self.compiled = compiled
+        places, transitions = compiled.places, compiled.transitions
+
+        self.impact_dim = compiled.impact_dim if any(compiled.has_impacts) else None
+
+        # First arcs follow the arc order of the wrapper objects, as list(component.out_arcs)[0]
+        first_target, first_source = {}, {}
+        for p, place in enumerate(places):
+            if compiled.place_outputs[p]:
+                first_target[place] = transitions[compiled.place_outputs[p][0]]
+            if compiled.place_inputs[p]:
+                first_source[place] = transitions[compiled.place_inputs[p][0]]
+        for t, transition in enumerate(transitions):
+            if compiled.outputs[t]:
+                first_target[transition] = places[compiled.outputs[t][0][0]]
+            if compiled.inputs[t]:
+                first_source[transition] = places[compiled.inputs[t][0][0]]
+        self.first_target: Mapping = MappingProxyType(first_target)
+        self.first_source: Mapping = MappingProxyType(first_source)
+
+        self.join_groups: Mapping = MappingProxyType({
+            transitions[t]: tuple(places[p] for p, _ in compiled.inputs[t])
+            for t in range(len(transitions)) if compiled.join[t]
+        })
+
+        loop_transitions = {}
+        for place in places:
+            if place.region_type != RegionType.LOOP:
+                continue
+            is_loop, loop_transition, exit_transition = False, None, None
+            for arc in place.out_arcs:
+                out_transition = arc.target
+                if out_transition.region_type == RegionType.LOOP:
+                    is_loop = True
+                    if out_transition.label.startswith("Loop"):
+                        loop_transition = out_transition
+                    if out_transition.label.startswith("Exit"):
+                        exit_transition = out_transition
+            loop_transitions[place] = (exit_transition, is_loop, loop_transition)
+        self.loop_transitions: Mapping = MappingProxyType(loop_transitions)
+
+        final_tokens = np.array([final_marking[place].token for place in places], dtype=np.int64)
+        final_tokens.flags.writeable = False
+        self.final_tokens = final_tokens
+        self.final_places = frozenset(places[p] for p in np.flatnonzero(final_tokens).tolist())
+        self.final_mask = None
+        if compiled.safe and final_tokens.max(initial=0) <= 1:
+            self.final_mask = sum(1 << p for p in np.flatnonzero(final_tokens).tolist())
+
+    def empty_impacts(self) -> np.ndarray:
+        """
+        Zero impacts of the net.
+        :return: a new float array with one zero per impact.
+        """
+        if self.impact_dim is None:
+            logger.error("Default impacts are None")
+            raise RuntimeError("Impacts length not found")
+
+        return np.zeros(self.impact_dim)
+
+    def get_loop_transitions(self, place: PlaceType) -> tuple[TransitionType | None, bool, TransitionType | None]:
+        """
+        Exit and loop transitions leaving a place.
+        :param place: Place to check.
+        :return: exit transition, True if the place is followed by loop transitions, loop transition.
+        """
+        return self.loop_transitions.get(place, (None, False, None))
+
+    def is_final_marking(self, marking: MarkingType) -> bool:
+        """
+        Checks if every place holds the same tokens as in the final marking.
+        While the marking is safe only the bitmasks of the marked places are compared.
+        :param marking: The marking to check.
+        """
+        marking = ArrayTimeMarking.of(self.compiled, marking)
+        if marking.token_mask is not None and self.final_mask is not None:
+            return marking.token_mask == self.final_mask
+
+        return np.array_equal(marking.token_array, self.final_tokens)
+
+    def __repr__(self):
+        return f"NetTopology({self.compiled!r})"
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import MutableMapping
 from typing import Collection, Dict, Any
 
 import pm4py
@@ -11,16 +12,182 @@ from utils.net_utils import PropertiesKeys
 logger = logging_utils.get_logger(__name__)
 
 
+class CustomProperties(MutableMapping):
+    """
+    Compatibility view of the custom properties of a Place or Transition, kept in `properties['custom']`.
+
+    The domain attributes (duration, visit limit, stop, ...) are stored as slotted attributes of the owner, the view
+    maps their `PropertiesKeys` to them so that pm4py and the serializers can still read and write them as a
+    dictionary. Attributes set to None are not in the view, as the keys never set in a dictionary. Any other key is
+    stored in the view itself.
+
+    Attributes:
+        owner (Place | Transition): Object whose attributes are exposed.
+        extra (dict): Properties without a slotted attribute.
+    """
+    __slots__ = ('owner', 'extra')
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.extra = {}
+
+    def __getitem__(self, key):
+        attribute = type(self.owner).attribute_keys.get(key)
+        if attribute is None:
+            return self.extra[key]
+        value = getattr(self.owner, attribute)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        attribute = type(self.owner).attribute_keys.get(key)
+        if attribute is None:
+            self.extra[key] = value
+        else:
+            setattr(self.owner, attribute, value)
+
+    def __delitem__(self, key):
+        attribute = type(self.owner).attribute_keys.get(key)
+        if attribute is None:
+            del self.extra[key]
+        else:
+            object.__setattr__(self.owner, attribute, type(self.owner).attribute_defaults.get(attribute))
+            _touch_net(self.owner)
+
+    def __iter__(self):
+        for key, attribute in type(self.owner).attribute_keys.items():
+            if getattr(self.owner, attribute, None) is not None:
+                yield key
+        yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class NamedSet(set):
+    """
+    Set of places or transitions that keeps an index of its elements by name.
+
+    Every way of changing the set (`add`, `discard`, `remove`, `update`, ...) keeps the index in sync, so the nets
+    built by the converter, by the request decoder or changed by `add_arc_from_to`, `remove_place` and
+    `collapse_places` can be searched by name in constant time. Renaming an element that is in the set is not
+    tracked. When the set belongs to a net, every change marks the net as changed (see `WrapperPetriNet.touch`) and
+    the elements added are linked to the net.
+
+    Attributes:
+        by_name (dict[str, Place | Transition]): Elements by name.
+        owner (WrapperPetriNet | None): Net the set belongs to.
+    """
+
+    def __init__(self, iterable=(), owner=None):
+        super().__init__()
+        self.by_name = {}
+        self.owner = owner
+        self.update(iterable)
+
+    def get(self, name: str):
+        """
+        Get an element by name.
+        :return: the element or None if no element has this name.
+        """
+        return self.by_name.get(name)
+
+    def add(self, element):
+        if element not in self:
+            super().add(element)
+            self.by_name[element.name] = element
+            if self.owner is not None:
+                element.net = self.owner
+                self.owner.touch()
+
+    def discard(self, element):
+        if element in self:
+            super().discard(element)
+            self.by_name.pop(element.name, None)
+            self.__touch()
+
+    def remove(self, element):
+        if element not in self:
+            raise KeyError(element)
+        self.discard(element)
+
+    def pop(self):
+        element = super().pop()
+        self.by_name.pop(element.name, None)
+        self.__touch()
+        return element
+
+    def clear(self):
+        super().clear()
+        self.by_name.clear()
+        self.__touch()
+
+    def update(self, *iterables):
+        for iterable in iterables:
+            for element in iterable:
+                self.add(element)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def difference_update(self, *iterables):
+        for iterable in iterables:
+            for element in list(iterable):
+                self.discard(element)
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def intersection_update(self, *iterables):
+        super().intersection_update(*iterables)
+        self.__reindex()
+
+    def __iand__(self, other):
+        self.intersection_update(other)
+        return self
+
+    def symmetric_difference_update(self, other):
+        super().symmetric_difference_update(other)
+        self.__reindex()
+
+    def __ixor__(self, other):
+        self.symmetric_difference_update(other)
+        return self
+
+    def __reindex(self):
+        self.by_name = {element.name: element for element in self}
+        self.__touch()
+
+    def __touch(self):
+        if self.owner is not None:
+            self.owner.touch()
+
+
+def _touch_net(element):
+    # Mark the net of a place or transition as changed, if it was added to one
+    net = element.__dict__.get('net')
+    if net is not None:
+        net.touch()
+
+
 class WrapperPetriNet(pm4py.PetriNet):
     """
     Wrapper class for PetriNet to allow for custom properties.
 
     Attributes:
         name (str | None): The name of the PetriNet, default is None.
-        places (Collection[Place] | None): Collection of places in the PetriNet,
-        transitions (Collection[Transition] | None): Collection of transitions in the PetriNet,
+        places (NamedSet): Places of the PetriNet, indexed by name (see `get_place_by_name`).
+        transitions (NamedSet): Transitions of the PetriNet, indexed by name (see `get_transition_by_name`).
         arcs (Collection[Arc] | None): Collection of arcs in the PetriNet,
         properties (Dict[str, Any] | None): A dictionary to hold additional properties.
+        revision (int): Number of changes of the net, its places and its transitions, the compiled form of the net
+            is rebuilt when it changes (see `CompiledNet.of`). Arcs are tracked through the helpers of `net_utils`.
     """
 
     class Place(pm4py.PetriNet.Place):
@@ -39,10 +206,21 @@ class WrapperPetriNet(pm4py.PetriNet):
             exit_id (str | int | None): Exit region ID associated with this place.
             impacts (list[float] | None): Impacts associated with this place.
             visit_limit (int | None): Visit limit associated with this place.
+            net (WrapperPetriNet): Net the place was added to, set by its `places`.
+
+        The attributes above are slotted, `custom_properties` is a view on them keyed by `PropertiesKeys`.
         """
+        __slots__ = ('region_label', 'region_type', 'duration', 'entry_id', 'exit_id', 'impacts', 'visit_limit')
+        attribute_keys = {PropertiesKeys.LABEL: 'region_label', PropertiesKeys.TYPE: 'region_type',
+                          PropertiesKeys.DURATION: 'duration', PropertiesKeys.ENTRY_RID: 'entry_id',
+                          PropertiesKeys.EXIT_RID: 'exit_id', PropertiesKeys.IMPACTS: 'impacts',
+                          PropertiesKeys.VISIT_LIMIT: 'visit_limit'}
+        attribute_defaults = {'duration': 0}
 
         def __init__(self, name, in_arcs=None, out_arcs=None, properties=None):
             super().__init__(name=name, in_arcs=in_arcs, out_arcs=out_arcs, properties=properties)
+            for attribute in self.__slots__:
+                object.__setattr__(self, attribute, self.attribute_defaults.get(attribute))
 
             for arc in self.in_arcs:
                 if not isinstance(arc, WrapperPetriNet.Arc):
@@ -54,7 +232,7 @@ class WrapperPetriNet(pm4py.PetriNet):
                     logger.error(f"Cannot create place: arc is type {type(arc)} instead of wrapper petri net.")
                     raise TypeError("All out_arcs must be instances of WrapperPetriNet.Arc")
 
-            self.properties['custom'] = {}
+            self.properties['custom'] = CustomProperties(self)
 
         @override
         def __eq__(self, other):
@@ -66,6 +244,16 @@ class WrapperPetriNet(pm4py.PetriNet):
         def __hash__(self):
             return hash(self.name)
 
+        def __setattr__(self, key, value):
+            # Keep the behaviour of the former property setters, reads are plain slot reads
+            if key == 'duration':
+                value = value or 0
+            elif key == 'visit_limit' and getattr(self, 'visit_limit', None) is not None:
+                return
+            super().__setattr__(key, value)
+            if key in self.__slots__:
+                _touch_net(self)
+
         def set_custom_property(self, key, value):
             """
             Set a custom property for the Place.
@@ -82,95 +270,87 @@ class WrapperPetriNet(pm4py.PetriNet):
             """
             Get the label of the region associated with this Place.
             """
-            return self.get_custom_property(PropertiesKeys.LABEL)
+            return self.region_label
 
         def set_region_label(self, label):
             """
             Set the label of the region associated with this Place.
             """
-            self.set_custom_property(PropertiesKeys.LABEL, label)
+            self.region_label = label
 
         def get_type(self):
             """
             Get the type of the Place.
             """
-            return self.get_custom_property(PropertiesKeys.TYPE)
+            return self.region_type
 
         def set_type(self, type_value):
             """
             Set the type of the Place.
             """
-            self.set_custom_property(PropertiesKeys.TYPE, type_value)
+            self.region_type = type_value
 
         def get_duration(self):
             """
             Get the duration associated with this Place.
             """
-            return self.get_custom_property(PropertiesKeys.DURATION) or 0
+            return self.duration
 
         def set_duration(self, duration):
             """
             Set the duration associated with this Place.
             """
-            self.custom_properties[PropertiesKeys.DURATION] = duration
+            self.duration = duration
 
         def get_entry_id(self):
             """
             Get the entry region ID associated with this Place.
             """
-            return self.get_custom_property(PropertiesKeys.ENTRY_RID)
+            return self.entry_id
 
         def set_entry_id(self, entry_id):
             """
             Set the entry region ID associated with this Place.
             """
-            self.set_custom_property(PropertiesKeys.ENTRY_RID, entry_id)
+            self.entry_id = entry_id
 
         def get_exit_id(self):
             """
             Get the exit region ID associated with this Place.
             """
-            return self.get_custom_property(PropertiesKeys.EXIT_RID)
+            return self.exit_id
 
         def set_exit_id(self, exit_id):
             """
             Set the exit region ID associated with this Place.
             """
-            self.set_custom_property(PropertiesKeys.EXIT_RID, exit_id)
+            self.exit_id = exit_id
 
         def get_impacts(self):
             """
             Get the impacts associated with this Place.
             """
-            return self.get_custom_property(PropertiesKeys.IMPACTS)
+            return self.impacts
 
         def set_impacts(self, impacts):
             """
             Set the impacts associated with this Place.
             """
-            self.set_custom_property(PropertiesKeys.IMPACTS, impacts)
+            self.impacts = impacts
 
         def get_visit_limit(self):
             """
             Get the visit limit associated with this Place.
             """
-            return self.get_custom_property(PropertiesKeys.VISIT_LIMIT)
+            return self.visit_limit
 
         def set_visit_limit(self, visit_limit):
             """
             Set the visit limit associated with this Place if it's None.
             """
-            if self.get_visit_limit() is None:
-                self.set_custom_property(PropertiesKeys.VISIT_LIMIT, visit_limit)
+            self.visit_limit = visit_limit
 
         custom_properties = property(lambda self: self.properties['custom'])
-        region_label = property(get_region_label, set_region_label)
-        region_type = property(get_type, set_type)
-        duration = property(get_duration, set_duration)
-        entry_id = property(get_entry_id, set_entry_id)
-        exit_id = property(get_exit_id, set_exit_id)
-        impacts = property(get_impacts, set_impacts)
-        visit_limit = property(get_visit_limit, set_visit_limit)
 
     class Transition(pm4py.PetriNet.Transition):
         """
@@ -187,10 +367,20 @@ class WrapperPetriNet(pm4py.PetriNet):
             region_id (str | int | None): ID of the region associated with this transition.
             probability (float | None): Probability associated with this transition.
             stop (bool | None): Stop condition associated with this transition.
+            net (WrapperPetriNet): Net the transition was added to, set by its `transitions`.
+
+        The attributes above are slotted, `custom_properties` is a view on them keyed by `PropertiesKeys`.
         """
+        __slots__ = ('region_label', 'region_type', 'region_id', 'probability', 'stop')
+        attribute_keys = {PropertiesKeys.LABEL: 'region_label', PropertiesKeys.TYPE: 'region_type',
+                          PropertiesKeys.ENTRY_RID: 'region_id', PropertiesKeys.PROBABILITY: 'probability',
+                          PropertiesKeys.STOP: 'stop'}
+        attribute_defaults = {}
 
         def __init__(self, name, label=None, in_arcs=None, out_arcs=None, properties=None):
             super().__init__(name=name, label=label, in_arcs=in_arcs, out_arcs=out_arcs, properties=properties)
+            for attribute in self.__slots__:
+                object.__setattr__(self, attribute, None)
             for arc in self.in_arcs:
                 if not isinstance(arc, WrapperPetriNet.Arc):
                     logger.error(f"Cannot create transition: arc is type {type(arc)} instead of wrapper petri net.")
@@ -201,7 +391,7 @@ class WrapperPetriNet(pm4py.PetriNet):
                     logger.error(f"Cannot create transition: arc is type {type(arc)} instead of wrapper petri net.")
                     raise TypeError("All out_arcs must be instances of WrapperPetriNet.Arc")
 
-            self.properties['custom'] = {}
+            self.properties['custom'] = CustomProperties(self)
 
         @override
         def __eq__(self, other):
@@ -213,84 +403,84 @@ class WrapperPetriNet(pm4py.PetriNet):
         def __hash__(self):
             return hash(self.name)
 
+        def __setattr__(self, key, value):
+            super().__setattr__(key, value)
+            if key in self.__slots__:
+                _touch_net(self)
+
         def set_custom_property(self, key, value):
             """
             Set a custom property for the Transition.
             """
-            self.properties['custom'][key] = value
+            self.custom_properties[key] = value
 
         def get_custom_property(self, key):
             """
             Get a custom property from the Transition.
             """
-            return self.properties['custom'].get(key, None)
+            return self.custom_properties.get(key, None)
 
         def get_region_label(self):
             """
             Get the label of the region associated with this Transition.
             """
-            return self.get_custom_property(PropertiesKeys.LABEL)
+            return self.region_label
 
         def set_region_label(self, label):
             """
             Set the label of the region associated with this Transition.
             """
-            self.set_custom_property(PropertiesKeys.LABEL, label)
+            self.region_label = label
 
         def get_region_type(self):
             """
             Get the type of the region associated with this Transition.
             """
-            return self.get_custom_property(PropertiesKeys.TYPE)
+            return self.region_type
 
         def set_region_type(self, type_value):
             """
             Set the type of the region associated with this Transition.
             """
-            self.set_custom_property(PropertiesKeys.TYPE, type_value)
+            self.region_type = type_value
 
         def get_region_id(self):
             """
             Get the region ID associated with this Transition.
             """
-            return self.get_custom_property(PropertiesKeys.ENTRY_RID)
+            return self.region_id
 
         def set_region_id(self, region_id):
             """
             Set the region ID associated with this Transition.
             """
-            self.set_custom_property(PropertiesKeys.ENTRY_RID, region_id)
+            self.region_id = region_id
 
         def get_probability(self):
             """
             Get the probability associated with this Transition.
             """
-            return self.get_custom_property(PropertiesKeys.PROBABILITY)
+            return self.probability
 
         def set_probability(self, probability):
             """
             Set the probability associated with this Transition.
             """
-            self.set_custom_property(PropertiesKeys.PROBABILITY, probability)
+            self.probability = probability
 
         def get_stop(self):
             """
             Get the stop condition associated with this Transition.
             """
-            return self.get_custom_property(PropertiesKeys.STOP)
+            return self.stop
 
         def set_stop(self, stop_condition):
             """
             Set the stop condition associated with this Transition.
             """
-            self.set_custom_property(PropertiesKeys.STOP, stop_condition)
+            self.stop = stop_condition
 
         custom_properties = property(lambda self: self.properties['custom'])
-        region_label = property(get_region_label, set_region_label)
-        region_type = property(get_region_type, set_region_type)
-        region_id = property(get_region_id, set_region_id)
-        probability = property(get_probability, set_probability)
-        stop = property(get_stop, set_stop)
 
     class Arc(pm4py.PetriNet.Arc):
         """
@@ -339,8 +529,9 @@ class WrapperPetriNet(pm4py.PetriNet):
     def __init__(self, name: str = None, places: Collection[Place] = None, transitions: Collection[Transition] = None,
                  arcs: Collection[Arc] = None, properties: Dict[str, Any] = None):
         super().__init__(name=name, places=places, transitions=transitions, arcs=arcs, properties=properties)
-        self.__places: Collection[WrapperPetriNet.Place] = places if places is not None else set()
-        self.__transitions: Collection[WrapperPetriNet.Transition] = transitions if transitions is not None else set()
+        self.revision = 0
+        self.__places: NamedSet = NamedSet(places if places is not None else (), owner=self)
+        self.__transitions: NamedSet = NamedSet(transitions if transitions is not None else (), owner=self)
         self.__arcs: Collection[WrapperPetriNet.Arc] = arcs if arcs is not None else set()
         self.__properties = properties if properties is not None else dict()
 
@@ -384,6 +575,12 @@ class WrapperPetriNet(pm4py.PetriNet):
 
         return True
 
+    def touch(self):
+        """
+        Mark the net as changed, its compiled form is rebuilt on next use.
+        """
+        self.revision += 1
+
     def set_custom_property(self, key, value):
         """
         Set a custom property for the PetriNet.
@@ -396,10 +593,22 @@ class WrapperPetriNet(pm4py.PetriNet):
         """
         return self.custom_properties.get(key, None)
 
-    def __get_places(self) -> Collection[WrapperPetriNet.Place]:
+    def get_place_by_name(self, name: str) -> WrapperPetriNet.Place | None:
+        """
+        Get a place of the PetriNet by name, in constant time.
+        """
+        return self.__places.get(name)
+
+    def get_transition_by_name(self, name: str) -> WrapperPetriNet.Transition | None:
+        """
+        Get a transition of the PetriNet by name, in constant time.
+        """
+        return self.__transitions.get(name)
+
+    def __get_places(self) -> NamedSet:
         return self.__places
 
-    def __get_transitions(self) -> Collection[WrapperPetriNet.Transition]:
+    def __get_transitions(self) -> NamedSet:
         return self.__transitions
 
     def __get_arcs(self) -> Collection[WrapperPetriNet.Arc]:
@@ -408,8 +617,8 @@ class WrapperPetriNet(pm4py.PetriNet):
     def __get_properties(self) -> Dict[str, Any]:
         return self.__properties
 
-    places: Collection[WrapperPetriNet.Place] = property(__get_places)
-    transitions: Collection[WrapperPetriNet.Transition] = property(__get_transitions)
+    places: NamedSet = property(__get_places)
+    transitions: NamedSet = property(__get_transitions)
     arcs: Collection[WrapperPetriNet.Arc] = property(__get_arcs)
     properties: dict = property(__get_properties)
     custom_properties: dict = property(lambda self: self.properties['custom'])
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Iterator
+
+from utils import logging_utils
+
+if TYPE_CHECKING:
+    from model.types import PetriNetType, PlaceType, RegionModelType, TransitionType
+
+logger = logging_utils.get_logger(__name__)
+
+
+def region_key(_id: str | int) -> str | int:
+    """
+    Normalise a region id: numeric strings and integers give the same key, so that "3" and 3 find the same region.
+    """
+    if isinstance(_id, str) and _id.isdigit():
+        return int(_id)
+
+    return _id
+
+
+class RegionIndex(Mapping):
+    """
+    Index of a BPMN+CPI region tree, built once per NetContext (see `NetContext.region_index`).
+
+    It maps each region id to its region, so that it can be used wherever a `dict[int, RegionModel]` of the
+    regions is expected, and it keeps the parent of each region and the places and transitions of the net
+    that belong to each region. The tree is visited iteratively, deep trees do not hit the recursion limit.
+    When two regions share the same id the first one in pre-order is kept, as `find_region_by_id` does.
+
+    Attributes:
+        root (RegionModelType): Root region.
+        preorder (tuple[RegionModelType, ...]): Regions in pre-order.
+    """
+
+    def __init__(self, root: RegionModelType, net: PetriNetType | None = None):
+        self.root = root
+        regions: dict[str | int, RegionModelType] = {}
+        parents: dict[str | int, RegionModelType | None] = {}
+        depths: dict[str | int, int] = {}
+        preorder = []
+
+        stack = [(root, None, 0)]
+        while stack:
+            region, parent, depth = stack.pop()
+            key = region_key(region.id)
+            if key in regions:
+                logger.warning("Duplicate region id %s, keeping the first region", region.id)
+                continue
+
+            regions[key] = region
+            parents[key] = parent
+            depths[key] = depth
+            preorder.append(region)
+            if region.children:
+                stack.extend((child, region, depth + 1) for child in reversed(region.children))
+
+        self.__regions = regions
+        self.__parents = parents
+        self.__depths = depths
+        self.preorder = tuple(preorder)
+
+        entry_places, exit_places, transitions = {}, {}, {}
+        if net is not None:
+            for place in net.places:
+                entry_id, exit_id = getattr(place, "entry_id", None), getattr(place, "exit_id", None)
+                if entry_id is not None:
+                    entry_places.setdefault(region_key(entry_id), []).append(place)
+                if exit_id is not None:
+                    exit_places.setdefault(region_key(exit_id), []).append(place)
+            for transition in net.transitions:
+                region_id = getattr(transition, "region_id", None)
+                if region_id is not None:
+                    transitions.setdefault(region_key(region_id), []).append(transition)
+
+        self.__entry_places = {k: tuple(v) for k, v in entry_places.items()}
+        self.__exit_places = {k: tuple(v) for k, v in exit_places.items()}
+        self.__transitions = {k: tuple(v) for k, v in transitions.items()}
+
+    def __getitem__(self, _id: str | int) -> RegionModelType:
+        return self.__regions[region_key(_id)]
+
+    def __contains__(self, _id: object) -> bool:
+        return isinstance(_id, (str, int)) and region_key(_id) in self.__regions
+
+    def __iter__(self) -> Iterator[str | int]:
+        return iter(self.__regions)
+
+    def __len__(self) -> int:
+        return len(self.__regions)
+
+    def parent(self, region: RegionModelType | str | int) -> RegionModelType | None:
+        """
+        Parent of a region.
+        :param region: Region or region id.
+        :return: the parent region, None for the root or an unknown region.
+        """
+        _id = region if isinstance(region, (str, int)) else region.id
+        return self.__parents.get(region_key(_id))
+
+    def get_depth(self, region: RegionModelType | str | int) -> int:
+        """
+        Depth of a region, 0 for the root.
+        :param region: Region or region id.
+        """
+        _id = region if isinstance(region, (str, int)) else region.id
+        return self.__depths[region_key(_id)]
+
+    def get_entry_places(self, _id: str | int) -> tuple[PlaceType, ...]:
+        """
+        Places whose entry_id is the given region.
+        """
+        return self.__entry_places.get(region_key(_id), ())
+
+    def get_exit_places(self, _id: str | int) -> tuple[PlaceType, ...]:
+        """
+        Places whose exit_id is the given region.
+        """
+        return self.__exit_places.get(region_key(_id), ())
+
+    def get_transitions(self, _id: str | int) -> tuple[TransitionType, ...]:
+        """
+        Transitions whose region_id is the given region.
+        """
+        return self.__transitions.get(region_key(_id), ())
+
+    def __repr__(self):
+        return f"RegionIndex(root={self.root.id!r}, regions={len(self)})"
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from utils import logging_utils
+
+if TYPE_CHECKING:
+    from model.region_index import RegionIndex
+    from model.types import ContextType, ExTreeType
+
+logger = logging_utils.get_logger(__name__)
+
+# Rough per-object costs used to estimate the memory held by a session.
+_NODE_BASE_BYTES = 1024
+_MARKING_ENTRY_BYTES = 256
+_NET_ELEMENT_BYTES = 2048
+
+
+class SimulationSession:
+    """
+    Live simulation state kept in memory between two calls of the execute endpoint.
+
+    Attributes:
+        id (str): Unique identifier sent back to the client.
+        ctx (ContextType): Net context holding region, Petri net, markings and strategy.
+        extree (ExTreeType): Execution tree explored so far.
+        regions (RegionIndex): Region index used by the strategies.
+        created_at (float): Creation timestamp (monotonic clock).
+        last_access (float): Last access timestamp (monotonic clock).
+        lock (threading.Lock): Lock serialising steps on the same session.
+    """
+
+    def __init__(self, _id: str, ctx: ContextType, extree: ExTreeType, regions: RegionIndex):
+        self.id = _id
+        self.ctx = ctx
+        self.extree = extree
+        self.regions = regions
+        self.created_at = time.monotonic()
+        self.last_access = self.created_at
+        self.lock = threading.Lock()
+
+    def estimate_size(self) -> int:
+        """
+        Estimate the memory held by the session in bytes.
+        The estimate grows with the number of tree nodes and cached steps and with the size of the net.
+        """
+        net = self.ctx.net
+        net_size = (len(net.places) + len(net.transitions) + len(net.arcs)) * _NET_ELEMENT_BYTES
+        nodes = len(self.extree) + len(self.ctx.step_cache)
+        return net_size + nodes * (_NODE_BASE_BYTES + len(net.places) * _MARKING_ENTRY_BYTES)
+
+    def __repr__(self):
+        return f"SimulationSession(id={self.id!r})"
+
+
+class SessionStore:
+    """
+    Thread safe in-memory store of simulation sessions with TTL and LRU eviction.
+
+    Sessions not accessed for more than `ttl` seconds expire. When there are more than `max_sessions`
+    sessions or their estimated size exceeds `memory_budget` bytes, the least recently used ones are evicted.
+
+    Attributes:
+        ttl (float): Time to live of an idle session in seconds.
+        max_sessions (int): Maximum number of sessions kept at the same time.
+        memory_budget (int): Maximum estimated memory of all sessions in bytes.
+    """
+
+    def __init__(self, ttl: float = 1800.0, max_sessions: int = 256, memory_budget: int = 512 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.memory_budget = memory_budget
+        self.__sessions: OrderedDict[str, SimulationSession] = OrderedDict()
+        self.__sizes: dict[str, int] = {}
+        self.__total_size = 0
+        self.__lock = threading.Lock()
+
+    def create(self, ctx: ContextType, extree: ExTreeType, regions: RegionIndex) -> SimulationSession:
+        """
+        Create a new session and store it.
+        :param ctx: Net context of the session.
+        :param extree: Execution tree of the session.
+        :param regions: Region index of the session.
+        :return: the new session.
+        """
+        session = SimulationSession(uuid.uuid4().hex, ctx, extree, regions)
+        with self.__lock:
+            self.__sessions[session.id] = session
+            self.__set_size(session.id, session.estimate_size())
+            self.__evict(keep=session.id)
+
+        logger.info("Created session %s", session.id)
+        return session
+
+    def get(self, session_id: str) -> SimulationSession | None:
+        """
+        Get a session by id and mark it as recently used.
+        :param session_id: Id of the session.
+        :return: the session or None if it does not exist or it is expired.
+        """
+        with self.__lock:
+            session = self.__sessions.get(session_id)
+            if session is None:
+                return None
+
+            if self.__is_expired(session, time.monotonic()):
+                logger.info("Session %s expired", session_id)
+                self.__discard(session_id)
+                return None
+
+            session.last_access = time.monotonic()
+            self.__sessions.move_to_end(session_id)
+            return session
+
+    def update(self, session: SimulationSession):
+        """
+        Refresh the size estimate of a session after a step and apply the eviction policies.
+        :param session: Session to refresh.
+        """
+        with self.__lock:
+            if session.id not in self.__sessions:
+                return
+
+            self.__set_size(session.id, session.estimate_size())
+            self.__evict(keep=session.id)
+
+    def remove(self, session_id: str) -> bool:
+        """
+        Remove a session.
+        :param session_id: Id of the session.
+        :return: True if the session existed, False otherwise.
+        """
+        with self.__lock:
+            return self.__discard(session_id)
+
+    def clear(self):
+        with self.__lock:
+            self.__sessions.clear()
+            self.__sizes.clear()
+            self.__total_size = 0
+
+    @property
+    def total_size(self) -> int:
+        with self.__lock:
+            return self.__total_size
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__sessions)
+
+    def __contains__(self, session_id: str):
+        with self.__lock:
+            return session_id in self.__sessions
+
+    def __is_expired(self, session: SimulationSession, now: float) -> bool:
+        return self.ttl is not None and now - session.last_access > self.ttl
+
+    def __set_size(self, session_id: str, size: int):
+        self.__total_size += size - self.__sizes.get(session_id, 0)
+        self.__sizes[session_id] = size
+
+    def __discard(self, session_id: str) -> bool:
+        self.__total_size -= self.__sizes.pop(session_id, 0)
+        return self.__sessions.pop(session_id, None) is not None
+
+    def __evict(self, keep: str | None = None):
+        now = time.monotonic()
+        for session_id in [s.id for s in self.__sessions.values() if self.__is_expired(s, now)]:
+            logger.info("Session %s expired", session_id)
+            self.__discard(session_id)
+
+        # Least recently used sessions are at the beginning of the ordered dict
+        while self.__sessions and (len(self.__sessions) > self.max_sessions
+                                   or self.__total_size > self.memory_budget):
+            session_id = next(iter(self.__sessions))
+            if session_id == keep:
+                if len(self.__sessions) == 1:
+                    break
+                self.__sessions.move_to_end(session_id)
+                continue
+            logger.info("Evicting session %s", session_id)
+            self.__discard(session_id)
@@ -1,8 +1,9 @@
 import enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
 
 if TYPE_CHECKING:
 	from model.region import RegionModel
+	from model.region_index import RegionIndex
 
 class ActivityState(enum.IntEnum):
 	WILL_NOT_BE_EXECUTED = -1
@@ -25,14 +26,43 @@ def propagate_status(region: "RegionModel", status: dict["RegionModel", "Activit
 	if region.is_task():
 		return
 
+	for child in region.children:
+		propagate_status(child, status)
+
+	update_region_status(region, status)
+
+
+def propagate_dirty_status(regions: "RegionIndex", status: dict["RegionModel", "ActivityState"],
+						   dirty: Iterable["RegionModel"]):
+	"""
+	Propagate the status of the changed regions up to the root, leaving the rest of the tree untouched.
+	`status` must be propagated (see propagate_status) except for the `dirty` regions: the statuses of the other
+	regions depend only on their subtree, so only the ancestors of the dirty regions can change.
+	:param regions: Region index giving the parent and the depth of each region.
+	:param status: Status of the regions, updated in place.
+	:param dirty: Regions whose status changed since the last propagation.
+	"""
+	pending = {}
+	for region in dirty:
+		while region is not None and region.id not in pending:
+			pending[region.id] = region
+			region = regions.parent(region)
+
+	# Children before parents, as in the recursive propagation
+	for region in sorted(pending.values(), key=regions.get_depth, reverse=True):
+		if not region.is_task():
+			update_region_status(region, status)
+
+
+def update_region_status(region: "RegionModel", status: dict["RegionModel", "ActivityState"]):
+	"""
+	Set the status of a region from the status of its children, which must be already propagated.
+	"""
 	# Capture status calculated by saturate (based on tokens)
 	prior_status = status.get(region, ActivityState.WAITING)
 	
 	status[region] = ActivityState.WAITING
 
-	for child in region.children:
-		propagate_status(child, status)
-
 	if region.is_sequential():
 		child1 = status[region.children[0]]
 		child2 = status[region.children[1]]
@@ -79,8 +109,28 @@ def propagate_status(region: "RegionModel", status: dict["RegionModel", "Activit
 
 
 def mark_as_skipped(region: "RegionModel", status: dict["RegionModel", "ActivityState"]):
-	"""Mark a region and all its children as WILL_NOT_BE_EXECUTED (Skipped)."""
+	"""
+	Mark a region as WILL_NOT_BE_EXECUTED (Skipped).
+	Only the root of the skipped subtree is marked, its descendants are resolved by resolve_skipped.
+	"""
 	status[region] = ActivityState.WILL_NOT_BE_EXECUTED
-	if region.children:
-		for child in region.children:
-			mark_as_skipped(child, status)
+
+
+def resolve_skipped(region: "RegionModel", status: dict["RegionModel", "ActivityState"]) -> dict["RegionModel", "ActivityState"]:
+	"""
+	Status of the regions of the tree of `region`, in preorder, where the descendants of a skipped region are skipped.
+	mark_as_skipped marks only the root of a skipped subtree, the subtree is resolved once the status is final.
+	:param region: Root of the tree.
+	:param status: Status of the regions, as propagated.
+	:return: The resolved status of every region of the tree.
+	"""
+	resolved = {}
+	stack = [(region, False)]
+	while stack:
+		region, skipped = stack.pop()
+		skipped = skipped or status.get(region) == ActivityState.WILL_NOT_BE_EXECUTED
+		resolved[region] = ActivityState.WILL_NOT_BE_EXECUTED if skipped else status.get(region, ActivityState.WAITING)
+		if region.children:
+			stack.extend((child, skipped) for child in reversed(region.children))
+
+	return resolved
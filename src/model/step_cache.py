@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, NamedTuple
+
+from utils import logging_utils
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from model.status import ActivityState
+    from model.types import MarkingType, RegionModelType, TransitionType
+
+logger = logging_utils.get_logger(__name__)
+
+
+class StepResult(NamedTuple):
+    """
+    Result of a step, as returned by the `consume` of the strategies, with the status changes.
+
+    Attributes:
+        marking (MarkingType): Marking reached by the step.
+        probability (float): Probability of the step.
+        impacts (np.ndarray): Impacts of the step, as a read only float array.
+        execution_time (float): Duration of the step.
+        decisions (tuple[TransitionType, ...]): Decisions executed, including the defaults.
+        status (dict[str | int, ActivityState]): New status of the regions whose status changed, by region id.
+    """
+    marking: MarkingType
+    probability: float
+    impacts: np.ndarray
+    execution_time: float
+    decisions: tuple[TransitionType, ...]
+    status: dict[str | int, ActivityState]
+
+
+class StepCache:
+    """
+    LRU cache of the steps of a NetContext.
+
+    A step depends on the marking, on the user decisions, on the time step and, since the strategies only
+    update the regions whose places changed, on the status of the regions before the step. Steps that sample
+    the default of a nature or loop region are not deterministic, the caller must not store them (see `bypass`).
+
+    Attributes:
+        maxsize (int): Maximum number of steps kept, 0 disables the cache.
+        hits (int): Lookups that found a step.
+        misses (int): Lookups that did not find a step.
+        bypassed (int): Steps that could not be stored because they sampled a default.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.__steps: OrderedDict[tuple, StepResult] = OrderedDict()
+
+    @staticmethod
+    def key(marking: MarkingType, decisions: list[TransitionType], time_step: float | None,
+            status: dict[RegionModelType, ActivityState]) -> tuple:
+        """
+        Key of a step.
+        :param marking: Marking the step starts from.
+        :param decisions: Transitions chosen by the user.
+        :param time_step: Time step of the TimeStrategy, None for a saturation.
+        :param status: Status of the regions before the step.
+        """
+        # The marking itself, not its fingerprint: markings with the same fingerprint are told apart by equality
+        return (marking, tuple(sorted(t.name for t in decisions)), time_step,
+                frozenset((r.id, s) for r, s in status.items()))
+
+    def get(self, key: tuple) -> StepResult | None:
+        """
+        Get a step and mark it as recently used.
+        :return: the step or None if it is not cached.
+        """
+        result = self.__steps.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__steps.move_to_end(key)
+        return result
+
+    def put(self, key: tuple, result: StepResult):
+        """
+        Store a step, evicting the least recently used ones beyond `maxsize`.
+        """
+        if self.maxsize <= 0:
+            return
+
+        self.__steps[key] = result
+        self.__steps.move_to_end(key)
+        while len(self.__steps) > self.maxsize:
+            self.__steps.popitem(last=False)
+
+    def bypass(self):
+        """
+        Count a step that sampled a default and was not stored.
+        """
+        logger.debug("Step sampled a default, not caching it")
+        self.bypassed += 1
+
+    def clear(self):
+        self.__steps.clear()
+
+    def __len__(self):
+        return len(self.__steps)
+
+    def __repr__(self):
+        return (f"StepCache(size={len(self)}, maxsize={self.maxsize}, hits={self.hits}, misses={self.misses}, "
+                f"bypassed={self.bypassed})")
@@ -1,109 +1,206 @@
 #  Copyright (c) 2025.
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Protocol
+from typing import TYPE_CHECKING, Iterable, Protocol, Sequence
 
-from pm4py.objects.petri_net.semantics import ClassicSemantics
+import numpy as np
 
-from utils.net_utils import is_final_marking
+from model.petri_net.time_spin import ArrayTimeMarking
+from model.region_index import RegionIndex
+from model.status import ActivityState, propagate_dirty_status, propagate_status
+from strategy.scheduler import EventScheduler
+from utils import logging_utils
 
 if TYPE_CHECKING:
-    from model.types import ContextType, MarkingType, TransitionType, PlaceType
+    from model.types import ContextType, MarkingType, TransitionType, PlaceType, RegionModelType
+
+logger = logging_utils.get_logger(__name__)
 
 
 class StrategyProto(Protocol):
     """Protocol for strategy classes."""
 
-    def saturate(self, ctx: "ContextType", marking: "MarkingType", regions:dict[int: "RegionModelType"], status: dict["RegionModelType", "ActivityState"]) -> tuple[MarkingType, float, list[float], float]:
+    def saturate(self, ctx: "ContextType", marking: "MarkingType", regions:dict[int: "RegionModelType"], status: dict["RegionModelType", "ActivityState"]) -> tuple[MarkingType, float, np.ndarray, float]:
         """Saturate the Petri net based on the current marking.
         :param ctx: Net context
         :param marking: Current marking
-        :rtype: tuple[MarkingType, float, list[float], float]
+        :rtype: tuple[MarkingType, float, np.ndarray, float]
         :return: new marking, probability of the saturation, impacts of the saturation, execution time of the saturation
         """
         raise NotImplementedError
 
-    def consume(self, ctx: "ContextType", marking: "MarkingType", regions:dict[int: "RegionModelType"], status: dict["RegionModelType", "ActivityState"], choices: list["TransitionType"] | None = None) -> tuple[MarkingType, float, list[float], float]:
+    def consume(self, ctx: "ContextType", marking: "MarkingType", regions:dict[int: "RegionModelType"], status: dict["RegionModelType", "ActivityState"], choices: list["TransitionType"] | None = None) -> tuple[MarkingType, float, np.ndarray, float]:
         """Consume the Petri net based on the current marking and choices.
         :param ctx: Net context
         :param marking: Current marking
         :param choices: List of user choices (transitions to fire)
-        :rtype: tuple[MarkingType, float, list[float], float]
+        :rtype: tuple[MarkingType, float, np.ndarray, float]
         :return: new marking, probability of the consumption, impacts of the consumption, execution time of the consumption
         """
         raise NotImplementedError
 
 def get_min_delta(ctx: "ContextType", m: "MarkingType") -> tuple[float, list["TransitionType"]]:
-    if is_final_marking(ctx, m):
-        return float('inf'), []
-
-    min_delta_transitions = []
-
-    # Get all input places that enables transitions using pm4py semantics
-    raw_semantic = ClassicSemantics()
-    active_transitions = raw_semantic.enabled_transitions(ctx.net, m.tokens)
-    valid_places = set()
-    for t in active_transitions:
-        input_places = [arc.source for arc in t.in_arcs]
-        for place in input_places:
-            valid_places.add(place)
-
-    # Calculate the minimum delta time for all tokens in valid places
-    min_delta = float('inf')
-    for place in valid_places:
-        token, age, _ = m[place]
-        first_out_transition = get_first_target(place)
-
-        # Check if the first outgoing transition is a parallel exit
-        if is_parallel_exit(first_out_transition):
-            # Take max age among all input places of the parallel exit transition
-            parallel_exit_places = _get_parallel_exit_places(first_out_transition)
-            max_delta = [p.duration - m[p].age for p in parallel_exit_places]
-            min_delta = min(min_delta, max(max_delta))
-        else:
-            min_delta = min(min_delta, place.duration - age)
-
-    # Get all transitions that can be fired at min_delta
-    for place in valid_places:
-        token, age, _ = m[place]
-        if place.duration - age == min_delta:
-            for arc in place.out_arcs:
-                min_delta_transitions.append(arc.target)
-
-    return min_delta, min_delta_transitions
-
-def get_first_source(component: "TransitionType | PlaceType") -> "TransitionType | PlaceType":
-    return list(component.in_arcs)[0].source
-
-def get_first_target(component: "TransitionType | PlaceType") -> "TransitionType | PlaceType":
-    return list(component.out_arcs)[0].target
+    """
+    Compute the minimum time to wait before some transition can fire.
+    The saturation loops keep an `EventScheduler` alive across steps, this builds a new one for a single query.
+    :param ctx: Net context
+    :param m: Current marking
+    :return: the minimum delta and the transitions that can be fired after it.
+    """
+    min_delta, transitions = EventScheduler(ctx, m).next_events(m)
+    return min_delta, ctx.compiled.to_transitions(transitions)
 
-def _get_parallel_exit_places(t: "TransitionType") -> list["PlaceType"]:
-    places = []
-    if not is_parallel_exit(t):
-        return places
+def get_first_source(ctx: "ContextType", component: "TransitionType | PlaceType") -> "TransitionType | PlaceType":
+    return ctx.topology.first_source[component]
 
-    for arc in t.in_arcs:
-        places.append(arc.source)
+def get_first_target(ctx: "ContextType", component: "TransitionType | PlaceType") -> "TransitionType | PlaceType":
+    return ctx.topology.first_target[component]
 
-    return places
+def _get_parallel_exit_places(ctx: "ContextType", t: "TransitionType") -> list["PlaceType"]:
+    return list(ctx.topology.join_groups.get(t, ()))
 
-def is_parallel_exit(t: "TransitionType") -> bool:
-    return t.region_type == "parallel" and len(t.in_arcs) > 1
+def is_parallel_exit(ctx: "ContextType", t: "TransitionType") -> bool:
+    return t in ctx.topology.join_groups
 
 
 def execute_transition(ctx: ContextType, t: TransitionType, marking: MarkingType) -> tuple[
-    MarkingType, float, list[float]]:
+    MarkingType, float, np.ndarray]:
     """
     Execute a transition in the Petri net and return the new marking, probability of the transition, and impacts.
     :param ctx:
     :param t:
     :param marking:
-    :return: marking after transition execution, probability of the transition, impacts of the transition.
+    :return: marking after transition execution, probability of the transition, impacts of the transition (a read
+        only row of `CompiledNet.transition_impacts`, zeros when the input place does not define impacts).
     """
-    marking = ctx.semantic.execute(ctx.net, t, marking)
-    in_place = list(t.in_arcs)[0].source
-    probability = t.probability
-    impacts = in_place.impacts
+    return execute_transition_compiled(ctx, ctx.compiled.transition_index[t], marking)
 
-    return marking, probability, impacts
+
+def execute_transition_compiled(ctx: ContextType, t: int, marking: MarkingType) -> tuple[
+    MarkingType, float, np.ndarray]:
+    """
+    Same as `execute_transition` but the transition is given by its index in the compiled net.
+    """
+    compiled = ctx.compiled
+    marking = ctx.semantic.execute_compiled(compiled, t, marking)
+
+    return marking, compiled.probability[t], compiled.transition_impacts[t]
+
+
+def execute_transitions_compiled(ctx: ContextType, transitions: Sequence[int], marking: MarkingType,
+                                 probability: float, impacts: np.ndarray) -> tuple[
+    MarkingType, list[int], float, np.ndarray]:
+    """
+    Execute the transitions due at the same instant, as `execute_transition_compiled` called on each of them.
+    When the transitions do not conflict they are fired in one pass (see `TimeNetSematic.fire_batch_compiled`),
+    otherwise they are executed one after the other. The probability and impacts of every transition are
+    accumulated, even when the transition is not enabled.
+    :param ctx: Net context.
+    :param transitions: Indices of the transitions, in execution order.
+    :param marking: Current marking.
+    :param probability: Probability accumulated so far.
+    :param impacts: Impacts accumulated so far.
+    :return: the new marking, the transitions that fired, the probability and the impacts.
+    """
+    compiled = ctx.compiled
+    semantic = ctx.semantic
+    # One vector add per transition, in firing order, so that the sums round as in a sequential execution
+    impacts = np.array(impacts, dtype=np.float64)
+    transition_impacts = compiled.transition_impacts
+    for t in transitions:
+        probability *= compiled.probability[t]
+        impacts += transition_impacts[t]
+
+    conflicts = semantic.batch_conflicts(compiled, transitions)
+    if conflicts:
+        logger.debug("Conflicting transitions %s, executing them one at a time", conflicts)
+        fired = []
+        for t in transitions:
+            if semantic.is_enabled_compiled(compiled, t, marking):
+                marking = semantic.fire_compiled(compiled, t, marking)
+                fired.append(t)
+        return marking, fired, probability, impacts
+
+    # Without shared places the enabling of a transition does not depend on the others
+    fired = [t for t in transitions if semantic.is_enabled_compiled(compiled, t, marking)]
+    if fired:
+        marking = semantic.fire_batch_compiled(compiled, fired, marking)
+
+    return marking, fired, probability, impacts
+
+
+def update_status(ctx: ContextType, regions: dict[int, RegionModelType], status: dict[RegionModelType, ActivityState],
+                  marking: MarkingType, fired: Iterable[int] = (), since: MarkingType | None = None):
+    """
+    Update the status of the regions at the end of a saturation and propagate it to the parent regions.
+    The regions of the fired transitions become active, a region is active while one of its entry places holds
+    tokens and a task is completed once its exit place holds tokens or has been visited.
+
+    When `since` is given and `regions` is a RegionIndex, `status` must be the propagated status of the `since`
+    marking: only the regions of the fired transitions and of the places whose tokens or visits changed are
+    updated, and only their ancestors are propagated again. Otherwise every place is checked and the whole tree
+    is propagated.
+    :param ctx: Net context.
+    :param regions: Regions by id, the root region has id 0.
+    :param status: Status of the regions, updated in place.
+    :param marking: Marking reached by the saturation.
+    :param fired: Indices of the transitions fired during the saturation, in firing order.
+    :param since: Marking whose propagated status is `status`.
+    """
+    compiled = ctx.compiled
+    if since is None or not isinstance(regions, RegionIndex):
+        for t in fired:
+            status[regions[int(compiled.region_id[t])]] = ActivityState.ACTIVE
+        for p in ctx.net.places:
+            _update_place_status(regions, status, marking, p)
+        propagate_status(regions[0], status)
+        return
+
+    marking = ArrayTimeMarking.of(compiled, marking)
+    since = ArrayTimeMarking.of(compiled, since)
+    previous = {}
+    for t in fired:
+        region = regions[int(compiled.region_id[t])]
+        previous.setdefault(region, status.get(region))
+        status[region] = ActivityState.ACTIVE
+
+    # Regions whose entry or exit places changed, their places are checked again in the order of the net
+    changed = np.flatnonzero((marking.token_array != since.token_array) | (marking.visit_array != since.visit_array))
+    touched = {}
+    for p in changed.tolist():
+        place = compiled.places[p]
+        for _id in (getattr(place, "entry_id", None), getattr(place, "exit_id", None)):
+            if _id is not None and _id in regions:
+                touched[regions[_id].id] = regions[_id]
+    for region in previous:
+        touched[region.id] = region
+
+    for region in touched.values():
+        previous.setdefault(region, status.get(region))
+        places = {*regions.get_entry_places(region.id), *regions.get_exit_places(region.id)}
+        for place in sorted(places, key=compiled.place_index.__getitem__):
+            _update_place_status(regions, status, marking, place, region)
+
+    propagate_dirty_status(regions, status, [r for r, s in previous.items() if status.get(r) != s])
+
+
+def _update_place_status(regions: dict[int, RegionModelType], status: dict[RegionModelType, ActivityState],
+                         marking: MarkingType, place: PlaceType, only: RegionModelType | None = None):
+    entry_id = getattr(place, "entry_id", None)
+    exit_id = getattr(place, "exit_id", None)
+
+    # Check Active/Running state via Entry Place
+    if entry_id is not None and int(entry_id) in regions:
+        region = regions[int(entry_id)]
+        if (only is None or region is only) and marking[place].token > 0:
+            status[region] = ActivityState.ACTIVE
+
+    # Check Status via Exit Place
+    if exit_id is not None and int(exit_id) in regions:
+        region = regions[int(exit_id)]
+        if (only is None or region is only) and region.is_task():
+            item = marking[place]
+
+            # If token is at exit or visited, regarding it as Completed
+            if item.token > 0 or item.visit_count > 0:
+                status[region] = ActivityState.COMPLETED
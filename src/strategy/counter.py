@@ -1,28 +1,30 @@
 #  Copyright (c) 2025.
-import copy
 
+from model.petri_net.time_spin import ArrayTimeMarking
 from model.region import RegionType
-from model.status import ActivityState, propagate_status
-from strategy.base import get_min_delta, execute_transition
-from strategy.execution import get_default_choices, add_impacts
+from strategy.base import execute_transition, execute_transitions_compiled, update_status
+from strategy.execution import get_default_choices
+from strategy.scheduler import EventScheduler
 from utils import logging_utils
-from utils.net_utils import get_empty_impacts
 
 logger = logging_utils.get_logger(__name__)
 
 class CounterExecution:
 
-    def saturate(self, ctx: "ContextType", marking: "MarkingType", regions:dict[int: "RegionModelType"], status: dict["RegionModelType", "ActivityState"]):
+    def saturate(self, ctx: "ContextType", marking: "MarkingType", regions:dict[int: "RegionModelType"], status: dict["RegionModelType", "ActivityState"],
+                 since: "MarkingType | None" = None):
         logger.debug(f"Saturating marking {marking}")
 
-        current_marking = copy.deepcopy(marking)
+        compiled = ctx.compiled
+        current_marking = ArrayTimeMarking.of(compiled, marking)
+        scheduler = EventScheduler(ctx, current_marking)
         probability = 1.0
-        impacts = get_empty_impacts(ctx.net)
-        default_impacts = get_empty_impacts(ctx.net)
+        impacts = ctx.topology.empty_impacts()
         execution_time = 0.0
+        fired = []
 
         while True:
-            min_delta, transitions_to_fire = get_min_delta(ctx, current_marking)
+            min_delta, transitions_to_fire = scheduler.next_events(current_marking)
             min_delta = max(min_delta, 0)
 
             if len(transitions_to_fire) == 0:
@@ -31,46 +33,28 @@ class CounterExecution:
 
             logger.debug("Adding %f time to marking", min_delta)
             current_marking = current_marking.add_time(min_delta)
+            scheduler.advance(min_delta)
             execution_time += min_delta
 
-            if any(map(lambda t: t.stop, transitions_to_fire)):
+            if any(compiled.stop[t] for t in transitions_to_fire):
                 logger.debug("Stop transition found, exiting saturation")
                 break
 
-            for t in transitions_to_fire:
-                region = regions[int(t.region_id)]
-                status[region]= ActivityState.ACTIVE
-                logger.debug(f"Executing transition {t}")
-                current_marking, p, imp = execute_transition(ctx, t, current_marking)
-                probability *= p
-                impacts = add_impacts(impacts, imp or default_impacts)
-                logger.debug(
-                    f"After executing {t}, marking {current_marking}, probability {probability}, impacts {impacts}, execution_time {execution_time}")
-
-        # Update completed tasks status
-        for p in ctx.net.places:
-            entry_id = getattr(p, "entry_id", None)
-            exit_id = getattr(p, "exit_id", None)
-
-            # Check Active/Running state via Entry Place
-            if entry_id is not None and int(entry_id) in regions:
-                region = regions[int(entry_id)]
-                if current_marking[p].token > 0:
-                    status[region] = ActivityState.ACTIVE
-
-            # Check Status via Exit Place
-            if exit_id is not None and int(exit_id) in regions:
-                region = regions[int(exit_id)]
-                if region.is_task():
-                    item = current_marking[p]
-                    
-                    # If token is at exit or visited, regarding it as Completed
-                    if item.token > 0 or item.visit_count > 0:
-                         status[region] = ActivityState.COMPLETED
-                         
-        propagate_status(regions[0], status)
-                         
-        propagate_status(regions[0], status)
+            fired.extend(transitions_to_fire)
+            logger.debug("Executing transitions %s", compiled.to_transitions(transitions_to_fire))
+            current_marking, executed, probability, impacts = execute_transitions_compiled(
+                ctx, transitions_to_fire, current_marking, probability, impacts
+            )
+            if executed:
+                scheduler.fired(executed, current_marking)
+            elif min_delta == 0:
+                # Nothing fired and the clock did not move, the next round would offer the same transitions
+                logger.warning("No transition of %s could fire, stopping", compiled.to_transitions(transitions_to_fire))
+                break
+            logger.debug("After executing %s, marking %s, probability %s, impacts %s",
+                         compiled.to_transitions(executed), current_marking, probability, impacts)
+
+        update_status(ctx, regions, status, current_marking, fired, since)
 
         logger.debug(
             f"Saturation complete. Final marking {current_marking}, probability {probability}, impacts {impacts}, execution_time {execution_time}")
@@ -85,26 +69,24 @@ class CounterExecution:
         decisions = get_default_choices(ctx, marking, decisions)
         logger.debug("Final decisions after adding defaults and filter: %s", decisions)
 
-        impacts = get_empty_impacts(ctx.net)
-        default_impacts = get_empty_impacts(ctx.net)
+        impacts = ctx.topology.empty_impacts()
         # No extra time added for choices, assuming immediate execution
         execution_time = 0.0
         probability = 1.0
 
-        current_marking = copy.deepcopy(marking)
+        current_marking = marking
 
         for t in decisions:
             logger.debug(f"Executing decisions transition {t}")
-            in_place = list(t.in_arcs)[0].source
-            current_marking = ctx.semantic.execute(ctx.net, t, current_marking)
-            probability *= t.probability
-            impacts = [imp + imp_t for imp, imp_t in zip(impacts, in_place.impacts or default_impacts)]
+            current_marking, p, t_impacts = execute_transition(ctx, t, current_marking)
+            probability *= p
+            impacts += t_impacts
             logger.debug(
                 f"After executing decisions {t}, marking {current_marking}, probability {probability}, impacts {impacts}, execution_time {execution_time}")
 
-        new_marking, prob, imp, exec_time = self.saturate(ctx, current_marking, regions, status)
+        new_marking, prob, imp, exec_time = self.saturate(ctx, current_marking, regions, status, since=marking)
         probability *= prob
-        impacts = [imp1 + imp2 for imp1, imp2 in zip(impacts, imp)]
+        impacts += imp
         execution_time += exec_time
 
         logger.debug(
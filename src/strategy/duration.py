@@ -4,13 +4,13 @@ import copy
 from typing import TYPE_CHECKING
 
 import deprecation
+import numpy as np
 from pm4py.objects.petri_net.semantics import ClassicSemantics
 
 from model.status import ActivityState
 from strategy.execution import add_impacts, get_default_choices
 from utils import logging_utils
 from utils.exceptions import MaxIterationsError
-from utils.net_utils import get_empty_impacts
 
 if TYPE_CHECKING:
     from model.types import MarkingType, TransitionType, ContextType, RegionModelType
@@ -24,7 +24,7 @@ class DurationExecution:
     It calculates the time to consume to reach a saturated marking based on the current marking.
     """
 
-    def saturate(self, ctx: ContextType, marking: MarkingType) -> tuple[MarkingType, float, list[float], float, float]:
+    def saturate(self, ctx: ContextType, marking: MarkingType) -> tuple[MarkingType, float, np.ndarray, float, float]:
         """
         Calculate time to consume to reach a saturated marking in the Petri net based on the current marking.
         :param ctx: current context containing the net.
@@ -35,7 +35,7 @@ class DurationExecution:
         duration, can_continue = calculate_steps(ctx, marking)
         original_duration = duration
         probability = 1.0
-        impact = get_empty_impacts(ctx.net)
+        impact = ctx.topology.empty_impacts()
 
         semantics = ClassicSemantics()
 
@@ -66,14 +66,14 @@ class DurationExecution:
             for t in ctx.semantic.enabled_transitions(ctx.net, marking):
                 marking = ctx.semantic.execute(ctx.net, t, marking)
                 probability = t.probability * probability
-                in_place = list(t.in_arcs)[0].source
+                in_place = ctx.topology.first_source[t]
                 impact = add_impacts(impact, in_place.impacts)
                 logger.debug(f"Fired transition {t}, new marking {marking}, probability {probability}, impact {impact}")
 
         return marking, probability, impact, original_duration - duration, duration
 
     def consume(self, ctx: ContextType, marking: MarkingType, status: dict[RegionModelType, ActivityState], choices: list[TransitionType] | None = None) -> tuple[
-        MarkingType, float, list[float], float]:
+        MarkingType, float, np.ndarray, float]:
         """
         Consume the Petri net based on the current marking and choices.
         :param ctx: current context containing the net.
@@ -84,7 +84,7 @@ class DurationExecution:
         if choices is None:
             choices = []
 
-        impact = get_empty_impacts(ctx.net)
+        impact = ctx.topology.empty_impacts()
         duration = 0
         probability = 1
 
@@ -94,7 +94,7 @@ class DurationExecution:
 
         logger.info(f"Firing user choices {user_choices}")
         for choice in user_choices:
-            in_place = list(choice.in_arcs)[0].source
+            in_place = ctx.topology.first_source[choice]
             new_marking = ctx.semantic.execute(ctx.net, choice, new_marking)
             duration += in_place.duration
             probability *= choice.probability
@@ -142,7 +142,7 @@ def calculate_steps(ctx: ContextType, marking: MarkingType, max_steps: int=1000)
         # Fire enabled transitions
         for t in __enabled_transitions:
             logger.debug(f"{current_step} step: Firing transition {t}")
-            in_place = list(t.in_arcs)[0].source
+            in_place = ctx.topology.first_source[t]
             __duration += durations[in_place]
             raw_marking = semantics.execute(t, ctx.net, raw_marking)
 
@@ -3,12 +3,13 @@ from __future__ import annotations
 import copy
 from typing import Collection, TYPE_CHECKING
 
+import numpy as np
+
 from model.region import RegionType
 from model.status import ActivityState
 from strategy.base import execute_transition
 from utils import logging_utils
-from utils.default import get_default_transition
-from utils.net_utils import get_region_by_id, get_empty_impacts
+from utils.default import resolve_default_transition
 
 if TYPE_CHECKING:
     from model.types import ContextType, MarkingType, TransitionType, PlaceType, RegionModelType
@@ -41,11 +42,11 @@ class ClassicExecution:
             # Check if transition after place is parallel
             current_delta = duration - marking[p].age
             if len(p.out_arcs) > 0:
-                transition = list(p.out_arcs)[0].target
-                out_place = list(transition.out_arcs)[0].target
+                transition = ctx.topology.first_target[p]
+                out_place = ctx.topology.first_target[transition]
                 exit_id = out_place.exit_id
                 if exit_id is not None:
-                    exit_region = get_region_by_id(ctx.region, exit_id)
+                    exit_region = ctx.region_index.get(exit_id)
                     if exit_region.type == RegionType.PARALLEL:
                         logger.debug(f"Place {p} is in parallel region and is an exit place, skipping its duration.")
                         # If the place is parallel and is an exit place, skip the duration of the place
@@ -61,7 +62,7 @@ class ClassicExecution:
         return marking.add_time(min_delta), min_delta
 
     def consume(self, ctx: ContextType, marking: MarkingType, choices: Collection[TransitionType] | None = None) -> \
-            tuple[MarkingType, int, list[float], float]:
+            tuple[MarkingType, int, np.ndarray, float]:
         """
         Consume the current marking by executing transitions based on user choices or default choices if not selected.
         :param ctx: Current context containing the net and semantic.
@@ -82,7 +83,7 @@ class ClassicExecution:
         return new_marking, probability, impacts, delta
 
     def raw_consume(self, ctx: ContextType, marking: MarkingType, status: dict[RegionModelType, ActivityState], user_choices: Collection[TransitionType] | None = None) -> tuple[
-        MarkingType, int, list[float], float]:
+        MarkingType, int, np.ndarray, float]:
         """
         Recursive function to consume the current marking until there's one (or more)
         transitions with stop that isn't in user_choices
@@ -101,14 +102,14 @@ class ClassicExecution:
         enabled_transitions = ctx.semantic.enabled_transitions(ctx.net, saturated_marking)
         user_choices = set(user_choices) & enabled_transitions
 
-        default_impacts = get_empty_impacts(ctx.net)
+        default_impacts = ctx.topology.empty_impacts()
 
         # Check if there is a transition with stop that's not in choices
         strategy_get_choices = get_choices(ctx, marking)
         logger.debug(f"Strategy get_choices: {strategy_get_choices}, user_choices: {user_choices}")
         is_place_chosen = {p: False for p in strategy_get_choices.keys()}
         for t in user_choices:
-            in_place = list(t.in_arcs)[0].source
+            in_place = ctx.topology.first_source[t]
             is_place_chosen[in_place] = True
 
         # if not all place are chosen then stop or if marking == final_marking
@@ -195,7 +196,7 @@ def get_choices(ctx: ContextType, marking: MarkingType) -> dict[PlaceType, list[
 
     groups = {}
     for t in enabled_transitions:
-        parent_place = list(t.in_arcs)[0].source
+        parent_place = ctx.topology.first_source[t]
         if groups.get(parent_place) is None:
             groups.update({parent_place: []})
 
@@ -220,6 +221,16 @@ def get_default_choices(ctx: ContextType, marking: MarkingType, choices: list[Tr
     :param choices: Transitions chosen by the user.
     :return: Set of default transitions.
     """
+    return resolve_default_choices(ctx, marking, choices)[0]
+
+
+def resolve_default_choices(ctx: ContextType, marking: MarkingType, choices: list[TransitionType] = None) -> tuple[
+    list[TransitionType], bool]:
+    """
+    Same as `get_default_choices`, also telling whether one of the defaults was sampled, i.e. whether the result
+    may change if it is called again. Passing the result back as choices adds no other default.
+    :return: Set of default transitions and whether one of them was sampled.
+    """
     logger.debug(f"Called get_default_choices with marking: {marking}, choices: {choices}")
     if choices is None:
         choices = []
@@ -229,6 +240,7 @@ def get_default_choices(ctx: ContextType, marking: MarkingType, choices: list[Tr
     # Flat values from the dictionary to a set
     all_choices = set([t for place in all_choices_dict for t in all_choices_dict[place]])
     new_choices = set(choices) & all_choices
+    sampled = False
 
     for place in all_choices_dict:
         place_choices = all_choices_dict[place]
@@ -240,28 +252,29 @@ def get_default_choices(ctx: ContextType, marking: MarkingType, choices: list[Tr
         if found:
             continue
 
-        default_transition = get_default_transition(ctx, place, marking)
+        default_transition, place_sampled = resolve_default_transition(ctx, place, marking)
+        sampled |= place_sampled
         if default_transition is None:
             logger.debug(f"Default transition for place {place} is None for marking: {marking}, place_info: {place.custom_properties}")
             continue
         new_choices.add(default_transition)
 
-    logger.debug(f"Returning from get_default_choices with new choices: {new_choices}")
-    return list(new_choices)
+    logger.debug(f"Returning from get_default_choices with new choices: {new_choices}, sampled: {sampled}")
+    return list(new_choices), sampled
 
 
-def add_impacts(i1: list[float], i2: list[float]) -> list[float]:
+def add_impacts(i1: np.ndarray | list[float] | None, i2: np.ndarray | list[float] | None) -> np.ndarray:
     """
-    Adds two impact lists element-wise.
-    :param i1: First impact list.
-    :param i2: Second impact list.
-    :return: Element-wise sum of the two impact lists.
+    Adds two impact vectors element-wise.
+    :param i1: First impact vector.
+    :param i2: Second impact vector.
+    :return: Element-wise sum of the two impact vectors, the other vector when one of them is missing or empty.
     """
-    if not i1:
+    if i1 is None or len(i1) == 0:
         return i2
-    if not i2:
+    if i2 is None or len(i2) == 0:
         return i1
 
-    return [x + y for x, y in zip(i1, i2)]
+    return np.add(i1, i2)
 
 
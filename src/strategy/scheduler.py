@@ -0,0 +1,180 @@
+#  Copyright (c) 2025.
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING, Sequence
+
+from model.petri_net.compiled import AGE_TOLERANCE
+from model.petri_net.time_spin import ArrayTimeMarking
+from utils import logging_utils
+from utils.net_utils import is_final_marking
+
+if TYPE_CHECKING:
+    from model.types import ContextType, MarkingType
+
+logger = logging_utils.get_logger(__name__)
+
+
+class EventScheduler:
+    """
+    Discrete event scheduler of the places whose tokens are waiting for the place duration to elapse.
+
+    Only the input places of the transitions enabled by the tokens are scheduled, as in `get_min_delta`.
+    Each of them has an absolute deadline on the scheduler clock (`clock + duration - age`). A place followed
+    by a parallel join waits until all the input places of the join are due, so its key is the max over the
+    join group. Two heaps are kept: the join keys give the next instant, the own deadlines give the places due
+    at that instant. Entries are updated lazily: when a transition fires only the places next to it are
+    rescheduled and the old entries become stale.
+
+    Attributes:
+        ctx (ContextType): Net context.
+        clock (float): Time elapsed since the scheduler was created.
+    """
+
+    def __init__(self, ctx: ContextType, marking: MarkingType):
+        self.ctx = ctx
+        self.clock = 0.0
+        self.__compiled = ctx.compiled
+        size = len(self.__compiled.places)
+        self.__support = [0] * size  # Number of token enabled transitions having the place as input
+        self.__stamp = [0] * size
+        self.__key_heap: list[tuple[float, int, int]] = []
+        self.__own_heap: list[tuple[float, int, int]] = []
+        self.__floating: set[int] = set()  # Places whose join waits for an unmarked place
+
+        marking = ArrayTimeMarking.of(self.__compiled, marking)
+        self.__token_enabled = ctx.semantic.token_enabled_compiled(self.__compiled, marking)
+        for t in self.__token_enabled:
+            for p, _ in self.__compiled.inputs[t]:
+                self.__support[p] += 1
+
+        self.__schedule([p for p in range(size) if self.__support[p] > 0], marking)
+
+    def advance(self, delta: float):
+        """
+        Advance the scheduler clock, it must follow every `add_time` applied to the marking.
+        :param delta: Time added to the marking.
+        """
+        self.clock += delta
+
+    def fired(self, t: int | Sequence[int], marking: MarkingType):
+        """
+        Update the schedule after a transition, or a batch of transitions, fired.
+        :param t: Index of the fired transition, or indices of the transitions fired at the same instant.
+        :param marking: Marking after the firing.
+        """
+        compiled = self.__compiled
+        marking = ArrayTimeMarking.of(compiled, marking)
+        token_enabled = self.ctx.semantic.token_enabled_compiled(compiled, marking)
+        transitions = (t,) if isinstance(t, int) else t
+
+        touched = {p for u in transitions for p in compiled.touched[u]}
+        affected = compiled.affected[t] if isinstance(t, int) else {u for v in t for u in compiled.affected[v]}
+        for u in affected:
+            was_enabled, is_enabled = u in self.__token_enabled, u in token_enabled
+            if was_enabled == is_enabled:
+                continue
+            for p, _ in compiled.inputs[u]:
+                self.__support[p] += 1 if is_enabled else -1
+                touched.add(p)
+        self.__token_enabled = token_enabled
+
+        for q in list(touched):
+            touched.update(compiled.join_dependents[q])
+
+        self.__schedule(touched, marking)
+
+    def next_events(self, marking: MarkingType) -> tuple[float, list[int]]:
+        """
+        Get the time to wait before the next events and the transitions due at that instant.
+        :param marking: Current marking.
+        :return: the delta to the next events and the indices of the transitions to fire, as `get_min_delta`.
+        """
+        if is_final_marking(self.ctx, marking):
+            return float('inf'), []
+
+        compiled = self.__compiled
+        marking = ArrayTimeMarking.of(compiled, marking)
+
+        # Next instant: the entries at the top of the key heap and the floating joins
+        min_delta = float('inf')
+        for p in self.__pop_until(self.__key_heap, None):
+            min_delta = min(min_delta, self.__relative_key(p, marking))
+        for p in self.__floating:
+            min_delta = min(min_delta, self.__relative_key(p, marking))
+
+        if min_delta == float('inf'):
+            return min_delta, []
+
+        # Places due at that instant, with the same check on the ages as the enabling of the transitions
+        due = []
+        for p in self.__pop_until(self.__own_heap, self.clock + min_delta):
+            duration = compiled.duration[p]
+            if abs(duration - marking.age_of(p) - min_delta) <= AGE_TOLERANCE * max(1.0, abs(duration)):
+                due.append(p)
+
+        transitions = []
+        for p in sorted(due):
+            transitions.extend(compiled.place_outputs[p])
+
+        return min_delta, transitions
+
+    def __relative_key(self, p: int, marking: ArrayTimeMarking) -> float:
+        compiled = self.__compiled
+        group = compiled.join_group[p]
+        if group is None:
+            return compiled.duration[p] - marking.age_of(p)
+
+        return max(compiled.duration[q] - marking.age_of(q) for q in group)
+
+    def __pop_until(self, heap: list[tuple[float, int, int]], limit: float | None) -> list[int]:
+        """
+        Get the valid places at the top of the heap, up to `limit` or up to the top key when `limit` is None.
+        The entries are pushed back, so the heap is left unchanged apart from the removal of stale entries.
+        """
+        while heap and self.__is_stale(heap[0]):
+            heapq.heappop(heap)
+        if not heap:
+            return []
+
+        if limit is None:
+            limit = heap[0][0]
+        limit += AGE_TOLERANCE * max(1.0, abs(limit))
+
+        entries = []
+        while heap and heap[0][0] <= limit:
+            entry = heapq.heappop(heap)
+            if not self.__is_stale(entry):
+                entries.append(entry)
+
+        for entry in entries:
+            heapq.heappush(heap, entry)
+
+        return [p for _, p, _ in entries]
+
+    def __is_stale(self, entry: tuple[float, int, int]) -> bool:
+        _, p, stamp = entry
+        return stamp != self.__stamp[p] or self.__support[p] == 0
+
+    def __schedule(self, places, marking: ArrayTimeMarking):
+        compiled = self.__compiled
+        tokens = marking.token_array
+        for p in places:
+            self.__stamp[p] += 1
+            self.__floating.discard(p)
+            if self.__support[p] == 0:
+                continue
+
+            stamp = self.__stamp[p]
+            own = self.clock + compiled.duration[p] - marking.age_of(p)
+            heapq.heappush(self.__own_heap, (own, p, stamp))
+
+            group = compiled.join_group[p]
+            if group is None:
+                heapq.heappush(self.__key_heap, (own, p, stamp))
+            elif any(tokens.item(q) <= 0 for q in group):
+                # The deadline of an unmarked place does not move with the clock, evaluate it at every step
+                self.__floating.add(p)
+            else:
+                key = max(self.clock + compiled.duration[q] - marking.age_of(q) for q in group)
+                heapq.heappush(self.__key_heap, (key, p, stamp))
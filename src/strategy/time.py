@@ -1,12 +1,12 @@
 #  Copyright (c) 2025.
-import copy
 
+from model.petri_net.compiled import within_tolerance
+from model.petri_net.time_spin import ArrayTimeMarking
 from model.region import RegionType
-from model.status import ActivityState, propagate_status
-from strategy.base import get_min_delta, execute_transition
-from strategy.execution import get_default_choices, add_impacts
+from strategy.base import execute_transition, execute_transitions_compiled, update_status
+from strategy.execution import get_default_choices
+from strategy.scheduler import EventScheduler
 from utils import logging_utils
-from utils.net_utils import get_empty_impacts
 
 logger = logging_utils.get_logger(__name__)
 
@@ -18,7 +18,8 @@ class TimeStrategy:
     """
 
     def saturate(self, ctx: "ContextType", marking: "MarkingType", regions: dict[int: "RegionModelType"], 
-                 status: dict["RegionModelType", "ActivityState"], time_step: float):
+                 status: dict["RegionModelType", "ActivityState"], time_step: float,
+                 since: "MarkingType | None" = None):
         """
         Execute transitions for a specific time duration.
         
@@ -27,32 +28,39 @@ class TimeStrategy:
             marking: Current marking state
             regions: Dictionary mapping region IDs to RegionModel objects
             status: Dictionary mapping regions to their ActivityState
+            time_step: The time duration to advance
+            since: Marking whose propagated status is `status`, only the changes since it are propagated
         """
         logger.debug(f"TimeStrategy: Advancing by {time_step} time units")
 
-        current_marking = copy.deepcopy(marking)
+        compiled = ctx.compiled
+        current_marking = ArrayTimeMarking.of(compiled, marking)
+        scheduler = EventScheduler(ctx, current_marking)
         probability = 1.0
-        impacts = get_empty_impacts(ctx.net)
-        default_impacts = get_empty_impacts(ctx.net)
-        execution_time = 0.0
+        impacts = ctx.topology.empty_impacts()
+        fired = []
         remaining_time = time_step
 
         while remaining_time >= 0:
-            min_delta, transitions_to_fire = get_min_delta(ctx, current_marking)
+            min_delta, transitions_to_fire = scheduler.next_events(current_marking)
             min_delta = max(min_delta, 0)
 
             if len(transitions_to_fire) == 0:
                 logger.debug("No transitions to fire")
                 # Add remaining time even if no transitions
                 current_marking = current_marking.add_time(remaining_time)
-                execution_time += remaining_time
+                remaining_time = 0.0
                 break
 
+            # Events falling on the end of the step up to the tolerance of the ages are due within it
+            if within_tolerance(min_delta, remaining_time):
+                min_delta = remaining_time
+
             # Only advance by min(min_delta, remaining_time)
             actual_delta = min(min_delta, remaining_time)
             logger.debug(f"Adding {actual_delta} time to marking (min_delta={min_delta}, remaining={remaining_time})")
             current_marking = current_marking.add_time(actual_delta)
-            execution_time += actual_delta
+            scheduler.advance(actual_delta)
             remaining_time -= actual_delta
 
             # If we haven't reached the transition firing time, stop
@@ -60,38 +68,26 @@ class TimeStrategy:
                 logger.debug("Time step exhausted before next transition")
                 break
 
-            if any(map(lambda t: t.stop, transitions_to_fire)):
+            if any(compiled.stop[t] for t in transitions_to_fire):
                 logger.debug("Stop transition found, exiting")
                 break
 
-            for t in transitions_to_fire:
-                region = regions[int(t.region_id)]
-                status[region] = ActivityState.ACTIVE
-                logger.debug(f"Executing transition {t}")
-                current_marking, p, imp = execute_transition(ctx, t, current_marking)
-                probability *= p
-                impacts = add_impacts(impacts, imp or default_impacts)
-                logger.debug(
-                    f"After executing {t}, marking {current_marking}, probability {probability}, impacts {impacts}")
-
-        # Update completed tasks status
-        for p in ctx.net.places:
-            entry_id = getattr(p, "entry_id", None)
-            exit_id = getattr(p, "exit_id", None)
-
-            if entry_id is not None and int(entry_id) in regions:
-                region = regions[int(entry_id)]
-                if current_marking[p].token > 0:
-                    status[region] = ActivityState.ACTIVE
-
-            if exit_id is not None and int(exit_id) in regions:
-                region = regions[int(exit_id)]
-                if region.is_task():
-                    item = current_marking[p]
-                    if item.token > 0 or item.visit_count > 0:
-                        status[region] = ActivityState.COMPLETED
-
-        propagate_status(regions[0], status)
+            fired.extend(transitions_to_fire)
+            logger.debug("Executing transitions %s", compiled.to_transitions(transitions_to_fire))
+            current_marking, executed, probability, impacts = execute_transitions_compiled(
+                ctx, transitions_to_fire, current_marking, probability, impacts
+            )
+            if executed:
+                scheduler.fired(executed, current_marking)
+            elif min_delta == 0:
+                # Nothing fired and the clock did not move, the next round would offer the same transitions
+                logger.warning("No transition of %s could fire, stopping", compiled.to_transitions(transitions_to_fire))
+                break
+            logger.debug("After executing %s, marking %s, probability %s, impacts %s",
+                         compiled.to_transitions(executed), current_marking, probability, impacts)
+
+        update_status(ctx, regions, status, current_marking, fired, since)
+        execution_time = time_step - remaining_time
 
         logger.debug(
             f"TimeStrategy complete. Final marking {current_marking}, probability {probability}, impacts {impacts}, execution_time {execution_time}")
@@ -119,25 +115,23 @@ class TimeStrategy:
         decisions = get_default_choices(ctx, marking, decisions)
         logger.debug("Final decisions after adding defaults and filter: %s", decisions)
 
-        impacts = get_empty_impacts(ctx.net)
-        default_impacts = get_empty_impacts(ctx.net)
+        impacts = ctx.topology.empty_impacts()
         execution_time = 0.0
         probability = 1.0
 
-        current_marking = copy.deepcopy(marking)
+        current_marking = marking
 
         for t in decisions:
             logger.debug(f"Executing decisions transition {t}")
-            in_place = list(t.in_arcs)[0].source
-            current_marking = ctx.semantic.execute(ctx.net, t, current_marking)
-            probability *= t.probability
-            impacts = [imp + imp_t for imp, imp_t in zip(impacts, in_place.impacts or default_impacts)]
+            current_marking, p, t_impacts = execute_transition(ctx, t, current_marking)
+            probability *= p
+            impacts += t_impacts
             logger.debug(
                 f"After executing decisions {t}, marking {current_marking}, probability {probability}, impacts {impacts}")
 
-        new_marking, prob, imp, exec_time = self.saturate(ctx, current_marking, regions, status, time_step)
+        new_marking, prob, imp, exec_time = self.saturate(ctx, current_marking, regions, status, time_step, since=marking)
         probability *= prob
-        impacts = [imp1 + imp2 for imp1, imp2 in zip(impacts, imp)]
+        impacts += imp
         execution_time += exec_time
 
         logger.debug(
@@ -5,6 +5,7 @@ from typing import Callable, TYPE_CHECKING
 import numpy as np
 
 from model.region import RegionModel, find_region_by_id, RegionType
+from model.region_index import RegionIndex
 from utils import logging_utils
 
 if TYPE_CHECKING:
@@ -24,22 +25,31 @@ def get_default_transition(ctx: ContextType, place: PlaceType, marking: MarkingT
     :param marking: marking of the Petri net.
     :return: The default transition or None if not found.
     """
+    return resolve_default_transition(ctx, place, marking)[0]
+
+
+def resolve_default_transition(ctx: ContextType, place: PlaceType, marking: MarkingType) -> tuple[
+    TransitionType | None, bool]:
+    """
+    Same as `get_default_transition`, also telling whether the default was sampled.
+    :return: The default transition or None if not found, and whether it was sampled.
+    """
     logger.debug(f"Getting default transition for place {place}")
     # Check if loop region and visit limit is reached
-    exit_transition, is_loop, loop_transition = check_loop_transitions(place)
+    exit_transition, is_loop, loop_transition = ctx.topology.get_loop_transitions(place)
 
     if is_loop and loop_transition and exit_transition:
         logger.debug(f"Selecting default transition for loop region")
         if place.visit_limit <= marking[place].visit_count:
             # If loop region and visit limit is reached, return exit transition
             logger.debug(f"Visit limit reached for place {place.name}, choosing exit transition {exit_transition.name}")
-            return exit_transition
-        default_choice = Defaults.get_default_by_region(ctx.region, loop_transition.region_id)
-        loop_place = list(loop_transition.out_arcs)[0].target
+            return exit_transition, False
+        default_choice, sampled = Defaults.resolve_default_by_region(ctx.region_index, loop_transition.region_id)
+        loop_place = ctx.topology.first_target[loop_transition]
         if loop_place.entry_id == default_choice.id:
-            return loop_transition
+            return loop_transition, sampled
         else:
-            return exit_transition
+            return exit_transition, sampled
 
     # Get default region by place
     region_id = None
@@ -52,26 +62,30 @@ def get_default_transition(ctx: ContextType, place: PlaceType, marking: MarkingT
     if not region_id:
         logger.warning(f"Place {place.name} has no entry_id or exit_id.")
         logger.debug(f"Place {place.name} has no entry_id or exit_id. Selecting first outgoing transition.")
-        return list(place.out_arcs)[0].target if len(list(place.out_arcs)) > 0 else None
+        return ctx.topology.first_target.get(place), False
 
-    default_choice = Defaults.get_default_by_region(ctx.region, region_id)
+    default_choice, sampled = Defaults.resolve_default_by_region(ctx.region_index, region_id)
 
     if not default_choice:
         logger.debug(f"No default transition found for place {place.name}. Selecting first outgoing transition.")
-        return list(place.out_arcs)[0].target if len(list(place.out_arcs)) > 0 else None
+        return ctx.topology.first_target.get(place), False
 
     # Get transition to default region
     for arc in place.out_arcs:
         t = arc.target
-        next_p = list(t.out_arcs)[0].target
+        next_p = ctx.topology.first_target[t]
         if next_p.entry_id == default_choice.id:
-            return t
+            return t, sampled
 
     logger.warning(f"No matching transition found for default region {default_choice.id} from place {place.name}")
-    return None
+    return None, sampled
 
 
 def check_loop_transitions(place: PlaceType):
+    """
+    Scan the outgoing transitions of a place for the exit and loop transitions of a loop region.
+    The result is indexed once per context by `NetTopology.get_loop_transitions`.
+    """
     if place.region_type != RegionType.LOOP:
         return None, False, None
 
@@ -91,14 +105,37 @@ def check_loop_transitions(place: PlaceType):
 
 
 class Defaults:
+    """
+    Default children of the regions, used when the user does not choose.
+    Nature and loop defaults are sampled with NumPy, so a step that takes one of them is not deterministic.
+    """
+
+    @classmethod
+    def get_default_by_region(cls, regions: RegionIndex | RegionModelType, _id: str) -> RegionModelType | None:
+        """
+        Get the default child of a region.
+        :param regions: Region index of the context, or the root region to search.
+        :param _id: Id of the region.
+        :return: the default child region or None if the region has no default.
+        """
+        return cls.resolve_default_by_region(regions, _id)[0]
 
     @classmethod
-    def get_default_by_region(cls, root_region: RegionModelType, _id: str) -> RegionModelType | None:
-        region = find_region_by_id(root_region, _id)
+    def resolve_default_by_region(cls, regions: RegionIndex | RegionModelType, _id: str) -> tuple[
+        RegionModelType | None, bool]:
+        """
+        Same as `get_default_by_region`, also telling whether the default was sampled.
+        :return: the default child region or None if the region has no default, and whether it was sampled.
+        """
+        if isinstance(regions, RegionIndex):
+            region = regions.get(_id)
+        else:
+            region = find_region_by_id(regions, _id)
         if not region:
-            return None
+            return None, False
 
-        return cls.__get_default_function_by_region_type(region.type)(region)
+        sampled = region.type in (RegionType.NATURE, RegionType.LOOP)
+        return cls.__get_default_function_by_region_type(region.type)(region), sampled
 
     @classmethod
     def __get_default_function_by_region_type(cls, region_type: RegionType) -> Callable[
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
 
 from utils import logging_utils
 
@@ -32,6 +34,7 @@ def add_arc_from_to(fr: PlaceType | TransitionType, to: PlaceType | TransitionTy
     net.arcs.add(a)
     fr.out_arcs.add(a)
     to.in_arcs.add(a)
+    net.touch()
     return a
 
 
@@ -80,6 +83,7 @@ def remove_arc(net: PetriNetType, arc: ArcType) -> None:
     net.arcs.discard(arc)
     arc.source.out_arcs.discard(arc)
     arc.target.in_arcs.discard(arc)
+    net.touch()
     del arc
 
 
@@ -152,10 +156,11 @@ def get_all_choices(ctx: ContextType, marking: MarkingType, choices: list[Transi
     logger.debug("Default choices are %s", choices)
 
     # Ensure that only one transition per place is present in the choices
-    choices_place = {list(t.in_arcs)[0].source for t in choices if t.in_arcs}
+    first_source = ctx.topology.first_source
+    choices_place = {first_source[t] for t in choices if t.in_arcs}
 
     for t in ctx.semantic.enabled_transitions(ctx.net, marking):
-        place = list(t.in_arcs)[0].source
+        place = first_source[t]
         if place not in choices_place:
             choices.append(t)
             choices_place.add(place)
@@ -165,13 +170,17 @@ def get_all_choices(ctx: ContextType, marking: MarkingType, choices: list[Transi
     return list(choices)
 
 
-def get_empty_impacts(net: PetriNetType) -> list[float]:
+def get_empty_impacts(net: PetriNetType) -> np.ndarray:
+    """
+    Zero impacts of the net, scanning its places.
+    Prefer `ctx.topology.empty_impacts()` when a NetContext is available.
+    """
     # Default impacts
     default_impacts = None
     for p in net.places:
         impacts = p.impacts
         if impacts is not None:
-            default_impacts = [0] * len(impacts)
+            default_impacts = np.zeros(len(impacts))
             break
 
     if default_impacts is None:
@@ -180,6 +189,19 @@ def get_empty_impacts(net: PetriNetType) -> list[float]:
     return default_impacts
 
 
+def freeze_impacts(impacts: Iterable[float] | np.ndarray) -> np.ndarray:
+    """
+    Read only float array of impacts, as kept by snapshots and by the step cache.
+    Arrays that are already read only float arrays are returned as they are, without copying them.
+    """
+    if isinstance(impacts, np.ndarray) and not impacts.flags.writeable and impacts.dtype == np.float64:
+        return impacts
+
+    frozen = np.array(impacts, dtype=np.float64)
+    frozen.flags.writeable = False
+    return frozen
+
+
 def is_final_marking(ctx: ContextType, marking: MarkingType) -> bool:
     """
     Checks if the given marking is a final marking in the context.
@@ -192,23 +214,32 @@ def is_final_marking(ctx: ContextType, marking: MarkingType) -> bool:
         logger.warning("Marking is not of type TimeMarking")
         return False
 
-    fm = ctx.final_marking
-
-    for place in ctx.net.places:
-        fm_token = fm[place].token
-        marking_token = marking[place].token
-
-        if fm_token != marking_token:
-            return False
-
-    return True
+    return ctx.topology.is_final_marking(marking)
 
 
 def get_place_by_name(net: PetriNetType, place_name: str) -> PlaceType | None:
     """
     Trova un posto nel Petri net per nome.
+    The places of a WrapperPetriNet are indexed by name, other nets are scanned.
     """
+    if hasattr(net.places, "get"):
+        return net.places.get(place_name)
+
     for place in net.places:
         if place.name == place_name:
             return place
     return None
+
+
+def get_transition_by_name(net: PetriNetType, transition_name: str) -> TransitionType | None:
+    """
+    Find a transition of the Petri net by name.
+    The transitions of a WrapperPetriNet are indexed by name, other nets are scanned.
+    """
+    if hasattr(net.transitions, "get"):
+        return net.transitions.get(transition_name)
+
+    for transition in net.transitions:
+        if transition.name == transition_name:
+            return transition
+    return None
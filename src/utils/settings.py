@@ -8,6 +8,11 @@ class APISettings(BaseSettings):
     title: str = "BPMN-CPI Simulator API"
     version: str = "1.0.0"
     docs_url: str = "/docs/"
+    session_ttl: float = 1800.0
+    session_max_count: int = 256
+    session_memory_budget: int = 512 * 1024 * 1024
+    generated_semantic: bool = False
+    step_cache_size: int = 1024
 
     model_config = SettingsConfigDict(
         env_file=".env",
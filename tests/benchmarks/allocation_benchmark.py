@@ -0,0 +1,102 @@
+import argparse
+import gc
+import logging
+import sys
+import tracemalloc
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SRC_DIR = SCRIPT_DIR.parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from generated_benchmark import build_bpmn
+from model.context import NetContext
+from model.extree import ExecutionTree
+from model.extree.node import Snapshot
+from model.region import RegionModel
+from model.status import ActivityState
+from strategy.time import TimeStrategy
+
+
+def consume_all(ctx: NetContext, time_step: float) -> tuple[list[tuple], int]:
+    """
+    Advance the net by `time_step` until it reaches the final marking.
+    :return: the results of the consume calls and the sum of the peaks of traced memory of the calls, in bytes.
+    """
+    regions = ctx.region_index
+    status = {r: ActivityState.WAITING for r in regions.preorder}
+    marking = ctx.initial_marking
+    strategy = TimeStrategy()
+    results, peaks = [], 0
+    while not ctx.topology.is_final_marking(marking):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        result = strategy.consume(ctx, marking, regions, status, time_step, [])
+        peaks += tracemalloc.get_traced_memory()[1] - start
+        marking = result[0]
+        results.append(result)
+
+    return results, peaks
+
+
+def count_objects(function) -> tuple[object, int]:
+    """
+    Call a function with the garbage collector disabled and the memory allocations traced.
+    :return: the result and the number of objects it left alive.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        before = len(gc.get_objects())
+        tracemalloc.start()
+        result = function()
+        tracemalloc.stop()
+        return result, len(gc.get_objects()) - before - 1
+    finally:
+        gc.enable()
+
+
+def read_snapshots(snapshots: list[Snapshot], reads: int) -> list:
+    values = []
+    for _ in range(reads):
+        for snapshot in snapshots:
+            values.append((snapshot.marking, snapshot.impacts, snapshot.status, snapshot.decisions, snapshot.choices))
+
+    return values
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the memory allocated by the consume calls and the objects allocated by the reads "
+                    "of the snapshots."
+    )
+    parser.add_argument("--blocks", type=int, nargs="+", default=[10, 50, 200],
+                        help="Number of parallel blocks of the synthetic BPMN.")
+    parser.add_argument("--time-step", type=float, default=1.0, help="Time step of each consume call.")
+    parser.add_argument("--reads", type=int, default=10, help="Reads of every snapshot.")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{'blocks':>7} {'places':>7} {'consumes':>9} {'kept objects/consume':>21} {'peak KiB/consume':>17} "
+          f"{'objects/read':>13}")
+    for blocks in args.blocks:
+        ctx = NetContext.from_region(RegionModel.model_validate(build_bpmn(blocks)))
+        consume_all(ctx, args.time_step)  # warm up the caches of the context
+
+        (results, peak), objects = count_objects(lambda: consume_all(ctx, args.time_step))
+        consumes = len(results)
+
+        extree = ExecutionTree.from_context(ctx, ctx.region)
+        for marking, probability, impacts, execution_time, _ in results:
+            extree.add_snapshot(ctx, Snapshot(marking, probability, impacts, execution_time, {}, [], []))
+        snapshots = [node.snapshot for node in extree]
+        _, read_objects = count_objects(lambda: read_snapshots(snapshots, args.reads))
+
+        print(f"{blocks:>7} {len(ctx.compiled.places):>7} {consumes:>9} {objects / consumes:>21.1f} "
+              f"{peak / consumes / 1024:>17.1f} {read_objects / (len(snapshots) * args.reads):>13.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
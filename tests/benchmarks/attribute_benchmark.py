@@ -0,0 +1,103 @@
+import argparse
+import logging
+import sys
+import timeit
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SRC_DIR = SCRIPT_DIR.parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from generated_benchmark import build_bpmn
+from model.context import NetContext
+from model.petri_net.compiled import CompiledNet
+from model.petri_net.time_spin import ArrayTimeMarking, TimeNetSematic
+from model.region import RegionModel, RegionType
+from utils.net_utils import PropertiesKeys
+
+
+def is_enabled_attributes(transition, marking) -> bool:
+    """
+    `TimeNetSematic.is_enabled` written on the wrapper objects, reading the slotted attributes.
+    """
+    loop_stop = transition.stop and transition.region_type == RegionType.LOOP
+    for arc in transition.in_arcs:
+        place = arc.source
+        item = marking[place]
+        if item.token < arc.weight or item.age < place.duration:
+            return False
+        if loop_stop and place.visit_limit is not None and place.visit_limit <= item.visit_count:
+            return False
+
+    return True
+
+
+def is_enabled_properties(transition, marking) -> bool:
+    """
+    Same as `is_enabled_attributes`, reading through the `custom_properties` view as the former properties did.
+    """
+    loop_stop = (transition.get_custom_property(PropertiesKeys.STOP)
+                 and transition.get_custom_property(PropertiesKeys.TYPE) == RegionType.LOOP)
+    for arc in transition.in_arcs:
+        place = arc.source
+        item = marking[place]
+        if item.token < arc.weight or item.age < (place.get_custom_property(PropertiesKeys.DURATION) or 0):
+            return False
+        visit_limit = place.get_custom_property(PropertiesKeys.VISIT_LIMIT)
+        if loop_stop and visit_limit is not None and visit_limit <= item.visit_count:
+            return False
+
+    return True
+
+
+def read_attributes(transition) -> tuple:
+    return tuple((arc.source.duration, arc.source.visit_limit, transition.stop) for arc in transition.in_arcs)
+
+
+def read_properties(transition) -> tuple:
+    return tuple((arc.source.get_custom_property(PropertiesKeys.DURATION) or 0,
+                  arc.source.get_custom_property(PropertiesKeys.VISIT_LIMIT),
+                  transition.get_custom_property(PropertiesKeys.STOP)) for arc in transition.in_arcs)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the attribute reads of the enabling check through the custom properties view, the "
+                    "slotted attributes and the compiled net."
+    )
+    parser.add_argument("--blocks", type=int, nargs="+", default=[10, 50, 200],
+                        help="Number of parallel blocks of the synthetic BPMN.")
+    parser.add_argument("--number", type=int, default=20, help="Enabling checks of every transition per timing.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per measure, the best one is reported.")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{'blocks':>7} {'transitions':>12} {'read view (us)':>15} {'read slots (us)':>16} "
+          f"{'enabled view (us)':>18} {'enabled slots (us)':>19} {'enabled compiled (us)':>22} {'compile (ms)':>13}")
+    for blocks in args.blocks:
+        ctx = NetContext.from_region(RegionModel.model_validate(build_bpmn(blocks)))
+        net = ctx.net
+        marking = ArrayTimeMarking.of(ctx.compiled, ctx.initial_marking).add_time(1)
+        transitions = list(net.transitions)
+        semantic = TimeNetSematic()
+        checks = args.number * len(transitions)
+
+        def best(check) -> float:
+            timer = timeit.Timer(lambda: [check(t) for t in transitions])
+            return min(timer.repeat(args.repeat, args.number)) / checks * 1e6
+
+        read_view = best(read_properties)
+        read_slots = best(read_attributes)
+        enabled_view = best(lambda t: is_enabled_properties(t, marking))
+        enabled_slots = best(lambda t: is_enabled_attributes(t, marking))
+        enabled_compiled = best(lambda t: semantic.is_enabled(net, t, marking))
+        compile_time = min(timeit.repeat(lambda: CompiledNet(net), repeat=args.repeat, number=1)) * 1000
+
+        print(f"{blocks:>7} {len(transitions):>12} {read_view:>15.2f} {read_slots:>16.2f} {enabled_view:>18.2f} "
+              f"{enabled_slots:>19.2f} {enabled_compiled:>22.2f} {compile_time:>13.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,99 @@
+import argparse
+import copy
+import logging
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SRC_DIR = SCRIPT_DIR.parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from main import execute
+from model.endpoints.execute.request import ExecuteRequest
+
+BPMN = {
+    "id": 0,
+    "type": "sequential",
+    "children": [
+        {"id": 1, "type": "task", "label": "T1", "impacts": [1, 2], "duration": 1},
+        {
+            "id": 2,
+            "type": "parallel",
+            "children": [
+                {"id": 3, "type": "task", "label": "T3", "impacts": [3, 4], "duration": 2},
+                {"id": 4, "type": "task", "label": "T4", "impacts": [5, 6], "duration": 3},
+            ],
+        },
+    ],
+}
+
+
+def build_payload(nodes: int, branching: int) -> dict:
+    """
+    Build an execute request whose execution tree has `nodes` nodes.
+    Every node reuses the snapshot of the root of a real response, so the cost per node is constant.
+    """
+    response = execute(ExecuteRequest.model_validate({"bpmn": BPMN}))
+    template = response["execution_tree"]["root"]
+
+    root = copy.deepcopy(template)
+    root["children"] = []
+    queue = [root]
+    created = 1
+    while created < nodes:
+        parent = queue.pop(0)
+        for _ in range(branching):
+            if created >= nodes:
+                break
+            child = copy.deepcopy(template)
+            child["id"] = child["name"] = str(created)
+            child["children"] = []
+            parent["children"].append(child)
+            queue.append(child)
+            created += 1
+
+    return {
+        "bpmn": BPMN,
+        "petri_net": response["petri_net"],
+        "execution_tree": {"root": root, "current_node": str(nodes - 1)},
+    }
+
+
+def measure(payload: dict, repeat: int) -> tuple[float, float]:
+    validate_best = decode_best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        request = ExecuteRequest.model_validate(payload)
+        validated = time.perf_counter()
+        request.to_object()
+        decoded = time.perf_counter()
+
+        validate_best = min(validate_best, validated - start)
+        decode_best = min(decode_best, decoded - validated)
+
+    return validate_best, decode_best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure how the decoding time of an execute request grows with the size of the execution tree."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200, 400, 800, 1600],
+                        help="Execution tree sizes (number of nodes) to measure.")
+    parser.add_argument("--branching", type=int, default=4, help="Children per node of the synthetic tree.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per size, the best one is reported.")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{'nodes':>8} {'validate (ms)':>14} {'decode (ms)':>12} {'decode/node (us)':>17}")
+    for size in args.sizes:
+        payload = build_payload(size, args.branching)
+        validate, decode = measure(payload, args.repeat)
+        print(f"{size:>8} {validate * 1000:>14.2f} {decode * 1000:>12.2f} {decode / size * 1e6:>17.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SRC_DIR = SCRIPT_DIR.parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from fastapi.responses import JSONResponse
+
+from generated_benchmark import build_bpmn
+from main import consume_step
+from model.context import NetContext
+from model.endpoints.execute.encoder import encode_response
+from model.endpoints.execute.response import ExecuteResponse
+from model.extree import ExecutionTree, ExecutionTreeNode
+from model.region import RegionModel
+
+
+def build_tree(ctx: NetContext, nodes: int, branching: int) -> ExecutionTree:
+    """
+    Build an execution tree with `nodes` nodes, breadth first with `branching` children per node.
+    The nodes cycle through the snapshots of a real run, so that the markings, impacts and status are realistic.
+    """
+    run = ExecutionTree.from_context(ctx, ctx.region)
+    for _ in range(64):
+        consume_step(ctx, run, ctx.region_index, [], 1.0)
+    snapshots = [node.snapshot for node in run]
+
+    root = ExecutionTreeNode(name="Root", _id="0", snapshot=snapshots[0])
+    queue = [root]
+    created = 1
+    while created < nodes:
+        parent = queue.pop(0)
+        for _ in range(branching):
+            if created >= nodes:
+                break
+            child = ExecutionTreeNode(name=str(created), _id=str(created),
+                                      snapshot=snapshots[created % len(snapshots)], parent=parent)
+            queue.append(child)
+            created += 1
+
+    extree = ExecutionTree(root)
+    extree.set_current(str(nodes - 1))
+    return extree
+
+
+def measure(ctx: NetContext, extree: ExecutionTree, fields: list[str], repeat: int) -> tuple[float, float, int]:
+    """
+    :return: the best times of the encoder, from the server objects to the JSON body, and of the validation of its
+    content through the Pydantic response models back to the JSON body, and the size of the body.
+    """
+    args = (ctx.region, ctx.net, ctx.initial_marking, ctx.final_marking, extree)
+    models_best = encoder_best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = encode_response(*args, fields=fields)
+        body = JSONResponse(content).body
+        encoded = time.perf_counter()
+        dumped = ExecuteResponse.model_validate(content).model_dump(mode="json", exclude_none=True,
+                                                                    exclude_defaults=True)
+        expected = JSONResponse(dumped).body
+        models = time.perf_counter()
+
+        assert body == expected, "The encoder output differs from the response models"
+        encoder_best = min(encoder_best, encoded - start)
+        models_best = min(models_best, models - encoded)
+
+    return models_best, encoder_best, len(body)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the time to render the execution tree of an execute response with the direct encoder, "
+                    "against the time to validate and dump the same content through the Pydantic response models."
+    )
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10000],
+                        help="Number of nodes of the execution tree.")
+    parser.add_argument("--blocks", type=int, default=10, help="Number of parallel blocks of the synthetic BPMN.")
+    parser.add_argument("--branching", type=int, default=3, help="Children of each node of the tree.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timings per measure, the best one is reported.")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    ctx = NetContext.from_region(RegionModel.model_validate(build_bpmn(args.blocks)))
+    fields = ["bpmn", "petri_net", "execution_tree"]
+
+    print(f"{'nodes':>7} {'size (KiB)':>11} {'pydantic (ms)':>14} {'encoder (ms)':>13} {'speedup':>8}")
+    for nodes in args.nodes:
+        extree = build_tree(ctx, nodes, args.branching)
+        models, encoder, size = measure(ctx, extree, fields, args.repeat)
+        print(f"{nodes:>7} {size / 1024:>11.0f} {models * 1000:>14.1f} {encoder * 1000:>13.1f} "
+              f"{models / encoder:>7.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SRC_DIR = SCRIPT_DIR.parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from converter.spin import from_region
+from model.petri_net.compiled import CompiledNet
+from model.petri_net.generated import GeneratedNet, GeneratedSemantic
+from model.petri_net.time_spin import ArrayTimeMarking, TimeNetSematic
+from model.region import RegionModel
+
+
+def build_bpmn(blocks: int) -> dict:
+    """
+    Build a BPMN made of `blocks` parallel blocks of two tasks in sequence.
+    Sequential regions have exactly two children, so the sequence is nested.
+    """
+    ids = iter(range(1, 10 * blocks + 10))
+
+    def block():
+        return {
+            "id": next(ids),
+            "type": "parallel",
+            "children": [
+                {"id": next(ids), "type": "task", "label": "A", "impacts": [1, 2], "duration": 1},
+                {"id": next(ids), "type": "task", "label": "B", "impacts": [3, 4], "duration": 2},
+            ],
+        }
+
+    region = block()
+    for _ in range(blocks - 1):
+        region = {"id": next(ids), "type": "sequential", "children": [block(), region]}
+
+    return {"id": 0, "type": "sequential", "children": [
+        {"id": next(ids), "type": "task", "label": "Start", "impacts": [0, 0], "duration": 1}, region
+    ]}
+
+
+def run(semantic: TimeNetSematic, compiled: CompiledNet, marking: ArrayTimeMarking) -> int:
+    """
+    Walk the net firing the first enabled transition until nothing is enabled.
+    :return: the number of fired transitions.
+    """
+    steps = 0
+    while True:
+        marking = marking.add_time(2)
+        enabled = semantic.enabled_transitions_compiled(compiled, marking)
+        if not enabled:
+            return steps
+        for t in enabled:
+            if semantic.is_enabled_compiled(compiled, t, marking):
+                marking = semantic.fire_compiled(compiled, t, marking)
+                steps += 1
+
+
+def measure(semantic: TimeNetSematic, compiled: CompiledNet, marking: ArrayTimeMarking,
+            repeat: int) -> tuple[float, int]:
+    best, steps = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        steps = run(semantic, compiled, marking)
+        best = min(best, time.perf_counter() - start)
+
+    return best, steps
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare the interpreted TimeNetSematic with the code generated for the net."
+    )
+    parser.add_argument("--blocks", type=int, nargs="+", default=[10, 50, 200],
+                        help="Number of parallel blocks of the synthetic BPMN.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per net, the best one is reported.")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{'blocks':>7} {'places':>7} {'fired':>6} {'generate (ms)':>14} "
+          f"{'interpreted (us/fire)':>22} {'generated (us/fire)':>20} {'speedup':>8}")
+    for blocks in args.blocks:
+        net, im, _ = from_region(RegionModel.model_validate(build_bpmn(blocks)))
+        compiled = CompiledNet.of(net)
+        marking = ArrayTimeMarking.of(compiled, im)
+
+        start = time.perf_counter()
+        GeneratedNet.of(compiled)
+        generate = time.perf_counter() - start
+
+        interpreted, steps = measure(TimeNetSematic(), compiled, marking, args.repeat)
+        generated, _ = measure(GeneratedSemantic(), compiled, marking, args.repeat)
+        print(f"{blocks:>7} {len(compiled.places):>7} {steps:>6} {generate * 1000:>14.2f} "
+              f"{interpreted / steps * 1e6:>22.1f} {generated / steps * 1e6:>20.1f} {interpreted / generated:>8.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SRC_DIR = SCRIPT_DIR.parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from fastapi.responses import JSONResponse
+
+from main import consume_step
+from model.context import NetContext
+from model.endpoints.execute.encoder import encode_response
+from model.endpoints.execute.wire import pack, unpack
+from model.extree import ExecutionTree
+from model.region import RegionModel
+from strategy.execution import get_choices
+
+INPUT_DIR = SCRIPT_DIR.parent / "input_data"
+
+
+def grow(ctx: NetContext, steps: int, seed: int = 0) -> ExecutionTree:
+    """
+    Random walk of `steps` steps that jumps back to random nodes, with random decisions and time steps.
+    """
+    rng = random.Random(seed)
+    extree = ExecutionTree.from_context(ctx, ctx.region)
+    for _ in range(steps):
+        extree.set_current(rng.choice(extree.get_nodes()))
+        choices = get_choices(ctx, extree.current_node.snapshot.marking)
+        decisions = [rng.choice(sorted(ts, key=lambda t: t.name)) for ts in choices.values()]
+        consume_step(ctx, extree, ctx.region_index, decisions, rng.choice([None, 0.5, 1.0]))
+
+    return extree
+
+
+def best(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the size and the encoding and decoding times of the execute responses in JSON and "
+                    "in MessagePack, on the input models after a random walk."
+    )
+    parser.add_argument("--steps", type=int, default=300, help="Steps of the random walk on each model.")
+    parser.add_argument("--fields", nargs="+", default=None,
+                        help="Parts of the response to encode (see RESPONSE_FIELDS), all of them by default.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per measure, the best one is reported.")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{'model':>22} {'nodes':>6} {'json KiB':>9} {'msgpack KiB':>12} {'ratio':>6} "
+          f"{'json enc ms':>12} {'msgpack enc ms':>15} {'json dec ms':>12} {'msgpack dec ms':>15}")
+    for path in sorted(INPUT_DIR.glob("*.json")):
+        try:
+            region = RegionModel.model_validate_json(path.read_text())
+            ctx = NetContext.from_region(region)
+            extree = grow(ctx, args.steps)
+        except Exception as e:
+            print(f"{path.stem:>22} skipped: {e}")
+            continue
+
+        content = encode_response(region, ctx.net, ctx.initial_marking, ctx.final_marking, extree, fields=args.fields)
+        json_body = JSONResponse(content).body
+        msgpack_body = pack(content)
+
+        json_encode = best(lambda: JSONResponse(content), args.repeat)
+        msgpack_encode = best(lambda: pack(content), args.repeat)
+        json_decode = best(lambda: json.loads(json_body), args.repeat)
+        msgpack_decode = best(lambda: unpack(msgpack_body), args.repeat)
+
+        print(f"{path.stem:>22} {len(extree):>6} {len(json_body) / 1024:>9.1f} {len(msgpack_body) / 1024:>12.1f} "
+              f"{len(msgpack_body) / len(json_body):>6.2f} {json_encode * 1000:>12.2f} {msgpack_encode * 1000:>15.2f} "
+              f"{json_decode * 1000:>12.2f} {msgpack_decode * 1000:>15.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
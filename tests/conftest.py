@@ -1,5 +1,8 @@
 # conftest.py
 import logging
+import random
+
+import pytest
 
 
 def pytest_configure(config):
@@ -7,3 +10,26 @@ def pytest_configure(config):
         level=logging.CRITICAL,
         format="%(levelname)s - %(message)s - %(name)s - %(funcName)s - %(lineno)d - %(filename)s",
     )
+
+
+def grow(ctx, extree, steps, seed=0, time_steps=(None,)):
+    """
+    Random walk of `steps` steps on an execution tree. It jumps back to random nodes, so that nodes get several
+    children and steps already taken are taken again, with random decisions and a random time step of `time_steps`.
+    """
+    from main import consume_step
+    from strategy.execution import get_choices
+
+    rng = random.Random(seed)
+    for _ in range(steps):
+        extree.set_current(rng.choice(extree.get_nodes()))
+        choices = get_choices(ctx, extree.current_node.snapshot.marking)
+        decisions = [rng.choice(sorted(ts, key=lambda t: t.name)) for ts in choices.values()]
+        consume_step(ctx, extree, ctx.region_index, decisions, rng.choice(time_steps))
+
+    return extree
+
+
+@pytest.fixture
+def grow_tree():
+    return grow
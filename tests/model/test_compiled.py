@@ -0,0 +1,101 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from converter.spin import from_region
+from model.petri_net.compiled import CompiledNet
+from model.petri_net.time_spin import TimeNetSematic
+from model.region import RegionModel
+from utils.net_utils import add_arc_from_to, remove_arc
+
+PWD = Path(__file__).parent.parent.parent
+
+
+@pytest.fixture()
+def iron_net():
+    with open(os.path.join(PWD, "tests/iron.json")) as f:
+        r_obj = RegionModel.model_validate_json(f.read())
+
+    yield from_region(r_obj)
+
+
+class TestCompiledNet:
+
+    def test_incidence(self, iron_net):
+        net, _, _ = iron_net
+        compiled = CompiledNet.of(net)
+
+        assert len(compiled.places) == len(net.places)
+        assert len(compiled.transitions) == len(net.transitions)
+        for t, transition in enumerate(compiled.transitions):
+            inputs = {compiled.places[p] for p, _ in compiled.inputs[t]}
+            outputs = {compiled.places[p] for p, _ in compiled.outputs[t]}
+            assert inputs == {arc.source for arc in transition.in_arcs}
+            assert outputs == {arc.target for arc in transition.out_arcs}
+            start, end = compiled.pre_ptr[t], compiled.pre_ptr[t + 1]
+            assert list(compiled.pre_place[start:end]) == [p for p, _ in compiled.inputs[t]]
+            assert compiled.transition_impacts[t].tolist() == compiled.impacts[compiled.inputs[t][0][0]].tolist()
+
+        for p, place in enumerate(compiled.places):
+            assert compiled.duration[p] == place.duration
+            if place.impacts is None:
+                assert compiled.place_impacts(p) is None
+            else:
+                assert compiled.place_impacts(p).tolist() == place.impacts
+            assert compiled.to_transitions(compiled.place_outputs[p]) == [arc.target for arc in place.out_arcs]
+
+    def test_cache(self, iron_net):
+        net, _, _ = iron_net
+        compiled = CompiledNet.of(net)
+        assert CompiledNet.of(net) is compiled
+
+        # Changing the structure of the net invalidates the compiled form
+        place = next(iter(net.places))
+        transition = next(iter(net.transitions))
+        net.places.add(type(place)(name="extra"))
+        add_arc_from_to(transition, next(p for p in net.places if p.name == "extra"), net)
+        recompiled = CompiledNet.of(net)
+        assert recompiled is not compiled
+        assert len(recompiled.places) == len(compiled.places) + 1
+
+    def test_cache_same_size(self, iron_net):
+        net, _, _ = iron_net
+        place = next(p for p in CompiledNet.of(net).places if p.out_arcs and p.in_arcs)
+        transition = next(iter(place.out_arcs)).target
+
+        # Changes that keep the number of places, transitions and arcs also invalidate the compiled form
+        place.duration = place.duration + 1
+        compiled = CompiledNet.of(net)
+        assert compiled.duration[compiled.place_index[place]] == place.duration
+
+        place.set_visit_limit(7)
+        compiled = CompiledNet.of(net)
+        assert compiled.visit_limit[compiled.place_index[place]] == 7
+
+        transition.stop = not transition.stop
+        compiled = CompiledNet.of(net)
+        assert compiled.stop[compiled.transition_index[transition]] == bool(transition.stop)
+
+        # Rewiring an arc to another place
+        arc = next(iter(transition.out_arcs))
+        other = next(p for p in net.places if p is not arc.target and p is not place)
+        remove_arc(net, arc)
+        add_arc_from_to(transition, other, net)
+        compiled = CompiledNet.of(net)
+        targets = [compiled.places[p] for p, _ in compiled.outputs[compiled.transition_index[transition]]]
+        assert other in targets and arc.target not in targets
+        assert CompiledNet.of(net) is compiled
+
+    def test_semantic(self, iron_net):
+        net, im, _ = iron_net
+        semantic = TimeNetSematic()
+        compiled = CompiledNet.of(net)
+        im = im.add_time(100)
+
+        enabled = semantic.enabled_transitions(net, im)
+        assert len(enabled) == 1
+        assert enabled == set(compiled.to_transitions(semantic.enabled_transitions_compiled(compiled, im)))
+        for transition in enabled:
+            t = compiled.transition_index[transition]
+            assert semantic.fire(net, transition, im) == semantic.fire_compiled(compiled, t, im)
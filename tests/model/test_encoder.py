@@ -0,0 +1,81 @@
+import os
+from pathlib import Path
+
+import pytest
+from fastapi.responses import JSONResponse
+
+from model.context import NetContext
+from model.endpoints.execute.encoder import encode_response
+from model.endpoints.execute.request import RESPONSE_FIELDS, ExecuteRequest, TreeViewModel
+from model.endpoints.execute.response import ExecuteResponse
+from model.extree import ExecutionTree, ExecutionTreeNode
+from model.region import RegionModel
+
+PWD = Path(__file__).parent.parent.parent
+MODELS = ["bpmn_choice.json", "bpmn_loop.json", "bpmn_nature.json", "bpmn_parallel.json", "bpmn_sequential.json",
+          "bpmn_task.json"]
+FIELDS = [f for f in RESPONSE_FIELDS if f not in ("petri_net_dot", "spin_svg")]
+
+
+def _render(*args, **kwargs) -> tuple[bytes, bytes]:
+    # Rendered JSON of the encoder and of the same content validated by the response models and dumped back: the
+    # models reject missing or mistyped values and drop the default ones, and they dump the keys in their order
+    content = encode_response(*args, **kwargs)
+    expected = ExecuteResponse.model_validate(content).model_dump(mode="json", exclude_none=True,
+                                                                  exclude_defaults=True)
+    return JSONResponse(content).body, JSONResponse(expected).body
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_matches_models(model, grow_tree):
+    with open(os.path.join(PWD, "tests/input_data", model)) as f:
+        region = RegionModel.model_validate_json(f.read())
+    ctx = NetContext.from_region(region)
+    extree = ExecutionTree.from_context(ctx, region)
+    grow_tree(ctx, extree, 20, time_steps=(None, 0.5))
+    args = (region, ctx.net, ctx.initial_marking, ctx.final_marking, extree)
+
+    encoded, expected = _render(*args, fields=FIELDS, since_version=2, session_id="s",
+                                view=TreeViewModel(node="0", depth=3, offset=1, limit=2))
+    assert encoded == expected
+    encoded, expected = _render(*args, fields=["execution_tree.view"])
+    assert encoded == expected
+    encoded, expected = _render(*args, fields=["execution_tree.view"], view=TreeViewModel(path_limit=1))
+    assert encoded == expected
+    encoded, expected = _render(*args)
+    assert encoded == expected
+
+
+def test_matches_decoded_request(grow_tree):
+    # Trees sent back by the client are decoded into dictionary based markings
+    with open(os.path.join(PWD, "tests/input_data/bpmn_parallel.json")) as f:
+        region = RegionModel.model_validate_json(f.read())
+    ctx = NetContext.from_region(region)
+    extree = ExecutionTree.from_context(ctx, region)
+    grow_tree(ctx, extree, 5, time_steps=(None, 0.5))
+    content = encode_response(region, ctx.net, ctx.initial_marking, ctx.final_marking, extree, fields=FIELDS)
+
+    request = ExecuteRequest.model_validate({"bpmn": region.model_dump(exclude_none=True),
+                                             "petri_net": content["petri_net"],
+                                             "execution_tree": content["execution_tree"]})
+    region, net, im, fm, extree, _ = request.to_object()
+    encoded, expected = _render(region, net, im, fm, extree, fields=FIELDS)
+    assert encoded == expected
+
+
+def test_deep_tree():
+    with open(os.path.join(PWD, "tests/input_data/bpmn_task.json")) as f:
+        region = RegionModel.model_validate_json(f.read())
+    ctx = NetContext.from_region(region)
+    extree = ExecutionTree.from_context(ctx, region)
+    node = extree.root
+    for i in range(3000):
+        node = ExecutionTreeNode(name=str(i + 1), _id=str(i + 1), snapshot=node.snapshot, parent=node)
+
+    root = encode_response(region, ctx.net, ctx.initial_marking, ctx.final_marking, extree,
+                           fields=["execution_tree"])["execution_tree"]["root"]
+    depth = 0
+    while "children" in root:
+        root = root["children"][0]
+        depth += 1
+    assert depth == 3000
@@ -0,0 +1,120 @@
+import copy
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from anytree import PreOrderIter, findall_by_attr
+
+from model.context import NetContext
+from model.extree import ExecutionTree, ExecutionTreeNode
+from model.extree.node import Snapshot
+from model.region import RegionModel
+
+PWD = Path(__file__).parent.parent.parent
+
+
+@pytest.fixture
+def ctx():
+    with open(os.path.join(PWD, "tests/input_data/bpmn_loop.json")) as f:
+        yield NetContext.from_region(RegionModel.model_validate_json(f.read()))
+
+
+class TestExecutionTreeIndex:
+
+    def test_matches_scan(self, ctx, grow_tree):
+        extree = ExecutionTree.from_context(ctx, ctx.region)
+        grow_tree(ctx, extree, 40)
+
+        nodes = list(PreOrderIter(extree.root))
+        assert len(extree) == len(nodes) > 2
+        for node in nodes:
+            assert extree.get_node_by_id(node.id) is node
+            assert list(findall_by_attr(extree.root, name="id", value=node.id)) == [node]
+            assert node in extree
+            # Siblings never share a marking
+            assert sum(n.snapshot.marking == node.snapshot.marking for n in node.siblings) == 0
+
+        assert extree.get_node_by_id("missing") is None
+
+    def test_add_existing(self, ctx, grow_tree):
+        extree = ExecutionTree.from_context(ctx, ctx.region)
+        grow_tree(ctx, extree, 10)
+
+        node = next(n for n in extree if n.children)
+        child = node.children[0]
+        extree.set_current(node)
+        size = len(extree)
+
+        assert extree.add_snapshot(ctx, child.snapshot) is child
+        assert extree.current_node is child
+        assert len(extree) == size
+
+    def test_contains(self, ctx, grow_tree):
+        extree = ExecutionTree.from_context(ctx, ctx.region)
+        grow_tree(ctx, extree, 10)
+        node = next(n for n in extree if n.parent is not None)
+
+        # A detached copy with the same parent and marking is in the tree, one with an unknown parent is not
+        copy = ExecutionTreeNode(name="copy", _id="copy", snapshot=node.snapshot)
+        copy.parent = node.parent
+        assert copy in extree
+        copy.parent = ExecutionTreeNode(name="other", _id=node.parent.id, snapshot=node.parent.snapshot)
+        assert copy not in extree
+        assert "1" not in extree
+
+    def test_from_root(self, ctx, grow_tree):
+        extree = ExecutionTree.from_context(ctx, ctx.region)
+        grow_tree(ctx, extree, 20)
+
+        rebuilt = ExecutionTree(extree.root)
+        assert len(rebuilt) == len(extree)
+        for node in extree:
+            assert rebuilt.get_node_by_id(node.id) is node
+        assert rebuilt.set_current(extree.current_node.id)
+        assert rebuilt.current_node is extree.current_node
+
+        # New ids follow the largest id of the tree
+        root = ExecutionTreeNode(name="Root", _id="0", snapshot=extree.root.snapshot)
+        ExecutionTreeNode(name="7", _id="7", snapshot=Snapshot(ctx.final_marking, 1, [0], 0, {}, [], []), parent=root)
+        tree = ExecutionTree(root)
+        marking = ctx.initial_marking.add_time(1)
+        node = tree.add_snapshot(ctx, Snapshot(marking, 1, [0] * len(root.snapshot.impacts), 0, {}, [], []))
+        assert node.id == "8"
+        assert tree.get_node_by_id("8") is node and len(tree) == 3
+
+    def test_frozen_snapshot(self, ctx, grow_tree):
+        extree = ExecutionTree.from_context(ctx, ctx.region)
+        grow_tree(ctx, extree, 5)
+        node = next(n for n in extree if n.parent is not None)
+        snapshot = node.snapshot
+
+        # Reads share the stored values
+        assert snapshot.marking is snapshot.marking
+        assert snapshot.impacts is snapshot.impacts and isinstance(snapshot.impacts, np.ndarray)
+        assert snapshot.status is snapshot.status
+        with pytest.raises(TypeError):
+            snapshot.status["0"] = None
+        with pytest.raises(ValueError):
+            snapshot.impacts[0] = 1
+        with pytest.raises(AttributeError):
+            snapshot.probability = 0.5
+        assert copy.deepcopy(snapshot) is snapshot
+
+    def test_versions(self, ctx, grow_tree):
+        extree = ExecutionTree.from_context(ctx, ctx.region)
+        assert extree.version == 0 and extree.nodes_since(0) == []
+        grow_tree(ctx, extree, 5)
+        version = extree.version
+        grow_tree(ctx, extree, 10, seed=1)
+
+        added = extree.nodes_since(version)
+        assert len(added) == extree.version - version == len(extree) - 1 - version
+        assert extree.nodes_since(-1)[0] is extree.root
+        # Parents come before their children, so a client can patch its copy in order
+        known = {n.id for n in extree.nodes_since(-1)[:version + 1]}
+        for node in added:
+            assert node.parent.id in known
+            known.add(node.id)
+        with pytest.raises(ValueError):
+            extree.nodes_since(extree.version + 1)
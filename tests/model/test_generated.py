@@ -0,0 +1,84 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from converter.spin import from_region
+from model.petri_net.compiled import CompiledNet
+from model.petri_net.generated import GeneratedNet, GeneratedSemantic, structural_hash
+from model.petri_net.time_spin import ArrayTimeMarking, TimeMarking, TimeNetSematic
+from model.region import RegionModel
+
+PWD = Path(__file__).parent.parent.parent
+
+
+def _load(path):
+    with open(os.path.join(PWD, path)) as f:
+        return RegionModel.model_validate_json(f.read())
+
+
+@pytest.fixture(params=["tests/iron.json", "tests/input_data/bpmn_loop.json",
+                        "tests/input_data/bpmn_nature.json", "tests/input_data/bpmn_parallel.json"])
+def net(request):
+    yield from_region(_load(request.param))
+
+
+class TestGeneratedNet:
+
+    def test_same_behaviour(self, net):
+        net, im, _ = net
+        compiled = CompiledNet.of(net)
+        interpreted, generated = TimeNetSematic(), GeneratedSemantic()
+
+        expected = actual = ArrayTimeMarking.of(compiled, im)
+        for step in range(50):
+            expected, actual = expected.add_time(1.0), actual.add_time(1.0)
+            for t in range(len(compiled.transitions)):
+                assert generated.is_enabled_compiled(compiled, t, actual) == \
+                       interpreted.is_enabled_compiled(compiled, t, expected)
+
+            enabled = interpreted.enabled_transitions_compiled(compiled, expected)
+            assert generated.enabled_transitions_compiled(compiled, actual) == enabled
+            if not enabled:
+                continue
+
+            # Alternate the enabled transitions to walk through the choices and the loops
+            t = enabled[step % len(enabled)]
+            expected = interpreted.fire_compiled(compiled, t, expected)
+            actual = generated.fire_compiled(compiled, t, actual)
+            assert actual == expected
+            assert actual.token_mask == expected.token_mask
+            assert actual.token_enabled == expected.token_enabled
+
+    def test_unsafe_marking(self, net):
+        net, im, _ = net
+        compiled = CompiledNet.of(net)
+        t = next(t for t in range(len(compiled.transitions))
+                 if {p for p, _ in compiled.outputs[t]} - {p for p, _ in compiled.inputs[t]})
+
+        # The output places are already marked, so the firing leaves two tokens in them
+        tokens = im.tokens
+        for p, _ in compiled.outputs[t]:
+            tokens[compiled.places[p]] = 1
+        for p, _ in compiled.inputs[t]:
+            tokens[compiled.places[p]] = 1
+        marking = ArrayTimeMarking.of(compiled, TimeMarking(tokens)).add_time(100)
+        TimeNetSematic().token_enabled_compiled(compiled, marking)
+
+        expected = TimeNetSematic().fire_compiled(compiled, t, marking)
+        actual = GeneratedSemantic().fire_compiled(compiled, t, marking)
+        assert actual == expected
+        assert actual.token_mask is None and expected.token_mask is None
+        assert actual.token_enabled == expected.token_enabled
+
+    def test_cache_by_structure(self):
+        region = _load("tests/iron.json")
+        first, _, _ = from_region(region)
+        second, _, _ = from_region(region)
+        first_compiled, second_compiled = CompiledNet.of(first), CompiledNet.of(second)
+
+        assert first_compiled is not second_compiled
+        assert structural_hash(first_compiled) == structural_hash(second_compiled)
+        # The generated functions are shared by the nets with the same structure
+        assert GeneratedNet.of(first_compiled).fire is GeneratedNet.of(second_compiled).fire
+        assert GeneratedNet.of(first_compiled) is GeneratedNet.of(first_compiled)
@@ -0,0 +1,60 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from model.context import NetContext
+from model.region import RegionModel, RegionType, find_region_by_id
+from model.region_index import RegionIndex
+
+PWD = Path(__file__).parent.parent.parent
+
+
+@pytest.fixture
+def ctx():
+    with open(os.path.join(PWD, "tests/input_data/bpmn_loop.json")) as f:
+        yield NetContext.from_region(RegionModel.model_validate_json(f.read()))
+
+
+def _walk(region, parent=None):
+    yield region, parent
+    for child in region.children or []:
+        yield from _walk(child, region)
+
+
+class TestRegionIndex:
+
+    def test_lookup(self, ctx):
+        index = ctx.region_index
+
+        assert index is ctx.region_index
+        assert list(index.preorder) == [r for r, _ in _walk(ctx.region)]
+        for region, parent in _walk(ctx.region):
+            assert index[region.id] is find_region_by_id(ctx.region, region.id)
+            assert index[str(region.id)] is index[region.id]
+            assert index.parent(region) is parent
+            assert region.id in index
+
+        assert index.get("missing") is None
+        assert index[ctx.region.id] is index.root is ctx.region
+
+    def test_net_elements(self, ctx):
+        index = ctx.region_index
+
+        for place in ctx.net.places:
+            if place.entry_id is not None:
+                assert place in index.get_entry_places(place.entry_id)
+            if place.exit_id is not None:
+                assert place in index.get_exit_places(place.exit_id)
+        for transition in ctx.net.transitions:
+            assert transition in index.get_transitions(transition.region_id)
+
+    def test_deep_tree(self):
+        depth = 5000
+        region = RegionModel.model_construct(id=depth, type=RegionType.TASK, children=None)
+        for i in reversed(range(depth)):
+            region = RegionModel.model_construct(id=i, type=RegionType.SEQUENTIAL, children=[region])
+
+        index = RegionIndex(region)
+        assert len(index) == depth + 1
+        assert index.parent(depth) is index[depth - 1]
@@ -0,0 +1,32 @@
+from main import execute
+from model.endpoints.execute.request import ExecuteRequest
+
+BPMN = {
+    "id": 0,
+    "type": "sequential",
+    "children": [
+        {"id": 1, "type": "task", "label": "T1", "impacts": [1, 2], "duration": 1},
+        {"id": 2, "type": "task", "label": "T2", "impacts": [3, 4], "duration": 2},
+    ],
+}
+
+
+def test_request_decoded_once():
+    response = execute(ExecuteRequest.model_validate({"bpmn": BPMN}))
+    response = execute(ExecuteRequest.model_validate({
+        "bpmn": BPMN, "petri_net": response["petri_net"], "execution_tree": response["execution_tree"]
+    }))
+    request = ExecuteRequest.model_validate({
+        "bpmn": BPMN, "petri_net": response["petri_net"], "execution_tree": response["execution_tree"]
+    })
+
+    _, net, im, fm, extree, _ = request.to_object()
+    assert request.petri_net_obj is net
+    assert request.execution_tree_obj is extree
+
+    # Every marking refers to the places of the same decoded net
+    places = set(net.places)
+    assert set(im.keys()) <= places
+    assert set(fm.keys()) <= places
+    for node in extree:
+        assert set(node.snapshot.marking.keys()) <= places
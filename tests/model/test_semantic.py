@@ -1,11 +1,13 @@
 import os
 from pathlib import Path
 
+import numpy as np
 import pytest
 from pm4py.objects.bpmn.obj import Marking
 
 from converter.spin import from_region
-from model.petri_net.time_spin import TimeMarking, TimeNetSematic
+from model.petri_net.compiled import CompiledNet
+from model.petri_net.time_spin import ArrayTimeMarking, TimeMarking, TimeNetSematic
 from model.region import RegionModel
 
 PWD = Path(__file__).parent.parent.parent
@@ -83,3 +85,119 @@ class TestTimeSemantic:
         real_time_marking = semantic.execute(net, t, marking)
 
         assert real_time_marking == expected_time_marking
+
+    def test_incremental_enabled(self, iron_net):
+        net, im, _ = iron_net
+        semantic = TimeNetSematic()
+        compiled = CompiledNet.of(net)
+        marking = ArrayTimeMarking.of(compiled, im)
+        semantic.token_enabled_compiled(compiled, marking)
+
+        for _ in range(20):
+            marking = marking.add_time(100)
+            enabled = semantic.enabled_transitions_compiled(compiled, marking)
+            if not enabled:
+                break
+            marking = semantic.fire_compiled(compiled, enabled[0], marking)
+
+            # The cache updated while firing matches a full evaluation
+            fresh = ArrayTimeMarking.of(compiled, TimeMarking(marking.tokens, marking.age, marking.visit_count))
+            assert marking.token_enabled == semantic.token_enabled_compiled(compiled, fresh)
+            assert set(semantic.enabled_transitions_compiled(compiled, marking)) == \
+                   {t for t in range(len(compiled.transitions)) if semantic.is_enabled_compiled(compiled, t, marking)}
+
+    def test_read_only_views(self, iron_net):
+        net, im, _ = iron_net
+        place = next(iter(im))
+        for marking in (im, ArrayTimeMarking.of(CompiledNet.of(net), im)):
+            with pytest.raises(TypeError):
+                marking.age[place] = 1.0
+            with pytest.raises(TypeError):
+                marking.visit_count[place] = 1
+
+    def test_bitset_engine(self, iron_net):
+        net, im, _ = iron_net
+        semantic = TimeNetSematic()
+        compiled = CompiledNet.of(net)
+        assert compiled.safe
+
+        safe = ArrayTimeMarking.of(compiled, im)
+        general = ArrayTimeMarking.of(compiled, im)
+        general.token_mask = None
+        assert safe.token_mask is not None
+
+        for _ in range(20):
+            safe, general = safe.add_time(100), general.add_time(100)
+            enabled = semantic.enabled_transitions_compiled(compiled, safe)
+            assert enabled == semantic.enabled_transitions_compiled(compiled, general)
+            if not enabled:
+                break
+            safe = semantic.fire_compiled(compiled, enabled[0], safe)
+            general = semantic.fire_compiled(compiled, enabled[0], general)
+
+            # Both engines reach the same marking, the mask follows the marked places
+            assert safe == general
+            assert general.token_mask is None
+            assert safe.token_mask == sum(1 << p for p in np.flatnonzero(safe.token_array).tolist())
+
+    def test_bitset_fallback(self, iron_net):
+        net, im, _ = iron_net
+        semantic = TimeNetSematic()
+        compiled = CompiledNet.of(net)
+        t = semantic.enabled_transitions_compiled(compiled, ArrayTimeMarking.of(compiled, im).add_time(100))[0]
+
+        # With an output place already marked the firing leaves two tokens in it
+        tokens = Marking(im)
+        for p, _ in compiled.outputs[t]:
+            tokens[compiled.places[p]] = 1
+        marking = ArrayTimeMarking.of(compiled, TimeMarking(tokens)).add_time(100)
+        assert marking.token_mask is not None
+
+        fired = semantic.fire_compiled(compiled, t, marking)
+        assert fired.token_mask is None
+        assert fired.token_array.max() == 2
+        assert semantic.token_enabled_compiled(compiled, fired) == \
+               semantic.token_enabled_compiled(compiled, TimeMarking(fired.tokens))
+
+    def test_fire_batch(self, iron_net):
+        net, im, _ = iron_net
+        semantic = TimeNetSematic()
+        compiled = CompiledNet.of(net)
+        marking = ArrayTimeMarking.of(compiled, im)
+        semantic.token_enabled_compiled(compiled, marking)
+        marking.fingerprint
+
+        for _ in range(20):
+            marking = marking.add_time(100)
+            enabled = semantic.enabled_transitions_compiled(compiled, marking)
+            if not enabled:
+                break
+            batch = []
+            for t in enabled:
+                if not semantic.batch_conflicts(compiled, batch + [t]):
+                    batch.append(t)
+
+            expected = marking
+            for t in batch:
+                expected = semantic.fire_compiled(compiled, t, expected)
+            marking = semantic.fire_batch_compiled(compiled, batch, marking)
+
+            # One pass gives the marking, the caches and the mask of the firings one at a time
+            assert marking == expected
+            assert marking.token_enabled == expected.token_enabled
+            assert marking.token_mask == expected.token_mask
+            assert marking.fingerprint == expected.fingerprint
+
+    def test_batch_conflicts(self, iron_net):
+        net, im, _ = iron_net
+        semantic = TimeNetSematic()
+        compiled = CompiledNet.of(net)
+        marking = ArrayTimeMarking.of(compiled, im)
+
+        # Transitions leaving the same place share their input place
+        p = next(p for p in range(len(compiled.places)) if len(compiled.place_outputs[p]) > 1)
+        t, u = compiled.place_outputs[p][:2]
+        assert semantic.batch_conflicts(compiled, [t, u]) == [(t, u)]
+        assert semantic.batch_conflicts(compiled, [t, t]) == [(t, t)]
+        with pytest.raises(ValueError):
+            semantic.fire_batch_compiled(compiled, [t, u], marking)
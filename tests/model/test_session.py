@@ -0,0 +1,287 @@
+import time
+
+import pytest
+
+from main import execute, get_session_node
+from model.context import NetContext
+from model.endpoints.execute.request import ExecuteRequest, TreeViewModel
+from model.endpoints.execute.encoder import view_to_dict
+from model.extree import ExecutionTree, ExecutionTreeNode
+from model.region import RegionModel
+from model.session import SessionStore
+
+BPMN = {
+    "id": 0,
+    "type": "sequential",
+    "children": [
+        {"id": 1, "type": "task", "label": "T1", "impacts": [1, 2], "duration": 1},
+        {"id": 2, "type": "task", "label": "T2", "impacts": [3, 4], "duration": 2},
+    ],
+}
+
+
+@pytest.fixture
+def region():
+    return RegionModel.model_validate(BPMN)
+
+
+def _create(store, region):
+    ctx = NetContext.from_region(region)
+    return store.create(ctx, ExecutionTree.from_context(ctx, region), {})
+
+
+class TestSessionStore:
+
+    def test_create_and_get(self, region):
+        store = SessionStore()
+        session = _create(store, region)
+
+        assert session.id in store
+        assert store.get(session.id) is session
+        assert store.get("missing") is None
+
+    def test_ttl(self, region):
+        store = SessionStore(ttl=0.01)
+        session = _create(store, region)
+        time.sleep(0.02)
+
+        assert store.get(session.id) is None
+        assert len(store) == 0
+
+    def test_lru_eviction(self, region):
+        store = SessionStore(max_sessions=2)
+        first = _create(store, region)
+        second = _create(store, region)
+
+        # Touch the first session so that the second one is the least recently used
+        store.get(first.id)
+        third = _create(store, region)
+
+        assert first.id in store
+        assert second.id not in store
+        assert third.id in store
+
+    def test_memory_budget(self, region):
+        store = SessionStore()
+        first = _create(store, region)
+        store.memory_budget = first.estimate_size() + 1
+        second = _create(store, region)
+
+        assert first.id not in store
+        assert second.id in store
+
+    def test_oversized_session(self, region):
+        # A new session is kept even alone over the budget, the older ones are evicted
+        store = SessionStore(memory_budget=1)
+        first = _create(store, region)
+        assert first.id in store
+        assert store.total_size == first.estimate_size()
+
+        second = _create(store, region)
+        assert first.id not in store
+        assert second.id in store
+        assert store.total_size == second.estimate_size()
+
+        store.remove(second.id)
+        assert store.total_size == 0
+
+    def test_remove(self, region):
+        store = SessionStore()
+        session = _create(store, region)
+
+        assert store.remove(session.id)
+        assert not store.remove(session.id)
+
+
+def test_execute_session():
+    response = execute(ExecuteRequest.model_validate({"bpmn": BPMN, "create_session": True}))
+    session_id = response["session_id"]
+    assert response["execution_tree"]["current_node"] == "0"
+
+    response = execute(ExecuteRequest.model_validate({"session_id": session_id}))
+    assert response["session_id"] == session_id
+    assert response["execution_tree"]["current_node"] == "1"
+    assert len(response["execution_tree"]["root"]["children"]) == 1
+    # Impacts are serialised as plain lists
+    assert response["execution_tree"]["root"]["snapshot"]["impacts"] == [0.0, 0.0]
+    assert response["execution_tree"]["root"]["children"][0]["snapshot"]["impacts"] == [4.0, 6.0]
+
+    # Going back to the root and consuming again reuses the same node
+    response = execute(ExecuteRequest.model_validate({"session_id": session_id, "current_node": "0"}))
+    assert response["execution_tree"]["current_node"] == "1"
+    assert len(response["execution_tree"]["root"]["children"]) == 1
+
+
+def test_session_time_steps_match_stateless():
+    # The clock of a session accumulates steps that are not representable, the ages read from it must not drift
+    time_steps = [0.3, 0.7, 1.1] * 3
+
+    response = execute(ExecuteRequest.model_validate({"bpmn": BPMN, "create_session": True}))
+    session_id = response["session_id"]
+    stateless = execute(ExecuteRequest.model_validate({"bpmn": BPMN}))
+    for time_step in time_steps:
+        response = execute(ExecuteRequest.model_validate({"session_id": session_id, "time_step": time_step}))
+        stateless = execute(ExecuteRequest.model_validate({"bpmn": BPMN, "petri_net": stateless["petri_net"],
+                                                           "execution_tree": stateless["execution_tree"],
+                                                           "time_step": time_step}))
+        assert response["execution_tree"]["root"] == stateless["execution_tree"]["root"]
+
+    node = response["execution_tree"]["root"]
+    while node.get("children"):
+        node = node["children"][-1]
+    assert node["snapshot"]["impacts"] == [4.0, 6.0]
+    assert {place: item["age"] for place, item in node["snapshot"]["marking"].items()} == {"0": 0.0, "3": 0.0, "4": 0.1}
+
+
+def test_execute_unknown_session():
+    response = execute(ExecuteRequest.model_validate({"session_id": "missing"}))
+    assert response["type"] == "error"
+
+
+def test_session_request_validation():
+    with pytest.raises(ValueError):
+        ExecuteRequest.model_validate({})
+
+    response = execute(ExecuteRequest.model_validate({"bpmn": BPMN}))
+    with pytest.raises(ValueError):
+        ExecuteRequest.model_validate({"session_id": "abc", "petri_net": response["petri_net"],
+                                       "execution_tree": response["execution_tree"]})
+
+
+def test_response_fields():
+    response = execute(ExecuteRequest.model_validate({"bpmn": BPMN, "create_session": True,
+                                                      "fields": ["execution_tree.current"]}))
+    assert set(response) == {"execution_tree", "session_id"}
+    assert response["execution_tree"] == {
+        "current_node": "0",
+        "current": {"name": "Root", "id": "0", "snapshot": response["execution_tree"]["current"]["snapshot"]},
+    }
+
+    # Only the new snapshot is rendered, without the tree, the net and the drawings
+    response = execute(ExecuteRequest.model_validate({"session_id": response["session_id"],
+                                                      "fields": ["execution_tree.current", "spin_svg"]}))
+    assert set(response) == {"execution_tree", "spin_svg", "session_id"}
+    assert "root" not in response["execution_tree"]
+    assert response["execution_tree"]["current"]["id"] == "1"
+    assert response["execution_tree"]["current"]["snapshot"]["impacts"] == [4.0, 6.0]
+
+    # Without fields the whole response is rendered
+    full = execute(ExecuteRequest.model_validate({"bpmn": BPMN}))
+    assert set(full) == {"bpmn", "petri_net", "petri_net_dot", "spin_svg", "execution_tree"}
+    assert set(full["execution_tree"]) == {"root", "current_node"}
+
+    preview = execute(ExecuteRequest.model_validate({"bpmn": BPMN, "petri_net": full["petri_net"],
+                                                     "execution_tree": full["execution_tree"], "preview": True,
+                                                     "fields": ["petri_net"]}))
+    assert set(preview) == {"petri_net"}
+    assert len(preview["petri_net"]["places"]) == len(full["petri_net"]["places"])
+
+    with pytest.raises(ValueError):
+        ExecuteRequest.model_validate({"bpmn": BPMN, "fields": ["execution_tree.unknown"]})
+
+
+def test_delta_response():
+    response = execute(ExecuteRequest.model_validate({"bpmn": BPMN, "create_session": True,
+                                                      "fields": ["execution_tree.delta"]}))
+    session_id = response["session_id"]
+    tree = response["execution_tree"]
+    assert (tree["base_version"], tree["version"]) == (-1, 0)
+    assert [(n["id"], n.get("parent")) for n in tree["nodes"]] == [("0", None)]
+
+    # The client patches its copy with the new nodes
+    nodes = {n["id"]: n for n in tree["nodes"]}
+    response = execute(ExecuteRequest.model_validate({"session_id": session_id, "fields": ["execution_tree.delta"]}))
+    tree = response["execution_tree"]
+    assert (tree["base_version"], tree["version"], tree["current_node"]) == (0, 1, "1")
+    assert [(n["id"], n["parent"]) for n in tree["nodes"]] == [("1", "0")]
+    nodes.update((n["id"], n) for n in tree["nodes"])
+
+    full = execute(ExecuteRequest.model_validate({"session_id": session_id, "preview": True}))["execution_tree"]
+    assert nodes["1"]["snapshot"] == full["root"]["children"][0]["snapshot"]
+
+    # Reaching an existing node adds nothing, an older version gets the nodes added since
+    response = execute(ExecuteRequest.model_validate({"session_id": session_id, "current_node": "0",
+                                                      "fields": ["execution_tree.delta"]}))
+    assert response["execution_tree"]["nodes"] == [] and response["execution_tree"]["current_node"] == "1"
+    response = execute(ExecuteRequest.model_validate({"session_id": session_id, "since_version": 0, "preview": True,
+                                                      "fields": ["execution_tree.delta"]}))
+    assert [n["id"] for n in response["execution_tree"]["nodes"]] == ["1"]
+
+    response = execute(ExecuteRequest.model_validate({"session_id": session_id, "since_version": 5, "preview": True,
+                                                      "fields": ["execution_tree.delta"]}))
+    assert response["type"] == "error"
+    with pytest.raises(ValueError):
+        ExecuteRequest.model_validate({"bpmn": BPMN, "since_version": 0})
+
+
+def test_tree_view():
+    response = execute(ExecuteRequest.model_validate({"bpmn": BPMN, "create_session": True}))
+    session_id = response["session_id"]
+    execute(ExecuteRequest.model_validate({"session_id": session_id, "fields": []}))
+
+    response = execute(ExecuteRequest.model_validate({"session_id": session_id, "preview": True,
+                                                      "fields": ["execution_tree.view"]}))
+    view = response["execution_tree"]["view"]
+    assert [n["id"] for n in view["path"]] == ["0"]
+    assert (view["node"]["id"], view["node"]["parent"]) == ("1", "0") and "children_count" not in view["node"]
+
+    response = execute(ExecuteRequest.model_validate({"session_id": session_id, "preview": True,
+                                                      "fields": ["execution_tree.view"], "view": {"node": "0"}}))
+    view = response["execution_tree"]["view"]
+    assert "path" not in view and view["node"]["children_count"] == 1
+    assert [n["id"] for n in view["node"]["children"]] == ["1"]
+
+    response = execute(ExecuteRequest.model_validate({"session_id": session_id, "preview": True,
+                                                      "fields": ["execution_tree.view"],
+                                                      "view": {"node": "0", "depth": 5, "offset": 1}}))
+    # The page starts after the only child
+    view = response["execution_tree"]["view"]
+    assert view["node"]["children_count"] == 1 and "children" not in view["node"]
+
+    response = execute(ExecuteRequest.model_validate({"session_id": session_id, "preview": True,
+                                                      "fields": ["execution_tree.view"], "view": {"node": "9"}}))
+    assert response["type"] == "error"
+    with pytest.raises(ValueError):
+        ExecuteRequest.model_validate({"bpmn": BPMN, "view": {"limit": 0}})
+
+
+def test_tree_view_pages():
+    ctx = NetContext.from_region(RegionModel.model_validate(BPMN))
+    extree = ExecutionTree.from_context(ctx, ctx.region)
+    root = extree.root
+    for i in range(5):
+        child = ExecutionTreeNode(name=str(i + 1), _id=str(i + 1), snapshot=root.snapshot, parent=root)
+        ExecutionTreeNode(name=f"{i + 1}.1", _id=f"{i + 1}.1", snapshot=root.snapshot, parent=child)
+
+    node = view_to_dict(extree, TreeViewModel(node="0", depth=2, offset=1, limit=2))["node"]
+    assert node["children_count"] == 5
+    assert [n["id"] for n in node["children"]] == ["2", "3"]
+    assert [[c["id"] for c in n["children"]] for n in node["children"]] == [["2.1"], ["3.1"]]
+    assert view_to_dict(extree, TreeViewModel(node="0", offset=4, limit=2))["node"]["children"][0]["id"] == "5"
+
+    # The path keeps the nearest ancestors, the others are reached by a view on the first of them
+    node = top = ExecutionTreeNode(name="Root", _id="0", snapshot=root.snapshot)
+    for i in range(1, 6):
+        node = ExecutionTreeNode(name=str(i), _id=str(i), snapshot=root.snapshot, parent=node)
+    chain = ExecutionTree(top)
+    view = view_to_dict(chain, TreeViewModel(node="5", depth=0, path_limit=2))
+    assert view["path_count"] == 5 and [n["id"] for n in view["path"]] == ["3", "4"]
+    view = view_to_dict(chain, TreeViewModel(node=view["path"][0]["id"], depth=0, path_limit=2))
+    assert view["path_count"] == 3 and [n["id"] for n in view["path"]] == ["1", "2"]
+    view = view_to_dict(chain, TreeViewModel(node="5", depth=0, path_limit=0))
+    assert view["path_count"] == 5 and "path" not in view
+    assert len(view_to_dict(chain, TreeViewModel(node="5", path_limit=10))["path"]) == 5
+
+
+def test_get_session_node():
+    session_id = execute(ExecuteRequest.model_validate({"bpmn": BPMN, "create_session": True}))["session_id"]
+    execute(ExecuteRequest.model_validate({"session_id": session_id, "fields": []}))
+
+    full = execute(ExecuteRequest.model_validate({"session_id": session_id, "preview": True}))["execution_tree"]
+    node = get_session_node(session_id, "1")
+    assert (node["id"], node["parent"]) == ("1", "0")
+    assert node["snapshot"] == full["root"]["children"][0]["snapshot"]
+    assert get_session_node(session_id, "0")["children_count"] == 1
+
+    assert get_session_node(session_id, "9")["type"] == "error"
+    assert get_session_node("missing", "0")["type"] == "error"
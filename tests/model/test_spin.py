@@ -1,10 +1,13 @@
+import copy
 import os
 import pathlib
+import random
 
 import pytest
 
 from model.context import NetContext
-from model.petri_net.time_spin import TimeMarking
+from model.petri_net.generated import GeneratedSemantic
+from model.petri_net.time_spin import TimeMarking, ArrayTimeMarking, MarkingItem, TimeNetSematic
 from model.petri_net.wrapper import WrapperPetriNet
 
 PWD = pathlib.Path(__file__).parent.parent.parent.absolute()
@@ -86,7 +89,7 @@ class TestTimeMarking:
         time_added = 1.0
         new_marking = im.add_time(time_added)
 
-        tmp = im.age
+        tmp = dict(im.age)
         first_key_not_active = None
         for place in ctx.net.places:
             if im[place].token > 0:
@@ -100,3 +103,100 @@ class TestTimeMarking:
         assert (
             new_marking.age.get(first_key_not_active, 0) == 0
         ), "Age for inactive places should be set to 0"
+
+
+    def test_frozen(self, ctx, time_marking):
+        assert copy.copy(time_marking) is time_marking
+        assert copy.deepcopy(time_marking) is time_marking
+        with pytest.raises(TypeError):
+            time_marking.age[next(iter(ctx.net.places))] = 1.0
+
+        new_marking = time_marking.add_time(1.0)
+        assert new_marking is not time_marking
+        assert time_marking == TimeMarking(time_marking.tokens, dict(time_marking.age))
+
+
+class TestArrayTimeMarking:
+
+    def test_conversion(self, ctx, time_marking):
+        array_marking = ArrayTimeMarking.of(ctx.compiled, time_marking)
+
+        assert array_marking == time_marking
+        assert time_marking == array_marking
+        assert array_marking.keys() == time_marking.keys()
+        assert ArrayTimeMarking.of(ctx.compiled, array_marking) is array_marking
+        for place in ctx.net.places:
+            assert array_marking[place] == time_marking[place]
+            assert array_marking[place.name] == time_marking[place]
+
+    def test_add_time(self, ctx, time_marking):
+        array_marking = ArrayTimeMarking.of(ctx.compiled, time_marking)
+        new_marking = array_marking.add_time(1.0)
+
+        assert new_marking == time_marking.add_time(1.0)
+        assert new_marking != array_marking
+        # The original marking is not modified
+        assert array_marking == time_marking
+
+    def test_add_time_moves_clock(self, ctx, time_marking):
+        array_marking = ArrayTimeMarking.of(ctx.compiled, time_marking)
+        new_marking = array_marking.add_time(2.5).add_time(0.5)
+
+        # Only the clock moves, the vectors are shared
+        assert new_marking.clock == array_marking.clock + 3.0
+        assert new_marking.base_array is array_marking.base_array
+        assert new_marking.token_array is array_marking.token_array
+        assert new_marking == time_marking.add_time(3.0)
+
+    def test_age_after_fire(self, ctx):
+        semantic = ctx.semantic
+        marking = ctx.initial_marking.add_time(100)
+        transition = next(iter(semantic.enabled_transitions(ctx.net, marking)))
+
+        fired = semantic.fire(ctx.net, transition, marking).add_time(2.0)
+        for arc in transition.out_arcs:
+            assert fired[arc.target].age == 2.0
+        for arc in transition.in_arcs:
+            if fired[arc.source].token == 0:
+                assert fired[arc.source].age == 0.0
+
+    def test_fire(self, ctx):
+        semantic = ctx.semantic
+        marking = ctx.initial_marking.add_time(100)
+        transition = next(iter(semantic.enabled_transitions(ctx.net, marking)))
+
+        fired = semantic.fire(ctx.net, transition, marking)
+        assert isinstance(fired, ArrayTimeMarking)
+        for arc in transition.in_arcs:
+            assert fired[arc.source] == MarkingItem(token=0, age=0.0, visit_count=1)
+        for arc in transition.out_arcs:
+            assert fired[arc.target].token == 1
+
+    def test_fingerprint(self, ctx, time_marking):
+        array_marking = ArrayTimeMarking.of(ctx.compiled, time_marking)
+
+        assert array_marking.fingerprint == time_marking.fingerprint
+        assert hash(array_marking) == hash(time_marking)
+        assert len({array_marking, time_marking, copy.copy(array_marking)}) == 1
+        assert array_marking.add_time(1.0).fingerprint == time_marking.add_time(1.0).fingerprint
+        assert array_marking.add_time(1.0).fingerprint != array_marking.fingerprint
+
+    @pytest.mark.parametrize("semantic", [TimeNetSematic(), GeneratedSemantic()])
+    def test_incremental_fingerprint(self, ctx, semantic):
+        rng = random.Random(0)
+        marking = ArrayTimeMarking.of(ctx.compiled, ctx.initial_marking)
+        assert marking.fingerprint == ctx.initial_marking.fingerprint
+
+        for _ in range(50):
+            enabled = sorted(semantic.enabled_transitions(ctx.net, marking), key=lambda t: t.name)
+            if enabled:
+                marking = semantic.fire(ctx.net, rng.choice(enabled), marking)
+            else:
+                marking = marking.add_time(rng.choice([0.5, 1.0]))
+            if rng.random() < 0.2:
+                marking = marking.increase_visit_count(list(marking.keys()))
+
+            # The fingerprint is carried over, not recomputed
+            assert marking.idle_hash is not None
+            rebuilt = TimeMarking(marking.tokens, marking.age, marking.visit_count)
+            assert marking.fingerprint == rebuilt.fingerprint
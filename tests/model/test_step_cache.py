@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+
+from main import consume_step
+from model.context import NetContext
+from model.extree import ExecutionTree
+from model.region import RegionModel
+from model.step_cache import StepCache, StepResult
+from strategy.execution import resolve_default_choices
+
+BPMN = {
+    "id": 0,
+    "type": "sequential",
+    "children": [
+        {
+            "id": 1,
+            "type": "choice",
+            "label": "C",
+            "children": [
+                {"id": 2, "type": "task", "label": "T2", "impacts": [1, 2], "duration": 1},
+                {"id": 3, "type": "task", "label": "T3", "impacts": [3, 4], "duration": 2},
+            ],
+        },
+        {
+            "id": 4,
+            "type": "parallel",
+            "children": [
+                {"id": 5, "type": "task", "label": "T5", "impacts": [1, 1], "duration": 1},
+                {"id": 6, "type": "task", "label": "T6", "impacts": [2, 2], "duration": 3},
+            ],
+        },
+    ],
+}
+
+NATURE = {
+    "id": 0,
+    "type": "sequential",
+    "children": [
+        {"id": 1, "type": "task", "label": "T1", "impacts": [1, 1], "duration": 1},
+        {
+            "id": 2,
+            "type": "nature",
+            "label": "N",
+            "distribution": [0.5, 0.5],
+            "children": [
+                {"id": 3, "type": "task", "label": "T3", "impacts": [1, 1], "duration": 1},
+                {"id": 4, "type": "task", "label": "T4", "impacts": [2, 2], "duration": 3},
+            ],
+        },
+    ],
+}
+
+
+def _result(i: int) -> StepResult:
+    return StepResult(None, 1.0, (i,), 0.0, (), {})
+
+
+
+class TestStepCache:
+
+    def test_lru(self):
+        cache = StepCache(2)
+        cache.put("a", _result(1))
+        cache.put("b", _result(2))
+        assert cache.get("a").impacts == (1,)
+        cache.put("c", _result(3))
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("c").impacts == (3,)
+        assert (cache.hits, cache.misses) == (2, 1)
+
+        disabled = StepCache(0)
+        disabled.put("a", _result(1))
+        assert len(disabled) == 0 and disabled.get("a") is None
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_replay(self, seed, grow_tree):
+        cached = NetContext.from_region(RegionModel.model_validate(BPMN))
+        uncached = NetContext.from_region(RegionModel.model_validate(BPMN), step_cache_size=0)
+
+        # The walk often goes back to a node already expanded and takes the same step again
+        time_steps = (None, 0.5, 1.0)
+        expected = grow_tree(uncached, ExecutionTree.from_context(uncached, uncached.region), 30, seed, time_steps)
+        extree = grow_tree(cached, ExecutionTree.from_context(cached, cached.region), 30, seed, time_steps)
+
+        assert cached.step_cache.hits > 0
+        assert cached.step_cache.bypassed == 0
+        assert len(extree) == len(expected)
+        for node in expected:
+            other = extree.get_node_by_id(node.id).snapshot
+            assert other.marking == node.snapshot.marking
+            assert other.probability == node.snapshot.probability
+            assert other.impacts.tolist() == node.snapshot.impacts.tolist()
+            assert other.execution_time == node.snapshot.execution_time
+            assert other.status == node.snapshot.status
+
+    def test_nature_bypass(self):
+        ctx = NetContext.from_region(RegionModel.model_validate(NATURE))
+        extree = ExecutionTree.from_context(ctx, ctx.region)
+        # The first step runs T1 and stops before the nature region
+        node = consume_step(ctx, extree, ctx.region_index, [])
+        assert len(ctx.step_cache) == 1
+
+        np.random.seed(0)
+        for _ in range(5):
+            extree.set_current(node)
+            consume_step(ctx, extree, ctx.region_index, [])
+
+        assert len(ctx.step_cache) == 1
+        assert ctx.step_cache.hits == 0
+        assert ctx.step_cache.bypassed == 5
+        # Both outcomes of the nature region were sampled
+        assert len(node.children) == 2
+
+    def test_fingerprint_collision(self, monkeypatch, grow_tree):
+        ctx = NetContext.from_region(RegionModel.model_validate(BPMN))
+        extree = grow_tree(ctx, ExecutionTree.from_context(ctx, ctx.region), 5)
+        first, second = [node.snapshot.marking for node in list(extree)[:2]]
+        assert first != second
+
+        # Markings with the same fingerprint do not share their steps
+        monkeypatch.setattr(type(first), "fingerprint", property(lambda self: 0))
+        cache = StepCache()
+        cache.put(StepCache.key(first, [], None, {}), _result(1))
+        assert cache.get(StepCache.key(second, [], None, {})) is None
+        assert cache.get(StepCache.key(first, [], None, {})).impacts == (1,)
+
+    def test_sampled(self):
+        ctx = NetContext.from_region(RegionModel.model_validate(NATURE))
+        extree = ExecutionTree.from_context(ctx, ctx.region)
+        marking = extree.current_node.snapshot.marking
+        _, sampled = resolve_default_choices(ctx, marking)
+        assert not sampled
+
+        marking = consume_step(ctx, extree, ctx.region_index, []).snapshot.marking
+        defaults, sampled = resolve_default_choices(ctx, marking)
+        assert sampled
+        # A chosen transition is not sampled
+        chosen, sampled = resolve_default_choices(ctx, marking, defaults)
+        assert set(chosen) == set(defaults) and not sampled
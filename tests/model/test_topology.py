@@ -0,0 +1,57 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from model.context import NetContext
+from model.petri_net.time_spin import TimeMarking
+from model.region import RegionModel
+from utils.default import check_loop_transitions
+from utils.net_utils import get_empty_impacts, remove_place
+
+PWD = Path(__file__).parent.parent.parent
+
+
+@pytest.fixture(params=["tests/iron.json", "tests/input_data/bpmn_loop.json", "tests/input_data/bpmn_parallel.json"])
+def ctx(request):
+    with open(os.path.join(PWD, request.param)) as f:
+        yield NetContext.from_region(RegionModel.model_validate_json(f.read()))
+
+
+class TestNetTopology:
+
+    def test_matches_net(self, ctx):
+        topology = ctx.topology
+
+        assert topology is ctx.topology
+        assert topology.empty_impacts().tolist() == get_empty_impacts(ctx.net).tolist()
+        for component in list(ctx.net.places) + list(ctx.net.transitions):
+            if component.out_arcs:
+                assert topology.first_target[component] == list(component.out_arcs)[0].target
+            else:
+                assert component not in topology.first_target
+            if component.in_arcs:
+                assert topology.first_source[component] == list(component.in_arcs)[0].source
+
+        for place in ctx.net.places:
+            assert topology.get_loop_transitions(place) == check_loop_transitions(place)
+
+        with pytest.raises(TypeError):
+            topology.first_target[next(iter(ctx.net.places))] = None
+
+    def test_final_marking(self, ctx):
+        topology = ctx.topology
+
+        assert topology.final_places == {p for p in ctx.net.places if ctx.final_marking[p].token > 0}
+        assert topology.is_final_marking(ctx.final_marking)
+        assert not topology.is_final_marking(ctx.initial_marking)
+
+        # Ages and visit counts do not matter, only the tokens
+        marking = TimeMarking(ctx.final_marking.tokens, age={p: 3 for p in topology.final_places})
+        assert topology.is_final_marking(marking)
+
+    def test_rebuilt_with_net(self, ctx):
+        topology = ctx.topology
+        remove_place(ctx.net, next(iter(ctx.net.places)))
+
+        assert ctx.topology is not topology
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+
+import msgpack
+import pytest
+
+from main import api
+from model.context import NetContext
+from model.endpoints.execute.encoder import encode_response
+from model.endpoints.execute.request import RESPONSE_FIELDS, TreeViewModel
+from model.endpoints.execute.wire import STRINGS_KEY, accepts_msgpack, is_msgpack, pack, unpack
+from model.extree import ExecutionTree
+from model.region import RegionModel
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+PWD = Path(__file__).parent.parent.parent
+FIELDS = [f for f in RESPONSE_FIELDS if f not in ("petri_net_dot", "spin_svg")]
+
+
+@pytest.fixture
+def ctx():
+    with open(os.path.join(PWD, "tests/input_data/bpmn_loop.json")) as f:
+        yield NetContext.from_region(RegionModel.model_validate_json(f.read()))
+
+
+def _post(headers: dict[str, str], body: bytes):
+    # Call the /execute route as the server does, without a client
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "path": "/execute", "query_string": b"",
+             "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]}
+    route = next(r for r in api.routes if getattr(r, "path", None) == "/execute")
+    return asyncio.run(route.get_route_handler()(Request(scope, receive)))
+
+
+def test_round_trip(ctx, grow_tree):
+    extree = ExecutionTree.from_context(ctx, ctx.region)
+    grow_tree(ctx, extree, 20)
+    content = encode_response(ctx.region, ctx.net, ctx.initial_marking, ctx.final_marking, extree,
+                              fields=FIELDS, since_version=0, session_id="s", view=TreeViewModel(node="0", depth=2))
+    expected = json.loads(json.dumps(content))
+
+    data = pack(content)
+    assert json.loads(json.dumps(unpack(data))) == expected
+    assert len(data) < len(json.dumps(content))
+
+    # Every place and transition name is in the table once, and nowhere else
+    packed = msgpack.unpackb(data, strict_map_key=False)
+    names = [p.name for p in ctx.net.places] + [t.name for t in ctx.net.transitions]
+    assert sorted(packed[STRINGS_KEY]) == sorted(names)
+    root = packed["execution_tree"]["root"]
+    assert set(root["snapshot"]["marking"]) <= set(range(len(names)))
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        unpack(b"\x93\x01\x02\x03")
+    with pytest.raises(ValueError):
+        unpack(pack({"choices": ["a"]})[:-1])
+    with pytest.raises(ValueError):
+        unpack(msgpack.packb({"choices": [3], STRINGS_KEY: ["a"]}))
+
+
+def test_negotiation():
+    assert not accepts_msgpack(None) and not accepts_msgpack("*/*")
+    assert accepts_msgpack("application/msgpack")
+    assert accepts_msgpack("application/json;q=0.5, application/x-msgpack")
+    assert not accepts_msgpack("application/json, application/msgpack")
+    assert is_msgpack("application/msgpack; charset=binary") and not is_msgpack("application/json")
+
+
+def test_execute_msgpack():
+    with open(os.path.join(PWD, "tests/input_data/bpmn_choice.json")) as f:
+        bpmn = json.load(f)
+
+    # JSON stays the default
+    response = _post({"content-type": "application/json"}, json.dumps({"bpmn": bpmn}).encode())
+    assert response.media_type == "application/json"
+    first = json.loads(response.body)
+
+    response = _post({"content-type": "application/msgpack", "accept": "application/msgpack"},
+                     pack({"bpmn": bpmn}))
+    assert response.media_type == "application/msgpack"
+    content = unpack(response.body)
+    # The DOT source names the nodes by the id of the objects of each request
+    assert content.pop("petri_net_dot").startswith("digraph")
+    assert content == {k: v for k, v in first.items() if k != "petri_net_dot"}
+
+    # The client sends the state back, with the names of its choices from the table
+    choice = next(t["id"] for t in first["petri_net"]["transitions"] if t.get("stop"))
+    payload = {"bpmn": bpmn, "petri_net": first["petri_net"], "execution_tree": first["execution_tree"],
+               "choices": [choice], "fields": ["petri_net", "execution_tree"]}
+    response = _post({"content-type": "application/msgpack"}, pack(payload))
+    expected = _post({"content-type": "application/json"}, json.dumps(payload).encode())
+    assert response.media_type == "application/json"
+    assert response.body == expected.body
+    assert len(json.loads(response.body)["execution_tree"]["root"]["children"]) == 1
+
+    # The exception is turned into the 400 response by the handlers of the application
+    with pytest.raises(HTTPException) as error:
+        _post({"content-type": "application/msgpack"}, b"\xc1")
+    assert error.value.status_code == 400
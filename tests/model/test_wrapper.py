@@ -0,0 +1,127 @@
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+from converter.spin import from_region
+from model.petri_net.time_spin import TimeMarking
+from model.petri_net.wrapper import CustomProperties, WrapperPetriNet
+from model.region import RegionModel
+from utils.net_utils import (PropertiesKeys, add_arc_from_to, collapse_places, get_place_by_name,
+                             get_transition_by_name, remove_place)
+
+PWD = Path(__file__).parent.parent.parent
+
+
+@pytest.fixture
+def net():
+    with open(os.path.join(PWD, "tests/input_data/bpmn_loop.json")) as f:
+        net, _, _ = from_region(RegionModel.model_validate_json(f.read()))
+    return net
+
+
+def _assert_indexed(net):
+    assert net.places.by_name == {p.name: p for p in net.places}
+    assert net.transitions.by_name == {t.name: t for t in net.transitions}
+
+
+class TestSlottedAttributes:
+
+    def test_place(self):
+        place = WrapperPetriNet.Place("p")
+        assert isinstance(place.properties['custom'], CustomProperties)
+        assert place.duration == 0 and place.visit_limit is None
+
+        place.duration = None
+        assert place.duration == 0
+        place.visit_limit = 3
+        place.visit_limit = 5
+        assert place.visit_limit == 3
+
+        # The view reads and writes the slotted attributes
+        place.custom_properties[PropertiesKeys.DURATION] = 2.5
+        place.set_custom_property(PropertiesKeys.IMPACTS, [1, 2])
+        assert place.duration == 2.5
+        assert place.impacts == [1, 2]
+        assert place.get_custom_property(PropertiesKeys.VISIT_LIMIT) == 3
+        # Attributes never set are not in the view
+        assert PropertiesKeys.EXIT_RID not in place.custom_properties.keys()
+        assert set(place.custom_properties) == {PropertiesKeys.DURATION, PropertiesKeys.IMPACTS,
+                                                PropertiesKeys.VISIT_LIMIT}
+        with pytest.raises(KeyError):
+            place.custom_properties[PropertiesKeys.EXIT_RID]
+
+    def test_transition(self):
+        transition = WrapperPetriNet.Transition("t", label="T")
+        transition.stop = True
+        transition.region_id = 4
+        assert transition.custom_properties[PropertiesKeys.STOP] is True
+        assert transition.get_custom_property(PropertiesKeys.ENTRY_RID) == 4
+
+        # Keys without an attribute are kept in the view
+        transition.set_custom_property("note", "x")
+        assert transition.get_custom_property("note") == "x"
+        assert "note" in dict(transition.custom_properties)
+        del transition.custom_properties["note"]
+        assert transition.get_custom_property("note") is None
+        with pytest.raises(KeyError):
+            transition.custom_properties["missing"]
+
+
+    def test_pickle(self):
+        place = WrapperPetriNet.Place("p")
+        place.visit_limit = 3
+        place.impacts = [1, 2]
+        transition = WrapperPetriNet.Transition("t", label="T")
+        transition.stop = True
+        transition.set_custom_property("note", "x")
+
+        for element in (place, transition):
+            copy = pickle.loads(pickle.dumps(element))
+            assert copy == element
+            assert dict(copy.custom_properties) == dict(element.custom_properties)
+        assert pickle.loads(pickle.dumps(place)).visit_limit == 3
+
+
+class TestNameIndex:
+
+    def test_lookup(self, net):
+        _assert_indexed(net)
+        for place in net.places:
+            assert get_place_by_name(net, place.name) is place
+        for transition in net.transitions:
+            assert get_transition_by_name(net, transition.name) is transition
+        assert get_place_by_name(net, "missing") is None
+        assert net.get_transition_by_name("missing") is None
+
+    def test_sync(self, net):
+        place = WrapperPetriNet.Place("new")
+        net.places.add(place)
+        transition = next(iter(net.transitions))
+        add_arc_from_to(place, transition, net)
+        assert net.get_place_by_name("new") is place
+
+        remove_place(net, place)
+        assert net.get_place_by_name("new") is None
+        _assert_indexed(net)
+
+        old, new = WrapperPetriNet.Place("old"), WrapperPetriNet.Place("other")
+        places = net.places
+        places |= {old, new}
+        add_arc_from_to(transition, old, net)
+        collapse_places(net, old, new)
+        assert net.get_place_by_name("old") is None
+        assert net.get_place_by_name("other") is new
+        _assert_indexed(net)
+
+        places -= {new}
+        transitions = net.transitions
+        transitions &= set(list(transitions)[:2])
+        _assert_indexed(net)
+
+    def test_marking_by_name(self, net):
+        place = next(iter(net.places))
+        marking = TimeMarking({place: 1}, {place: 2.0}, {place: 3})
+        assert marking[place.name] == marking[place] == (1, 2.0, 3)
+        assert marking["missing"] == (0, 0.0, 0)
@@ -0,0 +1,68 @@
+import pytest
+
+from model.context import NetContext
+from model.petri_net.time_spin import TimeNetSematic
+from model.region import RegionModel
+from model.status import ActivityState
+from strategy.time import TimeStrategy
+
+# Parallel branches with the same durations complete at the same instants
+BPMN = {
+    "id": 0,
+    "type": "sequential",
+    "children": [
+        {
+            "id": 1,
+            "type": "parallel",
+            "children": [
+                {"id": 2, "type": "task", "label": "T2", "impacts": [1, 2], "duration": 2},
+                {"id": 3, "type": "task", "label": "T3", "impacts": [3, 4], "duration": 2},
+                {"id": 4, "type": "task", "label": "T4", "impacts": [5, 6], "duration": 2},
+            ],
+        },
+        {
+            "id": 5,
+            "type": "parallel",
+            "children": [
+                {"id": 6, "type": "task", "label": "T6", "impacts": [1, 1], "duration": 1},
+                {"id": 7, "type": "task", "label": "T7", "impacts": [2, 2], "duration": 1},
+            ],
+        },
+    ],
+}
+
+
+def _run(ctx, time_step):
+    regions = ctx.region_index
+    status = {r: ActivityState.WAITING for r in regions.preorder}
+    marking = ctx.initial_marking
+    steps = []
+    for _ in range(10):
+        if time_step is None:
+            result = ctx.strategy.consume(ctx, marking, regions, status, [])
+        else:
+            result = TimeStrategy().consume(ctx, marking, regions, status, time_step, [])
+        marking = result[0]
+        steps.append((marking, result[1], result[2].tolist(), result[3], dict(status)))
+
+    return steps
+
+
+@pytest.mark.parametrize("time_step", [None, 0.5, 1.0])
+def test_batch_matches_sequential(monkeypatch, time_step):
+    fire_batch = TimeNetSematic.fire_batch_compiled
+    batches = []
+
+    def record(self, compiled, transitions, marking):
+        batches.append(len(transitions))
+        return fire_batch(self, compiled, transitions, marking)
+
+    monkeypatch.setattr(TimeNetSematic, "fire_batch_compiled", record)
+    batched = _run(NetContext.from_region(RegionModel.model_validate(BPMN)), time_step)
+    assert max(batches) > 1
+
+    # Reporting a conflict for every batch makes the strategies fire one transition at a time
+    monkeypatch.setattr(TimeNetSematic, "batch_conflicts", staticmethod(lambda compiled, ts: [(ts[0], ts[0])]))
+    sequential = _run(NetContext.from_region(RegionModel.model_validate(BPMN)), time_step)
+
+    assert batched == sequential
@@ -0,0 +1,126 @@
+import random
+
+import numpy as np
+import pytest
+
+import strategy.base
+from model.context import NetContext
+from model.extree import ExecutionTree
+from model.region import RegionModel
+from model.status import ActivityState, propagate_status, resolve_skipped
+from strategy.execution import get_choices
+from strategy.time import TimeStrategy
+
+BPMN = {
+    "id": 0,
+    "type": "sequential",
+    "children": [
+        {
+            "id": 1,
+            "type": "loop",
+            "label": "L",
+            "distribution": 0.5,
+            "bound": 3,
+            "children": [
+                {
+                    "id": 2,
+                    "type": "choice",
+                    "label": "C",
+                    "children": [
+                        {"id": 3, "type": "task", "label": "T3", "impacts": [1, 2], "duration": 1},
+                        {"id": 4, "type": "task", "label": "T4", "impacts": [3, 4], "duration": 2},
+                    ],
+                },
+            ],
+        },
+        {
+            "id": 5,
+            "type": "parallel",
+            "children": [
+                {
+                    "id": 6,
+                    "type": "nature",
+                    "label": "N",
+                    "distribution": [0.5, 0.5],
+                    "children": [
+                        {"id": 7, "type": "task", "label": "T7", "impacts": [1, 1], "duration": 1},
+                        {"id": 8, "type": "task", "label": "T8", "impacts": [2, 2], "duration": 3},
+                    ],
+                },
+                {"id": 9, "type": "task", "label": "T9", "impacts": [5, 6], "duration": 2},
+            ],
+        },
+    ],
+}
+
+
+_update_status = strategy.base.update_status
+
+
+def _full_update_status(ctx, regions, status, marking, fired=(), since=None):
+    # Reference: check every place and propagate the whole tree
+    _update_status(ctx, regions, status, marking, fired, None)
+
+
+@pytest.mark.parametrize("time_step", [None, 0.5])
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_status(monkeypatch, time_step, seed):
+    ctx = NetContext.from_region(RegionModel.model_validate(BPMN))
+    extree = ExecutionTree.from_context(ctx, ctx.region)
+    regions = ctx.region_index
+    rng = random.Random(seed)
+    marking = extree.current_node.snapshot.marking
+    status = {regions[r_id]: s for r_id, s in extree.current_node.snapshot.status.items()}
+
+    def step(update):
+        monkeypatch.setattr("strategy.counter.update_status", update)
+        monkeypatch.setattr("strategy.time.update_status", update)
+        np.random.seed(seed)
+        new_status = dict(status)
+        if time_step is None:
+            result = ctx.strategy.consume(ctx, marking, regions, new_status, decisions)
+        else:
+            result = TimeStrategy().consume(ctx, marking, regions, new_status, time_step, decisions)
+        return result[0], new_status
+
+    for _ in range(15):
+        choices = get_choices(ctx, marking)
+        decisions = [rng.choice(sorted(ts, key=lambda t: t.name)) for ts in choices.values()]
+
+        expected_marking, expected = step(_full_update_status)
+        marking, status = step(_update_status)
+
+        assert marking == expected_marking
+        assert status == expected
+        assert any(s != ActivityState.WAITING for s in status.values())
+
+
+def test_skipped_subtree():
+    region = RegionModel.model_validate({
+        "id": 0,
+        "type": "choice",
+        "label": "C",
+        "children": [
+            {"id": 1, "type": "task", "label": "T1", "impacts": [1], "duration": 1},
+            {
+                "id": 2,
+                "type": "sequential",
+                "children": [
+                    {"id": 3, "type": "task", "label": "T3", "impacts": [1], "duration": 1},
+                    {"id": 4, "type": "task", "label": "T4", "impacts": [1], "duration": 1},
+                ],
+            },
+        ],
+    })
+    first, second = region.children
+    status = {first: ActivityState.ACTIVE}
+    status.update((r, ActivityState.WAITING) for r in (second, *second.children))
+    propagate_status(region, status)
+
+    # Only the root of the skipped subtree is marked, its descendants are resolved afterwards
+    assert status[second] == ActivityState.WILL_NOT_BE_EXECUTED
+    assert all(status[r] == ActivityState.WAITING for r in second.children)
+    resolved = resolve_skipped(region, status)
+    assert list(resolved) == [region, first, second, *second.children]
+    assert resolved[region] == resolved[first] == ActivityState.ACTIVE
+    assert all(resolved[r] == ActivityState.WILL_NOT_BE_EXECUTED for r in second.children)